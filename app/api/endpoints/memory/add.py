@@ -1,5 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from app.api.models.memory import MemoryAddRequest, MemoryAddResponse
+from app.api.models.memory import (
+    MemoryAddRequest,
+    MemoryAddResponse,
+    MemoryAddManyRequest,
+    MemoryAddManyResponse,
+)
 from app.utils.auth import get_api_key
 from app.utils.logging import memory_logger
 from app.utils import get_memory_system
@@ -52,3 +57,53 @@ async def add_memory_endpoint(
             f"Error adding memory for agent {request.agent_id}: {str(e)}"
         )
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/add-many",
+    response_model=MemoryAddManyResponse,
+    status_code=201,
+    summary="Add several memory entries",
+)
+async def add_many_memories_endpoint(
+    request: MemoryAddManyRequest, api_key: str = Depends(get_api_key)
+):
+    """
+    Add several memory entries for an agent in one request.
+
+    Short-term entries are written in a single Redis transaction; long-term entries are
+    embedded and inserted in batches of VECTOR_ADD_BATCH_SIZE.
+
+    Parameters:
+    - **request**: MemoryAddManyRequest object containing:
+        - agent_id: UUID of the agent
+        - memory_type: Type of memory (SHORT_TERM or LONG_TERM)
+        - entries: List of MemoryEntry objects with content, metadata, and context
+
+    Returns:
+    - **MemoryAddManyResponse**: Object containing:
+        - agent_id: UUID of the agent
+        - memory_ids: Unique identifiers for the added memories, in request order
+        - message: Success message
+
+    Raises:
+    - **400 Bad Request**: If the memory type or configuration is invalid
+    - **500 Internal Server Error**: If there's an unexpected error during the process
+    """
+    try:
+        memory_logger.info(f"Adding {len(request.entries)} memories for agent: {request.agent_id}")
+        memory_system = await get_memory_system(request.agent_id)
+        memory_ids = await memory_system.add_many(request.memory_type, request.entries)
+        memory_logger.info(f"{len(memory_ids)} memories added successfully for agent: {request.agent_id}")
+        return MemoryAddManyResponse(
+            agent_id=request.agent_id,
+            memory_ids=memory_ids,
+            message="Memories added successfully",
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        memory_logger.error(
+            f"Error adding memories for agent {request.agent_id}: {str(e)}"
+        )
+        raise HTTPException(status_code=500, detail=str(e))
@@ -66,6 +66,30 @@ class MemoryAddResponse(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class MemoryAddManyRequest(BaseModel):
+    agent_id: UUID = Field(..., description="The ID of the agent to add the memories for")
+    memory_type: MemoryType = Field(
+        ..., description="The type of memory (short-term or long-term)"
+    )
+    entries: List[MemoryEntry] = Field(
+        ..., min_length=1, description="The memory entries to add"
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class MemoryAddManyResponse(BaseModel):
+    agent_id: UUID = Field(..., description="The ID of the agent")
+    memory_ids: List[str] = Field(
+        ..., description="The unique identifiers assigned to the added memories, in request order"
+    )
+    message: str = Field(
+        ..., description="A message indicating the result of the operation"
+    )
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class MemoryRetrieveRequest(BaseModel):
     agent_id: UUID = Field(
         ..., description="The ID of the agent to retrieve the memory for"
@@ -47,11 +47,52 @@ class Settings(BaseSettings):
     SHORT_TERM_MEMORY_TTL: int = 3600  # 1 hour in seconds
     LONG_TERM_MEMORY_LIMIT: int = 10000
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_CACHE_SIZE: int = 10000  # Embeddings kept in the process-wide in-memory LRU, keyed by model and content hash (0 disables the cache)
+    EMBEDDING_CACHE_PATH: str = ""  # SQLite file persisting cached embeddings across restarts and processes, e.g. "./data/embedding_cache.sqlite3" (empty keeps them in memory only)
+    MEMORY_CACHE_MAX_BYTES: int = 0  # Size of the in-process cache in front of MemorySystem.retrieve, e.g. 67108864 for 64 MiB (0 disables)
+    MEMORY_CACHE_POLICY: str = "ttl"  # Eviction policy: "lru", "lfu", "fifo", or "ttl" (LRU with expiry)
+    VECTOR_INIT_WORKERS: int = 2  # Threads that open the Chroma store and load embedding models, apart from the default executor
+    VECTOR_ADD_BATCH_SIZE: int = 256  # Long-term memories embedded and inserted per ChromaDB call by add_many and consolidation
+    VECTOR_WRITE_ACK_MODE: str = "verify"  # Long-term adds: "verify" reads them back before returning, "async" in the background (failures logged and counted), "trust" skips the read; consolidation always verifies
+    VECTOR_WARMUP_TIMEOUT: float = 60.0  # Seconds a long-term memory operation waits for the agent's vector store to finish warming up
+    MEMORY_CACHE_TTL: int = 60  # Seconds a cached entry lives with the "ttl" policy; bounds staleness across worker processes
 
     # Memory consolidation settings
     CONSOLIDATION_INTERVAL: int = 21600  # 6 hours in seconds
     CONSOLIDATION_IMPORTANCE_THRESHOLD: float = 0.7
-    MAX_SHORT_TERM_MEMORIES: int = 1000  # Maximum number of short-term memories before forced consolidation
+    MAX_SHORT_TERM_MEMORIES: int = 1000  # Maximum number of short-term memories per agent before forced consolidation (0 disables)
+    MAX_SHORT_TERM_MEMORY_BYTES: int = 0  # Maximum encoded size of an agent's short-term memories before forced consolidation (0 disables)
+    CONSOLIDATION_BATCH_SIZE: int = 100  # Short-term memories claimed and moved per consolidation batch
+    CONSOLIDATION_VISIBILITY_TIMEOUT: int = 300  # Seconds before an unacknowledged batch may be claimed by another worker
+    CONSOLIDATION_MIN_AGE: int = 3600  # Seconds a short-term memory stays in Redis before it is consolidated
+    CONSOLIDATION_STREAM_ENABLED: bool = False  # Queue short-term writes on a Redis Stream for consolidation workers (Redis 6.2+)
+    CONSOLIDATION_STREAM_MAX_LENGTH: int = 1000000  # Approximate cap on queued entries; trimmed ones are still picked up by consolidate_memories
+    CONSOLIDATION_WORKER_POLL_INTERVAL: float = 5.0  # Seconds a consolidation worker waits when no entry is due
+    CONSOLIDATION_WORKER_MAX_AGENTS: int = 64  # Initialized memory systems a consolidation worker keeps open; the least recently used are closed
+    CONSOLIDATION_ON_EXPIRY_ENABLED: bool = False  # Consolidate short-term memories when a SHORT_TERM_MEMORY_TTL shadow key expires (keyspace notifications)
+    CONSOLIDATION_EXPIRY_GRACE: int = 86400  # Seconds a short-term memory outlives its shadow key, so missed expiry events are caught by consolidate_memories
+
+    # Redis short-term memory settings
+    REDIS_MAX_CONNECTIONS: int = 50  # Size of the process-wide connection pool shared by all agents
+    REDIS_POOL_TIMEOUT: int = 20  # Seconds to wait for a free pooled connection before failing
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # Seconds a pooled connection may sit idle before it is re-checked
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_MONITOR_INTERVAL: float = 5.0  # Seconds between background PINGs of the server (0 disables)
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 3  # Consecutive connection failures that open the circuit breaker
+    REDIS_CIRCUIT_RESET_TIMEOUT: float = 10.0  # Seconds the circuit stays open before a single trial request is let through
+    REDIS_REPLICA_URLS: List[str] = []  # Read replicas of REDIS_URL, e.g. ["redis://valkey-secondary:6379"]
+    REDIS_READ_ROUTING: str = "primary"  # "primary", or "replica" to serve searches and reads from a fresh replica
+    REDIS_REPLICA_MAX_LAG: float = 2.0  # Seconds a replica may trail the primary and still serve reads
+    REDIS_REPLICA_CHECK_INTERVAL: float = 1.0  # Seconds between replica staleness checks
+    REDIS_CLIENT_CACHE_ENABLED: bool = False  # Serve repeated reads of unchanged entries from process memory, invalidated via RESP3 client tracking (Redis 6+)
+    REDIS_CLIENT_CACHE_MAX_ENTRIES: int = 10000  # Entries kept by the client-side cache before least-recently-used ones are evicted
+    REDIS_CLUSTER_MODE: bool = False  # Connect with a cluster client; agent keys are hash-tagged so each agent maps to one slot
+    REDIS_KEYWORD_INDEX_ENABLED: bool = False  # Maintain an inverted token index for short-term keyword search
+    REDIS_FULL_TEXT_SEARCH_ENABLED: bool = False  # Opt in to FT.SEARCH when a search module (valkey-search/RediSearch) is loaded; mirrors each entry's content into an indexed hash, roughly doubling short-term memory use
+    REDIS_MEMORY_CODEC: str = "msgpack"  # Format new entries are written in ("msgpack" or "json"); both are always readable
+    REDIS_COMPRESSION_THRESHOLD: int = 4096  # Encoded entries at least this many bytes are zlib-compressed (0 disables)
+    REDIS_COMPRESSION_LEVEL: int = 6  # zlib level, 1 (fastest) to 9 (smallest)
+    REDIS_STORAGE_LAYOUT: str = "string"  # "string" or "hash"; convert existing keys with app.core.memory.redis.migrate
 
     @field_validator("LLM_PROVIDER_CONFIGS", mode="before")
     @classmethod
@@ -86,6 +86,7 @@ class AgentManager:
             config=agent.config,
             memory_config=agent.memory.config,
             conversation_history_length=len(agent.conversation_history),
+            memory_status=agent.memory.status,
         )
 
     async def update_agent(self, agent_id: UUID, update_data: Dict[str, Any]) -> bool:
@@ -150,6 +151,7 @@ class AgentManager:
                 config=agent.config,
                 memory_config=agent.memory.config,
                 conversation_history_length=len(agent.conversation_history),
+                memory_status=agent.memory.status,
             )
             for agent in self.agents.values()
         ]
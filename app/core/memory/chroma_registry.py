@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Dict, Optional
+import chromadb
+from app.config import settings
+from .logger import get_memory_logger
+from .vector_executor import run_blocking
+
+
+class ChromaRegistryError(Exception):
+    """Custom exception for Chroma client registry errors."""
+    pass
+
+
+class ChromaRegistry:
+    """
+    Process-wide owner of the persistent Chroma client and its collections.
+
+    The store in CHROMA_PERSIST_DIRECTORY is opened once, on the dedicated
+    vector executor, and shared by every VectorMemory in the process instead
+    of being reopened per agent. Collection handles are cached by name, so
+    initializing an agent whose collection is already open does not touch the
+    store at all.
+
+    ``close`` stops the client once, during shutdown; the next request opens
+    the store again.
+    """
+
+    def __init__(self):
+        self._client: Optional[Any] = None
+        self._path: Optional[str] = None
+        self._collections: Dict[str, Any] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_client(self) -> Any:
+        """
+        Return the shared client, opening the persistent store on first use.
+
+        Raises:
+            ChromaRegistryError: If the store cannot be opened.
+        """
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    path = settings.CHROMA_PERSIST_DIRECTORY
+                    try:
+                        self._client = await run_blocking(chromadb.PersistentClient, path=path)
+                    except Exception as e:
+                        get_memory_logger().error(f"Failed to open Chroma store at {path}: {str(e)}")
+                        raise ChromaRegistryError(f"Failed to open Chroma store at {path}: {e}") from e
+                    self._path = path
+                    get_memory_logger().info(f"Opened Chroma store at {path}")
+        return self._client
+
+    async def get_collection(self, name: str, embedding_function: Any = None) -> Any:
+        """
+        Return the handle of a collection, creating the collection if it does not exist.
+
+        Args:
+            name (str): The collection name.
+            embedding_function: The embedding function the collection is created or opened with.
+
+        Returns:
+            The cached collection handle.
+
+        Raises:
+            ChromaRegistryError: If the store cannot be opened or the collection cannot be created.
+        """
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+
+        client = await self.get_client()
+        async with self._lock:
+            if name not in self._collections:
+                try:
+                    self._collections[name] = await run_blocking(
+                        client.get_or_create_collection, name=name, embedding_function=embedding_function
+                    )
+                except Exception as e:
+                    get_memory_logger().error(f"Failed to open Chroma collection {name}: {str(e)}")
+                    raise ChromaRegistryError(f"Failed to open Chroma collection {name}: {e}") from e
+        return self._collections[name]
+
+    def forget_collection(self, name: str) -> None:
+        """Drop a cached handle, e.g. after the collection was deleted from the store."""
+        self._collections.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the open store's path and the number of cached collection handles."""
+        return {"path": self._path, "open": self._client is not None, "collections": len(self._collections)}
+
+    async def close(self) -> None:
+        """Drop every collection handle and stop the shared client."""
+        async with self._lock:
+            client, self._client = self._client, None
+            self._collections.clear()
+            if client is None:
+                return
+            try:
+                # Chroma keeps one system per path in a class-level cache. Stopping it releases
+                # the store's files, but ``_system`` is private (checked against chromadb 0.5
+                # and 0.6), so it is only used when present. The public clear_system_cache
+                # evicts it, so the next client reopens the store from disk.
+                system = getattr(client, "_system", None)
+                if system is not None and hasattr(system, "stop"):
+                    await run_blocking(system.stop)
+                client.clear_system_cache()
+            except Exception as e:
+                get_memory_logger().warning(f"Error while closing Chroma store at {self._path}: {str(e)}")
+            get_memory_logger().info(f"Closed Chroma store at {self._path}")
+
+
+chroma_registry = ChromaRegistry()
@@ -0,0 +1,243 @@
+"""
+Move queued short-term memories to long-term storage.
+
+Usage:
+    python -m app.core.memory.consolidation_worker [--consumer NAME] [--once]
+
+Workers read the consolidation stream that short-term writes are queued on
+when CONSOLIDATION_STREAM_ENABLED is set. Any number of worker processes can
+run side by side: the consumer group hands each entry to one of them, and
+entries of a worker that stops are taken over by the others after
+CONSOLIDATION_VISIBILITY_TIMEOUT seconds.
+
+With CONSOLIDATION_ON_EXPIRY_ENABLED, workers also listen for the expiry of
+short-term memories' shadow keys and consolidate exactly those memories. Every
+worker receives every expiry; the per-memory claims make sure only one of them
+moves it.
+"""
+import argparse
+import asyncio
+import os
+import socket
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from app.config import settings
+from app.core.models import MemoryConfig
+from .memory_system import MemorySystem, MemorySystemError
+from .redis.consolidation_stream import RedisConsolidationStream, RedisConsolidationStreamError, ConsolidationMessage
+from .redis.expiry import RedisExpiryListener
+from .logger import get_memory_logger
+
+
+class ConsolidationWorker:
+    def __init__(
+        self,
+        consumer: Optional[str] = None,
+        stream: Optional[RedisConsolidationStream] = None,
+        batch_size: Optional[int] = None,
+        min_age: Optional[int] = None,
+        visibility_timeout: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        expiry_listener: Optional[RedisExpiryListener] = None,
+        max_memory_systems: Optional[int] = None,
+    ):
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.stream = stream or RedisConsolidationStream()
+        self.batch_size = batch_size or settings.CONSOLIDATION_BATCH_SIZE
+        self.min_age = settings.CONSOLIDATION_MIN_AGE if min_age is None else min_age
+        self.visibility_timeout = visibility_timeout or settings.CONSOLIDATION_VISIBILITY_TIMEOUT
+        self.poll_interval = poll_interval or settings.CONSOLIDATION_WORKER_POLL_INTERVAL
+        if expiry_listener is None and settings.CONSOLIDATION_ON_EXPIRY_ENABLED:
+            expiry_listener = RedisExpiryListener()
+        self.expiry_listener = expiry_listener
+        self.max_memory_systems = max_memory_systems or settings.CONSOLIDATION_WORKER_MAX_AGENTS
+        # Least recently used first; systems beyond max_memory_systems are closed once no batch uses them.
+        self.memory_systems: "OrderedDict[str, MemorySystem]" = OrderedDict()
+        self._in_use: Counter = Counter()
+        self._stopping = asyncio.Event()
+
+    async def run_once(self) -> int:
+        # Entries abandoned by other workers first, then new entries that are due.
+        messages = await self.stream.reclaim(self.consumer, self.batch_size, self.visibility_timeout)
+        if not messages:
+            messages = await self.stream.read_due(self.consumer, self.batch_size, self.min_age)
+        if not messages:
+            return 0
+
+        by_agent: Dict[str, List[ConsolidationMessage]] = defaultdict(list)
+        for message in messages:
+            by_agent[message.agent_id].append(message)
+
+        processed = []
+        for agent_id, agent_messages in by_agent.items():
+            try:
+                async with self._memory_system(agent_id) as memory_system:
+                    await memory_system.consolidate_memory_ids([message.memory_id for message in agent_messages])
+                processed.extend(message.message_id for message in agent_messages)
+            except MemorySystemError as e:
+                # Left pending; taken over again once the visibility timeout passes.
+                get_memory_logger().warning(
+                    f"Consolidation of {len(agent_messages)} queued memories failed for agent: {agent_id}. Error: {str(e)}"
+                )
+            except Exception as e:
+                # One agent's failure must not keep the other agents' entries from being acknowledged.
+                get_memory_logger().error(
+                    f"Unexpected error consolidating {len(agent_messages)} queued memories for agent: {agent_id}. Error: {str(e)}",
+                    exc_info=True,
+                )
+
+        await self.stream.ack(processed)
+        get_memory_logger().info(
+            f"Consolidation worker {self.consumer} processed {len(processed)} of {len(messages)} queued memories"
+        )
+        return len(messages)
+
+    async def run_expired_once(self) -> int:
+        # Memories whose shadow key expired; failures are left to consolidate_memories.
+        expired = await self.expiry_listener.next_batch(self.batch_size, self.poll_interval)
+        consolidated = 0
+        for agent_id, memory_ids in expired.items():
+            try:
+                async with self._memory_system(agent_id) as memory_system:
+                    consolidated += await memory_system.consolidate_memory_ids(memory_ids)
+            except MemorySystemError as e:
+                get_memory_logger().warning(
+                    f"Consolidation of {len(memory_ids)} expired memories failed for agent: {agent_id}. Error: {str(e)}"
+                )
+            except Exception as e:
+                get_memory_logger().error(
+                    f"Unexpected error consolidating {len(memory_ids)} expired memories for agent: {agent_id}. Error: {str(e)}",
+                    exc_info=True,
+                )
+        if expired:
+            get_memory_logger().info(
+                f"Consolidation worker {self.consumer} consolidated {consolidated} expired memories"
+            )
+        return consolidated
+
+    async def run(self) -> None:
+        await self.stream.ensure_group()
+        get_memory_logger().info(f"Consolidation worker {self.consumer} started")
+        if self.expiry_listener is None:
+            await self._run_stream()
+            return
+
+        await self.expiry_listener.start()
+        try:
+            await asyncio.gather(self._run_stream(), self._run_expired())
+        finally:
+            await self.expiry_listener.stop()
+
+    async def _run_expired(self) -> None:
+        # Both loops run under one gather, so neither may let an error end it.
+        while not self._stopping.is_set():
+            try:
+                await self.run_expired_once()
+            except Exception as e:
+                get_memory_logger().error(
+                    f"Consolidation worker {self.consumer} failed to consolidate expired memories: {str(e)}",
+                    exc_info=True,
+                )
+                await self._pause()
+
+    async def _run_stream(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                handled = await self.run_once()
+            except RedisConsolidationStreamError as e:
+                get_memory_logger().error(f"Consolidation worker {self.consumer} failed to read the stream: {str(e)}")
+                handled = 0
+            except Exception as e:
+                get_memory_logger().error(
+                    f"Consolidation worker {self.consumer} failed to process the stream: {str(e)}", exc_info=True
+                )
+                handled = 0
+            if not handled:
+                await self._pause()
+
+    async def _pause(self) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def close(self) -> None:
+        await asyncio.gather(
+            *(memory_system.close() for memory_system in self.memory_systems.values()),
+            return_exceptions=True,
+        )
+        self.memory_systems.clear()
+
+    @asynccontextmanager
+    async def _memory_system(self, agent_id: str) -> AsyncIterator[MemorySystem]:
+        memory_system = self.memory_systems.get(agent_id)
+        duplicate = None
+        if memory_system is None:
+            memory_system = MemorySystem(
+                agent_id, MemoryConfig(use_long_term_memory=True, use_redis_cache=True)
+            )
+            await memory_system.initialize()
+            if agent_id in self.memory_systems:
+                # The other loop opened one for the same agent meanwhile.
+                duplicate, memory_system = memory_system, self.memory_systems[agent_id]
+            else:
+                self.memory_systems[agent_id] = memory_system
+        self.memory_systems.move_to_end(agent_id)
+        self._in_use[agent_id] += 1
+        try:
+            if duplicate is not None:
+                await duplicate.close()
+            yield memory_system
+        finally:
+            self._in_use[agent_id] -= 1
+            if not self._in_use[agent_id]:
+                del self._in_use[agent_id]
+            await self._evict()
+
+    async def _evict(self) -> None:
+        """Close the least recently used memory systems beyond max_memory_systems that no batch is using."""
+        idle = [agent_id for agent_id in self.memory_systems if agent_id not in self._in_use]
+        evicted = [
+            self.memory_systems.pop(agent_id)
+            for agent_id in idle[:max(len(self.memory_systems) - self.max_memory_systems, 0)]
+        ]
+        results = await asyncio.gather(
+            *(memory_system.close() for memory_system in evicted), return_exceptions=True
+        )
+        for memory_system, result in zip(evicted, results):
+            if isinstance(result, Exception):
+                get_memory_logger().warning(
+                    f"Failed to close evicted memory system for agent: {memory_system.agent_id}. Error: {str(result)}"
+                )
+
+
+async def run_worker(consumer: Optional[str] = None, once: bool = False) -> None:
+    await MemorySystem.initialize_memory_systems()
+    worker = ConsolidationWorker(consumer)
+    try:
+        if once:
+            await worker.stream.ensure_group()
+            while await worker.run_once():
+                pass
+        else:
+            await worker.run()
+    finally:
+        await worker.close()
+        await MemorySystem.close_memory_systems()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move queued short-term memories to long-term storage.")
+    parser.add_argument("--consumer", help="Consumer name within the group (default: hostname-pid)")
+    parser.add_argument("--once", action="store_true", help="Exit once no queued memory is due")
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(args.consumer, args.once))
+
+
+if __name__ == "__main__":
+    main()
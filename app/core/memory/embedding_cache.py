@@ -0,0 +1,172 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from cachetools import LRUCache
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from app.config import settings
+from .logger import get_memory_logger
+
+
+class EmbeddingCacheError(Exception):
+    """Custom exception for embedding cache errors."""
+    pass
+
+
+class EmbeddingCache:
+    """
+    Content-addressed store of computed embeddings, shared by every agent in the process.
+
+    Vectors are keyed by the SHA-256 of the model name and the normalized text,
+    so the same content is encoded once however many agents store it. An
+    in-memory LRU of EMBEDDING_CACHE_SIZE vectors sits in front of an optional
+    SQLite blob store at EMBEDDING_CACHE_PATH, which keeps them across restarts
+    and is shared by the worker processes on a host.
+
+    Embedding functions run on worker threads, so every method is thread-safe.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, path: Optional[str] = None):
+        self.max_entries = settings.EMBEDDING_CACHE_SIZE if max_entries is None else max_entries
+        self.path = settings.EMBEDDING_CACHE_PATH if path is None else path
+        self._entries: LRUCache = LRUCache(maxsize=max(self.max_entries, 1))
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(model_name: str, text: str) -> bytes:
+        """Hash a model name and text; runs of whitespace and surrounding whitespace do not change the key."""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{model_name}\0{normalized}".encode()).digest()
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[np.ndarray]]:
+        """
+        Look up vectors, first in memory and then on disk.
+
+        Args:
+            keys (List[bytes]): Keys built with ``key``.
+
+        Returns:
+            List[Optional[np.ndarray]]: The cached vectors, None where a key is not cached.
+        """
+        with self._lock:
+            vectors = [self._entries.get(key) for key in keys]
+            missing = [key for key, vector in zip(keys, vectors) if vector is None]
+            stored = self._read(missing) if missing else {}
+            for position, key in enumerate(keys):
+                if vectors[position] is not None:
+                    self.hits += 1
+                elif key in stored:
+                    vectors[position] = self._entries[key] = stored[key]
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+            return vectors
+
+    def put_many(self, items: Dict[bytes, np.ndarray]) -> None:
+        """Store newly computed vectors in memory and on disk."""
+        with self._lock:
+            for key, vector in items.items():
+                self._entries[key] = vector
+            db = self._connection()
+            if db is not None:
+                try:
+                    with db:
+                        db.executemany(
+                            "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+                            [(key, vector.astype(np.float32).tobytes()) for key, vector in items.items()],
+                        )
+                except sqlite3.Error as e:
+                    get_memory_logger().warning(f"Failed to persist {len(items)} embeddings: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """Return the memory and disk hit counters, misses and the number of vectors held in memory."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
+
+    def close(self) -> None:
+        """Close the disk store; it is reopened on the next lookup."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _read(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        db = self._connection()
+        if db is None:
+            return {}
+        stored = {}
+        try:
+            # Stay well below SQLite's limit on bound parameters.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                stored.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        except sqlite3.Error as e:
+            get_memory_logger().warning(f"Failed to read cached embeddings: {str(e)}")
+        return stored
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._db is None:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+                db.commit()
+            except (sqlite3.Error, OSError) as e:
+                raise EmbeddingCacheError(f"Failed to open embedding cache at {self.path}: {e}") from e
+            self._db = db
+        return self._db
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embedding function that encodes only the documents the embedding cache does not hold."""
+
+    def __init__(self, function: Any, model_name: str, cache: EmbeddingCache):
+        self.function = function
+        self.model_name = model_name
+        self.cache = cache
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [EmbeddingCache.key(self.model_name, text) for text in input]
+        try:
+            vectors = self.cache.get_many(keys)
+        except EmbeddingCacheError as e:
+            get_memory_logger().warning(f"Embedding cache unavailable, encoding all documents: {str(e)}")
+            return self.function(input)
+
+        missing = [position for position, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Repeated texts within the batch are encoded once.
+            texts = {keys[position]: input[position] for position in missing}
+            computed = dict(zip(texts, self.function(list(texts.values()))))
+            for position in missing:
+                vectors[position] = computed[keys[position]]
+            try:
+                self.cache.put_many({key: np.asarray(vector, dtype=np.float32) for key, vector in computed.items()})
+            except EmbeddingCacheError as e:
+                get_memory_logger().warning(f"Failed to cache {len(computed)} embeddings: {str(e)}")
+        return vectors
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,105 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, Optional
+from chromadb.utils import embedding_functions
+from app.config import settings
+from .logger import get_memory_logger
+from .vector_executor import run_blocking
+from .embedding_cache import CachedEmbeddingFunction, EmbeddingCache, embedding_cache
+
+
+class EmbeddingServiceError(Exception):
+    """Custom exception for embedding model loading errors."""
+    pass
+
+
+class EmbeddingService:
+    """
+    Process-wide owner of the embedding models used by VectorMemory.
+
+    Each model is loaded once, on the dedicated vector executor so the event
+    loop keeps serving requests meanwhile, and the same embedding function is
+    handed to every collection that asks for it. Concurrent first requests for
+    a model wait for the same load instead of starting their own.
+
+    When the embedding cache is enabled (EMBEDDING_CACHE_SIZE), the handed out
+    functions look documents up in it and only encode the ones it misses.
+
+    ``stats`` reports, per model, how long loading took, the memory held by
+    its weights and how many collections use it.
+    """
+
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
+        self.cache = cache or embedding_cache
+        self._functions: Dict[str, Any] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, model_name: Optional[str] = None) -> Any:
+        """
+        Return the shared embedding function for a model, loading the model on first use.
+
+        Args:
+            model_name (Optional[str]): The sentence-transformers model. Defaults to EMBEDDING_MODEL.
+
+        Returns:
+            The embedding function, to be passed to ChromaDB collections.
+
+        Raises:
+            EmbeddingServiceError: If the model cannot be loaded.
+        """
+        model_name = model_name or settings.EMBEDDING_MODEL
+        if model_name not in self._functions:
+            async with self._locks.setdefault(model_name, asyncio.Lock()):
+                if model_name not in self._functions:
+                    self._functions[model_name] = await self._load(model_name)
+        self._stats[model_name]["collections"] += 1
+        return self._functions[model_name]
+
+    def release(self, model_name: Optional[str] = None) -> None:
+        """Record that a collection no longer uses a model; the model itself stays loaded."""
+        model_stats = self._stats.get(model_name or settings.EMBEDDING_MODEL)
+        if model_stats and model_stats["collections"] > 0:
+            model_stats["collections"] -= 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the load time in seconds, weight memory in bytes and number of users of each loaded model."""
+        return {model_name: dict(model_stats) for model_name, model_stats in self._stats.items()}
+
+    def clear(self) -> None:
+        """Drop every loaded model; collections holding a function keep it alive until they are closed."""
+        self._functions.clear()
+        self._stats.clear()
+
+    async def _load(self, model_name: str) -> Any:
+        started = time.perf_counter()
+        try:
+            function = await run_blocking(
+                embedding_functions.SentenceTransformerEmbeddingFunction, model_name=model_name
+            )
+        except Exception as e:
+            get_memory_logger().error(f"Failed to load embedding model {model_name}: {str(e)}")
+            raise EmbeddingServiceError(f"Failed to load embedding model {model_name}: {e}") from e
+
+        self._stats[model_name] = {
+            "load_seconds": round(time.perf_counter() - started, 3),
+            "memory_bytes": self._weights_size(function),
+            "collections": 0,
+        }
+        get_memory_logger().info(f"Loaded embedding model {model_name}: {self._stats[model_name]}")
+        if self.cache.enabled:
+            return CachedEmbeddingFunction(function, model_name, self.cache)
+        return function
+
+    @staticmethod
+    def _weights_size(function: Any) -> Optional[int]:
+        # Parameters and buffers of the underlying torch module; None for other backends.
+        model = getattr(function, "_model", None)
+        if model is None or not hasattr(model, "parameters"):
+            return None
+        tensors = itertools.chain(model.parameters(), model.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+embedding_service = EmbeddingService()
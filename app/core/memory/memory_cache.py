@@ -0,0 +1,146 @@
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from cachetools import Cache, FIFOCache, LFUCache, LRUCache, TTLCache
+from app.core.models import MemoryEntry
+from app.config import settings
+from .logger import get_memory_logger
+
+# Fixed per-entry overhead added to the serialized size: the model objects, the
+# key tuple and the cache's own bookkeeping.
+ENTRY_OVERHEAD_BYTES = 512
+
+CacheKey = Tuple[str, str, str]
+
+CACHE_POLICIES: Dict[str, Callable[..., Cache]] = {
+    "lru": LRUCache,
+    "lfu": LFUCache,
+    "fifo": FIFOCache,
+    "ttl": lambda maxsize, getsizeof: TTLCache(maxsize, settings.MEMORY_CACHE_TTL, getsizeof=getsizeof),
+}
+
+
+class MemoryCacheError(Exception):
+    """Custom exception for memory cache configuration errors."""
+    pass
+
+
+def entry_size(memory_entry: MemoryEntry) -> int:
+    """Approximate the memory held by a cached entry, in bytes."""
+    return len(memory_entry.model_dump_json()) + ENTRY_OVERHEAD_BYTES
+
+
+class MemoryCache:
+    """
+    Process-wide read-through cache of memory entries, keyed by (agent, tier, memory ID).
+
+    Capacity is measured in bytes of the entries' serialized size, so a few
+    large memories cannot crowd out the budget meant for many small ones.
+    Eviction follows MEMORY_CACHE_POLICY ("lru", "lfu", "fifo", or "ttl":
+    least-recently-used with entries expiring after MEMORY_CACHE_TTL seconds).
+
+    Entries are invalidated by the writes made through MemorySystem in this
+    process. Other processes' deletes are not seen; use the "ttl" policy to
+    bound how long another worker may serve an entry it deleted.
+
+    A lookup that misses records its tier's invalidation epoch before going to
+    the backend and stores the result only if the tier saw no invalidation
+    since, so an entry deleted during the read is never cached.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, policy: Optional[str] = None):
+        self.max_bytes = settings.MEMORY_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.policy = policy or settings.MEMORY_CACHE_POLICY
+        if self.policy not in CACHE_POLICIES:
+            raise MemoryCacheError(f"Unknown memory cache policy: {self.policy}")
+        self._entries: Optional[Cache] = (
+            CACHE_POLICIES[self.policy](maxsize=self.max_bytes, getsizeof=entry_size)
+            if self.max_bytes > 0 else None
+        )
+        self._epochs: Dict[Tuple[str, str], int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._entries is not None
+
+    @staticmethod
+    def key(agent_id, tier: str, memory_id) -> CacheKey:
+        return (str(agent_id), tier, str(memory_id))
+
+    def get(self, key: CacheKey) -> Optional[MemoryEntry]:
+        """
+        Return a copy of the cached entry, or None on a miss.
+
+        Args:
+            key (CacheKey): The (agent, tier, memory ID) key.
+
+        Returns:
+            Optional[MemoryEntry]: A copy callers may modify freely.
+        """
+        if self._entries is None:
+            return None
+        memory_entry = self._entries.get(key)
+        if memory_entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return memory_entry.model_copy(deep=True)
+
+    def epoch(self, agent_id, tier: str) -> int:
+        """The invalidation counter of an agent's tier; pass it, read before a backend lookup, to ``put``."""
+        return self._epochs.get((str(agent_id), tier), 0)
+
+    def put(self, key: CacheKey, memory_entry: Optional[MemoryEntry], epoch: int) -> None:
+        """
+        Cache an entry read from the backend, unless its tier was invalidated since ``epoch``.
+
+        Args:
+            key (CacheKey): The (agent, tier, memory ID) key.
+            memory_entry (Optional[MemoryEntry]): The entry read; missing entries are not cached.
+            epoch (int): The tier's ``epoch`` before the backend read.
+        """
+        if self._entries is None or memory_entry is None or epoch != self._epochs.get(key[:2], 0):
+            return
+        try:
+            self._entries[key] = memory_entry.model_copy(deep=True)
+        except ValueError:
+            # Larger than the whole cache.
+            get_memory_logger().debug(f"Memory entry too large to cache: {key}")
+
+    def invalidate(self, keys: Iterable[CacheKey]) -> None:
+        """Drop the given entries and fail the ``put`` of lookups in flight on their tiers."""
+        if self._entries is None:
+            return
+        for key in keys:
+            self._bump(key[:2])
+            self._entries.pop(key, None)
+
+    def invalidate_tier(self, agent_id, tier: str) -> None:
+        """Drop every cached entry of an agent's tier."""
+        if self._entries is None:
+            return
+        scope = (str(agent_id), tier)
+        self._bump(scope)
+        for key in [key for key in self._entries.keys() if key[:2] == scope]:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        if self._entries is not None:
+            for scope in list(self._epochs):
+                self._bump(scope)
+            self._entries.clear()
+
+    def _bump(self, scope: Tuple[str, str]) -> None:
+        self._epochs[scope] = self._epochs.get(scope, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit and miss counters and the cache's current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries) if self._entries is not None else 0,
+            "bytes": self._entries.currsize if self._entries is not None else 0,
+        }
+
+
+memory_cache = MemoryCache()
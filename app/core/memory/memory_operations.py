@@ -188,3 +188,4 @@ async def close_memory_systems():
     for agent_id, memory_system in memory_systems.items():
         await memory_system.close()
     memory_systems.clear()
+    await MemorySystem.close_memory_systems()
@@ -1,9 +1,9 @@
 import asyncio
 import uuid
-from typing import Dict, Any, List, Optional, Union
+from typing import Awaitable, Callable, Dict, Any, List, Literal, Optional, Union
 from datetime import datetime, timedelta
 from app.core.models import MemoryConfig
-from app.core.models import MemoryEntry
+from app.core.models import MemoryEntry, new_memory_id
 from app.api.models.memory import (
     MemoryType,
     AdvancedSearchQuery,
@@ -11,7 +11,15 @@ from app.api.models.memory import (
 )
 from .redis_memory import RedisMemory, RedisMemoryError
 from .vector_memory import VectorMemory, VectorMemoryError
+from .memory_cache import MemoryCache, memory_cache
+from .embeddings import embedding_service
+from .embedding_cache import embedding_cache
+from .chroma_registry import chroma_registry
+from . import vector_executor
+from .redis.pool import redis_pool_manager, RedisPoolError
+from .redis.usage import MemoryUsage
 from .logger import get_memory_logger
+from app.config import settings
 
 class MemorySystemError(Exception):
     """Base exception for MemorySystem errors."""
@@ -24,26 +32,76 @@ class MemorySystem:
         config: MemoryConfig,
         short_term: Optional[RedisMemory] = None,
         long_term: Optional[VectorMemory] = None,
+        cache: Optional[MemoryCache] = None,
     ):
         self.agent_id = agent_id
         self.config = config
         self.short_term = short_term or RedisMemory(agent_id)
         self.long_term = long_term or VectorMemory(f"agent_{agent_id}")
-        self.consolidation_queue: List[MemoryEntry] = []
+        # Shared by every agent in the process; keyed by (agent, tier, memory ID).
+        self.cache = cache or memory_cache
+        # Writes leaving the agent over MAX_SHORT_TERM_MEMORIES or MAX_SHORT_TERM_MEMORY_BYTES
+        # schedule a forced consolidation; at most one runs at a time.
+        self.short_term.on_budget_exceeded = self._schedule_budget_consolidation
+        self._budget_consolidation: Optional[asyncio.Task] = None
+        # Long-term memory warms up in the background; its operations wait for it.
+        self._long_term_warmup: Optional[asyncio.Task] = None
         get_memory_logger().info(f"MemorySystem initialized for agent: {agent_id}")
 
     async def initialize(self) -> None:
+        # Only short-term memory is awaited. Opening the vector store and loading the embedding
+        # model run on the vector executor while the agent is "warming", so creating an agent
+        # never holds up other requests.
         try:
-            await asyncio.gather(
-                self.short_term.initialize(),
-                self.long_term.initialize()
-            )
-            get_memory_logger().info(f"MemorySystem fully initialized for agent: {self.agent_id}")
-        except (RedisMemoryError, VectorMemoryError) as e:
+            await self.short_term.initialize()
+            self._warm_up_long_term()
+            get_memory_logger().info(f"MemorySystem initialized for agent: {self.agent_id}, long-term memory warming up")
+        except RedisMemoryError as e:
             get_memory_logger().error(f"Failed to initialize MemorySystem for agent {self.agent_id}: {str(e)}")
             raise MemorySystemError("Failed to initialize MemorySystem") from e
 
+    @property
+    def status(self) -> Literal["warming", "ready", "failed"]:
+        # "warming" until long-term memory can serve requests, "failed" if its last warm-up failed.
+        warmup = self._long_term_warmup
+        if warmup is not None and not warmup.done():
+            return "warming"
+        if warmup is not None and not warmup.cancelled() and warmup.exception() is not None:
+            return "failed"
+        return "ready"
+
+    def _warm_up_long_term(self) -> None:
+        self._long_term_warmup = asyncio.create_task(self.long_term.initialize())
+        self._long_term_warmup.add_done_callback(self._log_warmup)
+
+    def _log_warmup(self, warmup: asyncio.Task) -> None:
+        # Also marks a failure as retrieved; VectorMemory has logged its cause.
+        if warmup.cancelled():
+            return
+        if warmup.exception() is None:
+            get_memory_logger().info(f"Long-term memory ready for agent: {self.agent_id}")
+        else:
+            get_memory_logger().warning(f"Long-term memory failed to warm up for agent: {self.agent_id}")
+
+    async def _long_term_ready(self) -> None:
+        # Waits up to VECTOR_WARMUP_TIMEOUT for the warm-up; a failed warm-up is retried.
+        if self._long_term_warmup is None:
+            return
+        if self.status == "failed":
+            self._warm_up_long_term()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._long_term_warmup), settings.VECTOR_WARMUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise VectorMemoryError(f"Long-term memory is still warming up for agent: {self.agent_id}")
+
     async def close(self) -> None:
+        if self._long_term_warmup is not None:
+            self._long_term_warmup.cancel()
+            self._long_term_warmup = None
+        if self._budget_consolidation is not None:
+            # An interrupted batch is released again once its visibility timeout passes.
+            self._budget_consolidation.cancel()
+            self._budget_consolidation = None
         try:
             await asyncio.gather(
                 self.short_term.close(),
@@ -57,12 +115,13 @@ class MemorySystem:
     async def add(
         self, memory_type: Union[MemoryType, str], memory_entry: MemoryEntry
     ) -> str:
+        self._assign_id(memory_entry)
         try:
             if (
                 memory_type == MemoryType.SHORT_TERM or memory_type == "SHORT_TERM"
             ) and self.config.use_redis_cache:
                 memory_id = await self.short_term.add(memory_entry)
-                self.consolidation_queue.append(memory_entry)
+                self._invalidate(MemoryType.SHORT_TERM, [memory_id])
                 get_memory_logger().info(
                     f"Short-term memory added for agent: {self.agent_id}"
                 )
@@ -70,6 +129,7 @@ class MemorySystem:
             elif (
                 memory_type == MemoryType.LONG_TERM or memory_type == "LONG_TERM"
             ) and self.config.use_long_term_memory:
+                await self._long_term_ready()
                 memory_id = await self.long_term.add(memory_entry)
                 get_memory_logger().info(f"Long-term memory added for agent: {self.agent_id}")
                 return memory_id
@@ -81,6 +141,38 @@ class MemorySystem:
             )
             raise MemorySystemError(f"Failed to add {memory_type} memory") from e
 
+    async def add_many(
+        self, memory_type: Union[MemoryType, str], memory_entries: List[MemoryEntry]
+    ) -> List[str]:
+        for memory_entry in memory_entries:
+            self._assign_id(memory_entry)
+        try:
+            if (
+                memory_type == MemoryType.SHORT_TERM or memory_type == "SHORT_TERM"
+            ) and self.config.use_redis_cache:
+                memory_ids = await self.short_term.add_many(memory_entries)
+                self._invalidate(MemoryType.SHORT_TERM, memory_ids)
+                get_memory_logger().info(
+                    f"{len(memory_ids)} short-term memories added for agent: {self.agent_id}"
+                )
+                return memory_ids
+            elif (
+                memory_type == MemoryType.LONG_TERM or memory_type == "LONG_TERM"
+            ) and self.config.use_long_term_memory:
+                await self._long_term_ready()
+                memory_ids = await self.long_term.add_many(memory_entries)
+                get_memory_logger().info(
+                    f"{len(memory_ids)} long-term memories added for agent: {self.agent_id}"
+                )
+                return memory_ids
+            else:
+                raise MemorySystemError(f"Invalid memory type or configuration: {memory_type}")
+        except (RedisMemoryError, VectorMemoryError) as e:
+            get_memory_logger().error(
+                f"Failed to add {memory_type} memories for agent: {self.agent_id}. Error: {str(e)}"
+            )
+            raise MemorySystemError(f"Failed to add {memory_type} memories") from e
+
     async def retrieve(
         self, memory_type: Union[MemoryType, str], memory_id: str
     ) -> Optional[MemoryEntry]:
@@ -88,11 +180,11 @@ class MemorySystem:
             if (
                 memory_type == MemoryType.SHORT_TERM or memory_type == "SHORT_TERM"
             ) and self.config.use_redis_cache:
-                return await self.short_term.get(memory_id)
+                return (await self._read_through(MemoryType.SHORT_TERM, [memory_id], self.short_term.get_many))[0]
             elif (
                 memory_type == MemoryType.LONG_TERM or memory_type == "LONG_TERM"
             ) and self.config.use_long_term_memory:
-                return await self.long_term.get(memory_id)
+                return (await self._read_through(MemoryType.LONG_TERM, [memory_id], self._get_long_term_many))[0]
             else:
                 raise MemorySystemError(f"Invalid memory type or configuration: {memory_type}")
         except (RedisMemoryError, VectorMemoryError) as e:
@@ -101,6 +193,26 @@ class MemorySystem:
             )
             raise MemorySystemError(f"Failed to retrieve {memory_type} memory") from e
 
+    async def retrieve_many(
+        self, memory_type: Union[MemoryType, str], memory_ids: List[str]
+    ) -> List[Optional[MemoryEntry]]:
+        try:
+            if (
+                memory_type == MemoryType.SHORT_TERM or memory_type == "SHORT_TERM"
+            ) and self.config.use_redis_cache:
+                return await self._read_through(MemoryType.SHORT_TERM, memory_ids, self.short_term.get_many)
+            elif (
+                memory_type == MemoryType.LONG_TERM or memory_type == "LONG_TERM"
+            ) and self.config.use_long_term_memory:
+                return await self._read_through(MemoryType.LONG_TERM, memory_ids, self._get_long_term_many)
+            else:
+                raise MemorySystemError(f"Invalid memory type or configuration: {memory_type}")
+        except (RedisMemoryError, VectorMemoryError) as e:
+            get_memory_logger().error(
+                f"Failed to retrieve {memory_type} memories for agent: {self.agent_id}. Error: {str(e)}"
+            )
+            raise MemorySystemError(f"Failed to retrieve {memory_type} memories") from e
+
     async def search(self, query: AdvancedSearchQuery) -> List[MemoryEntry]:
         try:
             results = []
@@ -115,7 +227,7 @@ class MemorySystem:
                 query.memory_type in (None, MemoryType.LONG_TERM, "LONG_TERM")
                 and self.config.use_long_term_memory
             ):
-                search_tasks.append(self.long_term.search(query))
+                search_tasks.append(self._search_long_term(query))
 
             search_results = await asyncio.gather(*search_tasks, return_exceptions=True)
             for result in search_results:
@@ -140,13 +252,16 @@ class MemorySystem:
                 memory_type == MemoryType.SHORT_TERM or memory_type == "SHORT_TERM"
             ) and self.config.use_redis_cache:
                 await self.short_term.delete(memory_id)
+                self._invalidate(MemoryType.SHORT_TERM, [memory_id])
                 get_memory_logger().info(
                     f"Short-term memory deleted for agent: {self.agent_id}"
                 )
             elif (      
                 memory_type == MemoryType.LONG_TERM or memory_type == "LONG_TERM"
             ) and self.config.use_long_term_memory:
+                await self._long_term_ready()
                 await self.long_term.delete(memory_id)
+                self._invalidate(MemoryType.LONG_TERM, [memory_id])
                 get_memory_logger().info(
                     f"Long-term memory deleted for agent: {self.agent_id}"
                 )
@@ -158,6 +273,34 @@ class MemorySystem:
             )
             raise MemorySystemError(f"Failed to delete {memory_type} memory") from e
 
+    async def delete_many(self, memory_type: Union[MemoryType, str], memory_ids: List[str]):
+        try:
+            if (
+                memory_type == MemoryType.SHORT_TERM or memory_type == "SHORT_TERM"
+            ) and self.config.use_redis_cache:
+                await self.short_term.delete_many(memory_ids)
+                self._invalidate(MemoryType.SHORT_TERM, memory_ids)
+                get_memory_logger().info(
+                    f"{len(memory_ids)} short-term memories deleted for agent: {self.agent_id}"
+                )
+            elif (
+                memory_type == MemoryType.LONG_TERM or memory_type == "LONG_TERM"
+            ) and self.config.use_long_term_memory:
+                await self._long_term_ready()
+                for memory_id in memory_ids:
+                    await self.long_term.delete(memory_id)
+                self._invalidate(MemoryType.LONG_TERM, memory_ids)
+                get_memory_logger().info(
+                    f"{len(memory_ids)} long-term memories deleted for agent: {self.agent_id}"
+                )
+            else:
+                raise MemorySystemError(f"Invalid memory type or configuration: {memory_type}")
+        except (RedisMemoryError, VectorMemoryError) as e:
+            get_memory_logger().error(
+                f"Failed to delete {memory_type} memories for agent: {self.agent_id}. Error: {str(e)}"
+            )
+            raise MemorySystemError(f"Failed to delete {memory_type} memories") from e
+
     async def perform_operation(
         self,
         operation: Union[MemoryOperation, str],
@@ -183,16 +326,22 @@ class MemorySystem:
             raise MemorySystemError(f"Failed to perform {operation} operation") from e
 
     async def consolidate_memories(self):
+        # Batches are claimed atomically in Redis, so concurrent workers never move the same
+        # memory twice; failed batches are released, crashed ones are reclaimed after a timeout.
         try:
-            threshold = datetime.now() - timedelta(hours=1)  # Consolidate memories older than 1 hour
-            old_memories = await self.short_term.get_memories_older_than(threshold)
+            threshold = datetime.now() - timedelta(seconds=settings.CONSOLIDATION_MIN_AGE)
+            consolidated = 0
 
-            for memory in old_memories:
-                await self.long_term.add(memory)
-                await self.short_term.delete(memory.id)
+            while True:
+                memory_ids = await self.short_term.claim_consolidation_batch(
+                    threshold, settings.CONSOLIDATION_BATCH_SIZE, settings.CONSOLIDATION_VISIBILITY_TIMEOUT
+                )
+                if not memory_ids:
+                    break
+                consolidated += await self._move_to_long_term(memory_ids)
 
             get_memory_logger().info(
-                f"Consolidated {len(old_memories)} memories for agent: {self.agent_id}"
+                f"Consolidated {consolidated} memories for agent: {self.agent_id}"
             )
         except (RedisMemoryError, VectorMemoryError) as e:
             get_memory_logger().error(
@@ -200,13 +349,95 @@ class MemorySystem:
             )
             raise MemorySystemError("Failed to consolidate memories") from e
 
+    async def consolidate_memory_ids(self, memory_ids: List[str]) -> int:
+        # Used by the consolidation stream workers. IDs held by a concurrent consolidate_memories
+        # run are skipped; that run moves or releases them.
+        try:
+            claimed = await self.short_term.claim_consolidation_ids(
+                memory_ids, settings.CONSOLIDATION_VISIBILITY_TIMEOUT
+            )
+            consolidated = await self._move_to_long_term(claimed) if claimed else 0
+            get_memory_logger().debug(
+                f"Consolidated {consolidated} of {len(memory_ids)} queued memories for agent: {self.agent_id}"
+            )
+            return consolidated
+        except (RedisMemoryError, VectorMemoryError) as e:
+            get_memory_logger().error(
+                f"Failed to consolidate memories for agent: {self.agent_id}. Error: {str(e)}"
+            )
+            raise MemorySystemError("Failed to consolidate memories") from e
+
+    async def consolidate_over_budget(self) -> int:
+        # Moves the oldest short-term memories, whatever their age, until the agent is back
+        # within its short-term budget. Entries that expired on their own still count until
+        # their ID is pruned, so the totals are recounted first; that alone may clear the budget.
+        try:
+            await self.short_term.reconcile_usage()
+            consolidated = 0
+            while await self.short_term.exceeds_budget():
+                memory_ids = await self.short_term.claim_consolidation_batch(
+                    datetime.now(), settings.CONSOLIDATION_BATCH_SIZE, settings.CONSOLIDATION_VISIBILITY_TIMEOUT
+                )
+                if not memory_ids:
+                    break
+                consolidated += await self._move_to_long_term(memory_ids)
+
+            get_memory_logger().info(
+                f"Consolidated {consolidated} memories over the short-term budget for agent: {self.agent_id}"
+            )
+            return consolidated
+        except (RedisMemoryError, VectorMemoryError) as e:
+            get_memory_logger().error(
+                f"Failed to consolidate memories over the short-term budget for agent: {self.agent_id}. Error: {str(e)}"
+            )
+            raise MemorySystemError("Failed to consolidate memories over budget") from e
+
+    def _schedule_budget_consolidation(self, usage: MemoryUsage) -> None:
+        if not self.config.use_long_term_memory:
+            return
+        if self._budget_consolidation is None or self._budget_consolidation.done():
+            get_memory_logger().info(
+                f"Short-term budget exceeded for agent: {self.agent_id} "
+                f"({usage.count} memories, {usage.bytes} bytes), scheduling consolidation"
+            )
+            self._budget_consolidation = asyncio.create_task(self._consolidate_over_budget_in_background())
+
+    async def _consolidate_over_budget_in_background(self) -> None:
+        try:
+            await self.consolidate_over_budget()
+        except MemorySystemError:
+            # Already logged; the next write over budget schedules another attempt.
+            pass
+
+    async def _move_to_long_term(self, memory_ids: List[str]) -> int:
+        # Moves claimed memories and acknowledges the claim; the claim is released on failure.
+        try:
+            await self._long_term_ready()
+            memories = [memory for memory in await self.short_term.get_many(memory_ids) if memory]
+            if memories:
+                # Always read the long-term copy back before the short-term one is deleted,
+                # whatever VECTOR_WRITE_ACK_MODE says.
+                await self.long_term.add_many(memories, ack_mode="verify")
+            # Deleting every claimed ID also drops the index entries of expired memories.
+            await self.short_term.delete_many(memory_ids)
+            self._invalidate(MemoryType.SHORT_TERM, memory_ids)
+        except (RedisMemoryError, VectorMemoryError):
+            await self.short_term.release_consolidation_batch(memory_ids)
+            raise
+
+        await self.short_term.ack_consolidation_batch(memory_ids)
+        return len(memories)
+
     async def forget_old_memories(self, age_limit: timedelta):
         try:
             threshold = datetime.now() - age_limit
+            await self._long_term_ready()
             old_memories = await self.long_term.get_memories_older_than(threshold)
 
-            for memory in old_memories:
-                await self.long_term.delete(memory.id)
+            memory_ids = [str(memory.id) for memory in old_memories]
+            for memory_id in memory_ids:
+                await self.long_term.delete(memory_id)
+            self._invalidate(MemoryType.LONG_TERM, memory_ids)
 
             get_memory_logger().info(
                 f"Forgot {len(old_memories)} old memories for agent: {self.agent_id}"
@@ -217,8 +448,60 @@ class MemorySystem:
             )
             raise MemorySystemError("Failed to forget old memories") from e
 
+    async def _read_through(
+        self,
+        tier: MemoryType,
+        memory_ids: List[str],
+        load_many: Callable[[List[str]], Awaitable[List[Optional[MemoryEntry]]]],
+    ) -> List[Optional[MemoryEntry]]:
+        # Serve what the process-wide cache holds and load the rest in one backend call.
+        keys = [MemoryCache.key(self.agent_id, tier.value, memory_id) for memory_id in memory_ids]
+        memories = [self.cache.get(key) for key in keys]
+        missing = [position for position, memory in enumerate(memories) if memory is None]
+        if not missing:
+            return memories
+
+        epoch = self.cache.epoch(self.agent_id, tier.value)
+        loaded = await load_many([memory_ids[position] for position in missing])
+        for position, memory in zip(missing, loaded):
+            memories[position] = memory
+            self.cache.put(keys[position], memory, epoch)
+        return memories
+
+    async def _search_long_term(self, query: AdvancedSearchQuery) -> List[Dict[str, Any]]:
+        await self._long_term_ready()
+        return await self.long_term.search(query)
+
+    async def _get_long_term_many(self, memory_ids: List[str]) -> List[Optional[MemoryEntry]]:
+        await self._long_term_ready()
+        return [await self.long_term.get(memory_id) for memory_id in memory_ids]
+
+    @staticmethod
+    def _assign_id(memory_entry: MemoryEntry) -> None:
+        # A time-ordered ID taken when the memory is added, unless the caller chose one. Both
+        # tiers store the entry under it, so it survives consolidation.
+        if "id" not in memory_entry.model_fields_set:
+            memory_entry.id = new_memory_id()
+
+    def _invalidate(self, tier: MemoryType, memory_ids: List[str]) -> None:
+        self.cache.invalidate(MemoryCache.key(self.agent_id, tier.value, memory_id) for memory_id in memory_ids)
+
     @classmethod
     async def initialize_memory_systems(cls):
         # This method is called during startup
-        # Implement any global initialization logic here if needed
-        pass
+        try:
+            await redis_pool_manager.initialize()
+        except RedisPoolError as e:
+            # Agents retry the shared pool on first use, so startup can proceed.
+            get_memory_logger().warning(f"Redis unavailable at startup, deferring pool initialization: {str(e)}")
+
+    @classmethod
+    async def close_memory_systems(cls):
+        # This method is called during shutdown to release resources shared by all agents
+        await redis_pool_manager.close()
+        await chroma_registry.close()
+        vector_executor.shutdown()
+        if embedding_service.stats():
+            get_memory_logger().info(f"Embedding model stats: {embedding_service.stats()}")
+            get_memory_logger().info(f"Embedding cache stats: {embedding_cache.stats()}")
+        embedding_cache.close()
@@ -0,0 +1,225 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from redis.asyncio.connection import Connection, parse_url
+from redis.exceptions import ConnectionError, TimeoutError, ResponseError
+from app.config import settings
+from .logger import get_memory_logger
+
+try:
+    # Private redis-py API, checked against redis-py 5.0-5.3. If a release moves
+    # it, ``supported`` reports False and the pool runs without the cache.
+    from redis._parsers import _AsyncRESP3Parser
+except ImportError:
+    _AsyncRESP3Parser = None
+
+# Prefix of every memory entry key; the server reports writes to any of them.
+TRACKED_PREFIX = "agent:"
+
+
+class RedisClientCache:
+    """
+    Process-wide cache of encoded memory entries, kept coherent by the server.
+
+    A dedicated RESP3 connection enables ``CLIENT TRACKING`` in broadcast mode
+    for keys under ``agent:``. The server then pushes an ``invalidate`` message
+    for every write, delete or expiry of such a key, whichever client made it,
+    and the cached value is dropped. Entries are evicted least-recently-used
+    beyond ``max_entries``.
+
+    Values are only cached while the tracking connection is up. Any gap in
+    tracking (disconnect, reconnect, a flush on the server) empties the cache,
+    since invalidations may have been missed.
+
+    A read that misses reserves its key before going to the server and fills it
+    only if no invalidation arrived in the meantime, so a value read before a
+    concurrent write is never cached after that write's invalidation.
+    """
+
+    def __init__(self, url: Optional[str] = None, max_entries: Optional[int] = None):
+        self.url = url or settings.REDIS_URL
+        self.max_entries = settings.REDIS_CLIENT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._reservations: Dict[str, object] = {}
+        self._active = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self._active.is_set()
+
+    @staticmethod
+    def supported() -> bool:
+        """Whether the installed redis-py has the parser internals the cache relies on."""
+        return _AsyncRESP3Parser is not None and hasattr(_AsyncRESP3Parser, "set_invalidation_push_handler")
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """
+        Start tracking invalidations in the background.
+
+        Waits up to ``timeout`` seconds for tracking to be enabled; until then
+        every lookup misses.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._track())
+        try:
+            await asyncio.wait_for(self._active.wait(), timeout)
+        except asyncio.TimeoutError:
+            get_memory_logger().warning("Redis client-side cache not tracking yet, reads go to the server")
+
+    async def close(self) -> None:
+        """Stop tracking and drop every cached value."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._deactivate()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached value of a key, or None on a miss.
+
+        Args:
+            key (str): The memory entry key.
+
+        Returns:
+            Optional[bytes]: The encoded entry, as read from Redis.
+        """
+        value = self._entries.get(key) if self.active else None
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def reserve(self, key: str) -> Optional[object]:
+        """
+        Reserve a key before reading it from the server.
+
+        Returns:
+            Optional[object]: A token for ``fill``, or None if caching is not active.
+        """
+        if not self.active:
+            return None
+        if len(self._reservations) >= self.max_entries:
+            # Reservations of reads that failed are never filled; dropping them
+            # only costs in-flight reads their fill.
+            self._reservations.clear()
+        token = object()
+        self._reservations[key] = token
+        return token
+
+    def fill(self, key: str, token: Optional[object], value: Optional[bytes]) -> None:
+        """
+        Cache a value read from the primary, unless the key changed since ``reserve``.
+
+        Args:
+            key (str): The memory entry key.
+            token (Optional[object]): The token returned by ``reserve``.
+            value (Optional[bytes]): The value read; missing keys are not cached.
+        """
+        if token is None or self._reservations.get(key) is not token:
+            return
+        del self._reservations[key]
+        if value is None or not self.active:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Drop cached values and pending reservations of the given keys."""
+        for key in keys:
+            self._entries.pop(key, None)
+            self._reservations.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit, miss and invalidation counters and the number of cached entries."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "active": int(self.active),
+        }
+
+    def _deactivate(self) -> None:
+        self._active.clear()
+        self._entries.clear()
+        self._reservations.clear()
+
+    async def _on_invalidate(self, response) -> list:
+        self.invalidations += 1
+        keys = response[1]
+        if keys is None:
+            # Sent when the server's keyspace is flushed.
+            self._entries.clear()
+            self._reservations.clear()
+        else:
+            self.invalidate(keys)
+        return response
+
+    async def _track(self) -> None:
+        retry_delay = 1
+        while True:
+            connection = self._create_connection()
+            try:
+                await connection.connect()
+                # redis-py only wires invalidation handlers for its own
+                # (synchronous) cache, so ours is set on the parser directly.
+                connection._parser.set_invalidation_push_handler(self._on_invalidate)
+                await connection.send_command("CLIENT", "TRACKING", "ON", "BCAST", "PREFIX", TRACKED_PREFIX)
+                await connection.read_response()
+
+                self._deactivate()
+                self._active.set()
+                retry_delay = 1
+                get_memory_logger().info(f"Redis client-side cache tracking enabled (max entries: {self.max_entries})")
+
+                interval = settings.REDIS_HEALTH_CHECK_INTERVAL or 30
+                awaiting_pong = False
+                while True:
+                    response = await connection.read_response(
+                        timeout=interval, disconnect_on_error=False, push_request=True
+                    )
+                    if response is None:
+                        if awaiting_pong:
+                            raise TimeoutError(f"No reply to PING within {interval}s")
+                        # Nothing pushed for a while: make sure the link is still alive.
+                        await connection.send_command("PING")
+                        awaiting_pong = True
+                    elif response == "PONG":
+                        awaiting_pong = False
+            except ResponseError as e:
+                get_memory_logger().error(f"Redis client-side caching unavailable, reads go to the server: {str(e)}")
+                self._deactivate()
+                return
+            except (ConnectionError, TimeoutError, OSError) as e:
+                get_memory_logger().warning(f"Redis client-side cache tracking lost, retrying in {retry_delay}s: {str(e)}")
+                self._deactivate()
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+            finally:
+                await connection.disconnect(nowait=True)
+
+    def _create_connection(self) -> Connection:
+        kwargs = parse_url(self.url)
+        connection_class = kwargs.pop("connection_class", Connection)
+        # Invalidations arrive as RESP3 push messages on this connection. The
+        # pure-Python parser is used because it hands push messages to a handler.
+        return connection_class(
+            **kwargs,
+            protocol=3,
+            parser_class=_AsyncRESP3Parser,
+            encoding="utf-8",
+            decode_responses=True,
+            socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+        )
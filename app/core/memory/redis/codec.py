@@ -0,0 +1,178 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Union
+from uuid import UUID
+import msgpack
+from pydantic_core import to_jsonable_python
+from app.core.models import MemoryEntry
+from app.config import settings
+
+# Leading byte identifying the format of a stored value. Values written before
+# the codec layer existed are plain JSON objects and always start with "{".
+LEGACY_JSON_PREFIX = b"{"
+MSGPACK_PREFIX = b"\x01"
+# Flag byte marking a zlib-compressed value; the decompressed payload starts
+# with the prefix of the codec that produced it.
+ZLIB_PREFIX = b"\x02"
+
+
+class RedisCodecError(ValueError):
+    """Custom exception for memory entry encoding and decoding errors."""
+    pass
+
+
+class MemoryCodec(ABC):
+    """Base class for the formats a MemoryEntry can be stored in."""
+
+    name: str = ""
+    prefix: bytes = b""
+
+    @abstractmethod
+    def encode(self, memory_entry: MemoryEntry) -> bytes:
+        """Serialize an entry, including the codec's prefix byte."""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> MemoryEntry:
+        """Parse a value written by ``encode``."""
+
+
+class JsonCodec(MemoryCodec):
+    """
+    The original format: the entry's JSON document, without a prefix byte.
+
+    Decoding goes through pydantic-core's native JSON parser, which is the
+    fastest option for small entries.
+    """
+
+    name = "json"
+    prefix = LEGACY_JSON_PREFIX
+
+    def encode(self, memory_entry: MemoryEntry) -> bytes:
+        return memory_entry.model_dump_json().encode()
+
+    def decode(self, data: bytes) -> MemoryEntry:
+        return MemoryEntry.model_validate_json(data)
+
+
+class MsgpackCodec(MemoryCodec):
+    """
+    A positional MessagePack record behind a one-byte version prefix.
+
+    Field names are not repeated in every value and the ID is stored as its 16
+    raw bytes. Content is copied as-is instead of being JSON-escaped, which
+    makes large entries (tool outputs, documents) several times cheaper to
+    encode and decode than JSON.
+    """
+
+    name = "msgpack"
+    prefix = MSGPACK_PREFIX
+
+    def encode(self, memory_entry: MemoryEntry) -> bytes:
+        context = memory_entry.context
+        return self.prefix + msgpack.packb(
+            [
+                memory_entry.id.bytes,
+                memory_entry.content,
+                memory_entry.metadata,
+                context.context_type,
+                context.timestamp.isoformat(),
+                context.metadata,
+            ],
+            default=to_jsonable_python,
+        )
+
+    def decode(self, data: bytes) -> MemoryEntry:
+        memory_id, content, metadata, context_type, timestamp, context_metadata = msgpack.unpackb(
+            data[len(self.prefix):]
+        )
+        return MemoryEntry.model_validate({
+            "id": UUID(bytes=memory_id),
+            "content": content,
+            "metadata": metadata,
+            "context": {
+                "context_type": context_type,
+                "timestamp": timestamp,
+                "metadata": context_metadata,
+            },
+        })
+
+
+CODECS: Dict[str, MemoryCodec] = {codec.name: codec for codec in (JsonCodec(), MsgpackCodec())}
+
+
+class RedisMemoryCodec:
+    """
+    Encodes memory entries with the configured codec and decodes values
+    written in any known format, so existing entries stay readable after the
+    codec is changed.
+
+    Encoded values of at least ``compression_threshold`` bytes are
+    zlib-compressed behind a flag byte when that makes them smaller; small
+    entries are stored raw so they pay no compression cost.
+    """
+
+    def __init__(
+            self,
+            codec_name: Optional[str] = None,
+            compression_threshold: Optional[int] = None,
+            compression_level: Optional[int] = None,
+    ):
+        codec_name = codec_name or settings.REDIS_MEMORY_CODEC
+        if codec_name not in CODECS:
+            raise RedisCodecError(f"Unknown Redis memory codec: {codec_name}")
+        self.codec = CODECS[codec_name]
+        self.compression_threshold = (
+            settings.REDIS_COMPRESSION_THRESHOLD if compression_threshold is None else compression_threshold
+        )
+        self.compression_level = (
+            settings.REDIS_COMPRESSION_LEVEL if compression_level is None else compression_level
+        )
+        self._readers = {codec.prefix: codec for codec in CODECS.values()}
+
+    def encode(self, memory_entry: MemoryEntry) -> bytes:
+        """
+        Serialize a memory entry for storage.
+
+        Args:
+            memory_entry (MemoryEntry): The memory entry to serialize.
+
+        Returns:
+            bytes: The stored representation, starting with the codec's prefix
+            byte or, if compressed, the compression flag byte.
+        """
+        data = self.codec.encode(memory_entry)
+        if 0 < self.compression_threshold <= len(data):
+            compressed = ZLIB_PREFIX + zlib.compress(data, self.compression_level)
+            if len(compressed) < len(data):
+                return compressed
+        return data
+
+    def decode(self, data: Union[bytes, str]) -> MemoryEntry:
+        """
+        Deserialize a stored value, whatever codec wrote it.
+
+        Args:
+            data (Union[bytes, str]): The stored value.
+
+        Returns:
+            MemoryEntry: The decoded memory entry.
+
+        Raises:
+            RedisCodecError: If the value is in an unknown format or is corrupt.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        if data[:1] == ZLIB_PREFIX:
+            try:
+                data = zlib.decompress(data[1:])
+            except zlib.error as e:
+                raise RedisCodecError(f"Failed to decompress memory entry: {str(e)}") from e
+        reader = self._readers.get(data[:1])
+        if reader is None:
+            raise RedisCodecError(f"Unknown stored memory format (prefix {data[:1]!r})")
+        try:
+            return reader.decode(data)
+        except RedisCodecError:
+            raise
+        except (ValueError, TypeError, msgpack.UnpackException) as e:
+            raise RedisCodecError(f"Failed to decode {reader.name} memory entry: {str(e)}") from e
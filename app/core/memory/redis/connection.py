@@ -1,82 +1,169 @@
 import asyncio
-from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio import ConnectionPool
 from redis.exceptions import ConnectionError, TimeoutError
 from contextlib import asynccontextmanager
 import traceback
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
-from app.config import settings
 from .logger import get_memory_logger
+from .client_cache import RedisClientCache
+from .expiry import EXPIRY_KEY_PREFIX
+from .health import OPEN, RedisCircuitOpenError
+from .pool import RedisPoolManager, RedisPoolError, redis_pool_manager
 
 class RedisConnectionError(Exception):
     """Custom exception for Redis connection errors."""
     pass
 
 class RedisConnection:
-    def __init__(self, agent_id: UUID):
+    """
+    Per-agent view onto the process-wide Redis pool.
+
+    Holds the agent's key prefixes and borrows connections from the shared
+    RedisPoolManager; it owns no sockets of its own.
+
+    Requests consult the pool manager's circuit breaker first, so while Redis
+    is unreachable they fail immediately with RedisConnectionError instead of
+    each waiting on connection timeouts.
+
+    In cluster mode the agent ID in every key is wrapped in a hash tag
+    (``agent:{<agent_id>}:<memory_id>``), so all of an agent's entries,
+    indexes and script keys map to the same slot.
+    """
+
+    def __init__(self, agent_id: UUID, pool_manager: Optional[RedisPoolManager] = None):
         self.agent_id = agent_id
-        self.pool: Optional[ConnectionPool] = None
-        self.max_retries = 3
-        self.retry_delay = 1  # Initial delay in seconds
+        self.pool_manager = pool_manager or redis_pool_manager
+        self.key_tag = f"{{{agent_id}}}" if self.pool_manager.cluster_mode else str(agent_id)
         self._lock = asyncio.Lock()
         self._initialized = asyncio.Event()
 
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        return self.pool_manager.pool
+
+    @property
+    def full_text_search_available(self) -> bool:
+        return self.pool_manager.full_text_search_available
+
+    @property
+    def cluster_mode(self) -> bool:
+        return self.pool_manager.cluster_mode
+
+    @property
+    def client_cache(self) -> Optional[RedisClientCache]:
+        """The shared client-side cache, or None unless REDIS_CLIENT_CACHE_ENABLED."""
+        return self.pool_manager.client_cache
+
+    def memory_key(self, memory_id: str) -> str:
+        """Return the Redis key holding the given memory entry."""
+        return f"agent:{self.key_tag}:{memory_id}"
+
+    def index_key(self, name: str) -> str:
+        """
+        Return the Redis key of a per-agent index structure.
+
+        Index keys live outside the ``agent:{agent_id}:*`` namespace so that
+        pattern scans over memory entries never pick them up.
+        """
+        return f"agent_index:{self.key_tag}:{name}"
+
+    def expiry_key(self, memory_id: str) -> str:
+        """Return the shadow key whose expiry marks the memory entry for consolidation."""
+        return f"{EXPIRY_KEY_PREFIX}:{self.key_tag}:{memory_id}"
+
+    async def scan_memory_keys(self, conn, count: int = 100) -> AsyncIterator[List[str]]:
+        """
+        Iterate over the keys of the agent's memory entries, one SCAN page at a time.
+
+        In cluster mode only the node serving the agent's slot is scanned.
+
+        Args:
+            conn: An open Redis connection.
+            count (int): The SCAN COUNT hint.
+
+        Yields:
+            List[str]: A non-empty page of memory keys.
+        """
+        pattern = f"{self.memory_key('')}*"
+        scan_options = {}
+        if self.cluster_mode:
+            scan_options["target_nodes"] = conn.get_node_from_key(self.memory_key(""))
+        cursor = 0
+        while True:
+            cursor, keys = await conn.scan(cursor, match=pattern, count=count, **scan_options)
+            if isinstance(cursor, dict):
+                # Cluster replies map each scanned node to its cursor.
+                cursor = next(iter(cursor.values()))
+            # SCAN may return an empty page before the iteration is complete.
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+
     async def initialize(self) -> None:
-        """Initialize the Redis connection pool."""
+        """
+        Make sure the shared Redis connection pool is ready for this agent.
+
+        Makes a single attempt: retrying with backoff is left to process
+        startup, so requests never sleep here while Redis is down.
+        """
         async with self._lock:
-            if self._initialized.is_set():
+            if self._initialized.is_set() and self.pool_manager.is_initialized:
                 return
 
-            last_error = None
-            for attempt in range(self.max_retries):
-                try:
-                    get_memory_logger().debug(f"Attempting to initialize Redis connection pool for agent: {self.agent_id} (Attempt {attempt + 1})")
-                    self.pool = ConnectionPool.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-                    # Test the connection
-                    async with Redis(connection_pool=self.pool) as redis:
-                        await redis.ping()
-                        info = await redis.info()
-                    get_memory_logger().info(f"Redis connection pool established for agent: {self.agent_id}")
-                    get_memory_logger().debug(f"Redis version: {info['redis_version']}")
-                    get_memory_logger().debug(f"Connected clients: {info['connected_clients']}")
-                    get_memory_logger().debug(f"Used memory: {info['used_memory_human']}")
-                    self._initialized.set()
-                    return
-                except (ConnectionError, TimeoutError) as e:
-                    last_error = e
-                    get_memory_logger().warning(f"Failed to initialize Redis connection pool (Attempt {attempt + 1}): {str(e)}")
-                    if attempt == self.max_retries - 1:
-                        break
-                    await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
-
-            get_memory_logger().error(f"Failed to initialize Redis connection pool after {self.max_retries} attempts")
-            raise RedisConnectionError(f"Failed to initialize Redis connection pool: {str(last_error)}")
+            try:
+                await self.pool_manager.initialize(max_retries=1)
+            except RedisPoolError as e:
+                raise RedisConnectionError(str(e)) from e
+            self._initialized.set()
+            get_memory_logger().info(f"Redis connection ready for agent: {self.agent_id}")
 
     async def close(self) -> None:
-        """Close the Redis connection pool."""
+        """
+        Release this agent's use of the shared pool.
+
+        The pool itself stays open for other agents; it is closed once at
+        shutdown through RedisPoolManager.close.
+        """
         async with self._lock:
-            if self.pool:
-                try:
-                    await self.pool.disconnect(inuse_connections=True)
-                except Exception as e:
-                    get_memory_logger().error(f"Error while closing Redis connection pool: {str(e)}")
-                finally:
-                    self.pool = None
-                    self._initialized.clear()
-                    get_memory_logger().info(f"Redis connection pool closed for agent: {self.agent_id}")
+            if self._initialized.is_set():
+                self._initialized.clear()
+                get_memory_logger().info(f"Redis connection released for agent: {self.agent_id}")
+
+    def is_primary(self, conn) -> bool:
+        """Whether a connection from ``get_connection`` is to the primary, and so may write."""
+        return self.pool_manager.is_primary(conn)
 
     @asynccontextmanager
-    async def get_connection(self):
-        if not self._initialized.is_set():
+    async def get_connection(self, readonly: bool = False):
+        """
+        Borrow a connection from the shared pool.
+
+        Args:
+            readonly (bool): Whether the block only reads. Read-only blocks may
+                be served by a read replica, depending on REDIS_READ_ROUTING.
+        """
+        health = self.pool_manager.health
+        try:
+            health.before_request()
+        except RedisCircuitOpenError as e:
+            raise RedisConnectionError(str(e)) from e
+
+        if not self._initialized.is_set() or not self.pool_manager.is_initialized:
             await self.initialize()
         try:
-            async with Redis(connection_pool=self.pool) as redis:
+            async with self.pool_manager.acquire(readonly=readonly) as redis:
                 yield redis
+            health.record_success()
         except (ConnectionError, TimeoutError) as e:
+            health.record_failure(e)
             get_memory_logger().error(f"Redis connection error: {str(e)}")
             get_memory_logger().error(f"Traceback: {traceback.format_exc()}")
             raise RedisConnectionError(f"Redis connection error: {str(e)}") from e
         except Exception as e:
+            # The server answered (e.g. with an error reply), so it is reachable.
+            health.record_success()
             get_memory_logger().error(f"Unexpected error during Redis operation: {str(e)}")
             get_memory_logger().error(f"Traceback: {traceback.format_exc()}")
             raise RedisConnectionError(f"Unexpected error during Redis operation: {str(e)}") from e
@@ -85,24 +172,14 @@ class RedisConnection:
         """
         Ensure that the Redis connection pool is initialized and working.
 
+        Relies on the background health monitor instead of a PING per call.
+
         Raises:
-            RedisConnectionError: If the connection pool cannot be established or is not working.
+            RedisConnectionError: If the connection pool cannot be established or the circuit breaker is open.
         """
-        if not self._initialized.is_set():
+        health = self.pool_manager.health
+        if health.state == OPEN:
+            get_memory_logger().error(f"Error ensuring Redis connection: circuit breaker open ({health.last_error})")
+            raise RedisConnectionError(f"Redis connection check failed: circuit breaker open ({health.last_error})")
+        if not self._initialized.is_set() or not self.pool_manager.is_initialized:
             await self.initialize()
-        else:
-            try:
-                async with Redis(connection_pool=self.pool) as redis:
-                    await redis.ping()
-            except Exception as e:
-                get_memory_logger().error(f"Error ensuring Redis connection: {str(e)}")
-                self._initialized.clear()
-                await self.initialize()
-
-    def __del__(self):
-        if self.pool:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                loop.create_task(self.close())
-            else:
-                get_memory_logger().warning(f"Unable to close Redis connection pool for agent: {self.agent_id} (no running event loop)")
@@ -0,0 +1,119 @@
+import time
+from datetime import datetime
+from typing import List
+from app.core.memory.redis.connection import RedisConnection, RedisConnectionError
+from app.core.memory.redis.memory_operations import TIMELINE_INDEX
+from app.core.memory.redis.scripts import CLAIM_CONSOLIDATION_BATCH, CLAIM_CONSOLIDATION_IDS
+from app.utils.logging import memory_logger
+
+PROCESSING_INDEX = "consolidating"
+
+
+class RedisConsolidationError(Exception):
+    """Custom exception for Redis consolidation claim errors."""
+    pass
+
+
+class RedisConsolidationQueue:
+    """
+    Hands out batches of an agent's old short-term memories to consolidators.
+
+    Claimed IDs are recorded in ``agent_index:{agent_id}:consolidating``, a
+    sorted set scored by claim time, by a single server-side script, so
+    concurrent consolidators (e.g. several API workers) never receive the same
+    ID. A batch is acknowledged once its entries are moved, or released to be
+    retried on failure; batches of a consolidator that crashed are claimed
+    again once the visibility timeout has passed.
+    """
+
+    def __init__(self, connection: RedisConnection):
+        self.connection = connection
+
+    async def claim(self, threshold: datetime, batch_size: int, visibility_timeout: int) -> List[str]:
+        """
+        Atomically claim up to ``batch_size`` memories older than the threshold.
+
+        Args:
+            threshold (datetime): Only memories with an older context timestamp are claimed.
+            batch_size (int): The maximum number of memories to claim.
+            visibility_timeout (int): Seconds after which an unacknowledged claim may be handed out again.
+
+        Returns:
+            List[str]: The claimed memory IDs.
+
+        Raises:
+            RedisConsolidationError: If the claim fails.
+        """
+        try:
+            async with self.connection.get_connection() as conn:
+                claim_script = conn.register_script(CLAIM_CONSOLIDATION_BATCH)
+                memory_ids = await claim_script(
+                    keys=[self.connection.index_key(TIMELINE_INDEX), self.connection.index_key(PROCESSING_INDEX)],
+                    args=[threshold.timestamp(), batch_size, time.time(), visibility_timeout],
+                )
+            memory_logger.debug(f"Claimed {len(memory_ids)} memories for consolidation for agent: {self.connection.agent_id}")
+            return memory_ids
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to claim memories for consolidation for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisConsolidationError(f"Failed to claim consolidation batch: {str(e)}") from e
+
+    async def claim_ids(self, memory_ids: List[str], visibility_timeout: int) -> List[str]:
+        """
+        Atomically claim the given memories, skipping those another consolidator holds.
+
+        Args:
+            memory_ids (List[str]): The memory IDs to claim.
+            visibility_timeout (int): Seconds after which an unacknowledged claim may be handed out again.
+
+        Returns:
+            List[str]: The IDs claimed by this call.
+
+        Raises:
+            RedisConsolidationError: If the claim fails.
+        """
+        if not memory_ids:
+            return []
+        try:
+            async with self.connection.get_connection() as conn:
+                claim_script = conn.register_script(CLAIM_CONSOLIDATION_IDS)
+                return await claim_script(
+                    keys=[self.connection.index_key(PROCESSING_INDEX)],
+                    args=[time.time(), visibility_timeout, *memory_ids],
+                )
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to claim memories for consolidation for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisConsolidationError(f"Failed to claim memories: {str(e)}") from e
+
+    async def ack(self, memory_ids: List[str]) -> None:
+        """
+        Mark claimed memories as consolidated.
+
+        Args:
+            memory_ids (List[str]): The IDs of the consolidated memories.
+
+        Raises:
+            RedisConsolidationError: If the acknowledgement fails.
+        """
+        await self._remove_claims(memory_ids, "acknowledge")
+
+    async def release(self, memory_ids: List[str]) -> None:
+        """
+        Give up claimed memories so the next consolidation run retries them.
+
+        Args:
+            memory_ids (List[str]): The IDs of the memories to release.
+
+        Raises:
+            RedisConsolidationError: If the release fails.
+        """
+        await self._remove_claims(memory_ids, "release")
+
+    async def _remove_claims(self, memory_ids: List[str], action: str) -> None:
+        if not memory_ids:
+            return
+        try:
+            async with self.connection.get_connection() as conn:
+                await conn.zrem(self.connection.index_key(PROCESSING_INDEX), *memory_ids)
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to {action} consolidation batch for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisConsolidationError(f"Failed to {action} consolidation batch: {str(e)}") from e
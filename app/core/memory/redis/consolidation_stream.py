@@ -0,0 +1,153 @@
+from typing import List, NamedTuple, Optional
+from redis.exceptions import RedisError, ResponseError
+from app.config import settings
+from .logger import get_memory_logger
+from .pool import RedisPoolManager, redis_pool_manager
+from .scripts import READ_DUE_CONSOLIDATIONS
+
+# Shared by all agents; kept outside the ``agent:*`` namespace so memory scans
+# and client-side cache tracking never see it.
+CONSOLIDATION_STREAM = "consolidation_stream"
+CONSOLIDATION_GROUP = "consolidators"
+
+
+class RedisConsolidationStreamError(Exception):
+    """Custom exception for consolidation stream errors."""
+    pass
+
+
+class ConsolidationMessage(NamedTuple):
+    message_id: str
+    agent_id: str
+    memory_id: str
+
+
+class RedisConsolidationStream:
+    """
+    Durable queue of short-term memories awaiting consolidation.
+
+    Every short-term write appends ``{agent_id, memory_id}`` to a single Redis
+    Stream in the same pipeline as the write. Workers in the
+    ``consolidators`` consumer group receive entries once they are at least
+    CONSOLIDATION_MIN_AGE seconds old, acknowledge them once moved, and take
+    over the entries of a worker that stopped acknowledging after
+    CONSOLIDATION_VISIBILITY_TIMEOUT seconds. Acknowledged entries are deleted,
+    so the stream only holds the backlog; it is also capped at roughly
+    CONSOLIDATION_STREAM_MAX_LENGTH entries.
+
+    Requires Redis 6.2 or later (XAUTOCLAIM, exclusive XRANGE bounds).
+    """
+
+    def __init__(self, pool_manager: Optional[RedisPoolManager] = None, key: str = CONSOLIDATION_STREAM):
+        self.pool_manager = pool_manager or redis_pool_manager
+        self.key = key
+
+    def stage_add(self, pipeline, agent_id, memory_id: str) -> None:
+        """Queue the command appending a memory to the stream on the given pipeline."""
+        pipeline.xadd(
+            self.key,
+            {"agent_id": str(agent_id), "memory_id": memory_id},
+            maxlen=settings.CONSOLIDATION_STREAM_MAX_LENGTH,
+            approximate=True,
+        )
+
+    async def ensure_group(self) -> None:
+        """
+        Create the stream and consumer group if they do not exist yet.
+
+        Raises:
+            RedisConsolidationStreamError: If the group cannot be created.
+        """
+        try:
+            async with self.pool_manager.acquire() as conn:
+                await conn.xgroup_create(self.key, CONSOLIDATION_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise RedisConsolidationStreamError(f"Failed to create consolidation group: {str(e)}") from e
+        except RedisError as e:
+            raise RedisConsolidationStreamError(f"Failed to create consolidation group: {str(e)}") from e
+
+    async def read_due(self, consumer: str, count: int, min_age: int) -> List[ConsolidationMessage]:
+        """
+        Receive up to ``count`` entries added at least ``min_age`` seconds ago.
+
+        Args:
+            consumer (str): The name of the consumer within the group.
+            count (int): The maximum number of entries to receive.
+            min_age (int): The minimum entry age, in seconds.
+
+        Returns:
+            List[ConsolidationMessage]: The delivered entries, oldest first.
+
+        Raises:
+            RedisConsolidationStreamError: If reading fails.
+        """
+        try:
+            async with self.pool_manager.acquire() as conn:
+                read_script = conn.register_script(READ_DUE_CONSOLIDATIONS)
+                reply = await read_script(
+                    keys=[self.key],
+                    args=[CONSOLIDATION_GROUP, consumer, min_age * 1000, count],
+                )
+        except RedisError as e:
+            raise RedisConsolidationStreamError(f"Failed to read consolidation stream: {str(e)}") from e
+
+        if not reply:
+            return []
+        # [[stream, [[message_id, [field, value, ...]], ...]]]
+        return [self._parse(message_id, fields) for message_id, fields in reply[0][1]]
+
+    async def reclaim(self, consumer: str, count: int, min_idle: int) -> List[ConsolidationMessage]:
+        """
+        Take over entries delivered to another consumer that did not acknowledge them in time.
+
+        Args:
+            consumer (str): The name of the consumer taking the entries over.
+            count (int): The maximum number of entries to take over.
+            min_idle (int): Seconds an entry must have been pending.
+
+        Returns:
+            List[ConsolidationMessage]: The entries now delivered to ``consumer``.
+
+        Raises:
+            RedisConsolidationStreamError: If the takeover fails.
+        """
+        try:
+            async with self.pool_manager.acquire() as conn:
+                reply = await conn.xautoclaim(
+                    self.key, CONSOLIDATION_GROUP, consumer, min_idle * 1000, start_id="0-0", count=count
+                )
+                messages = reply[1]
+                # Entries trimmed from the stream while pending come back without fields.
+                trimmed = [message_id for message_id, fields in messages if not fields]
+                if trimmed:
+                    await conn.xack(self.key, CONSOLIDATION_GROUP, *trimmed)
+        except RedisError as e:
+            raise RedisConsolidationStreamError(f"Failed to reclaim consolidation entries: {str(e)}") from e
+
+        return [self._parse(message_id, fields) for message_id, fields in messages if fields]
+
+    async def ack(self, message_ids: List[str]) -> None:
+        """
+        Acknowledge and delete processed entries.
+
+        Raises:
+            RedisConsolidationStreamError: If the acknowledgement fails.
+        """
+        if not message_ids:
+            return
+        try:
+            async with self.pool_manager.acquire() as conn:
+                pipeline = conn.pipeline()
+                pipeline.xack(self.key, CONSOLIDATION_GROUP, *message_ids)
+                pipeline.xdel(self.key, *message_ids)
+                await pipeline.execute()
+        except RedisError as e:
+            raise RedisConsolidationStreamError(f"Failed to acknowledge consolidation entries: {str(e)}") from e
+        get_memory_logger().debug(f"Acknowledged {len(message_ids)} consolidation stream entries")
+
+    @staticmethod
+    def _parse(message_id: str, fields) -> ConsolidationMessage:
+        if isinstance(fields, list):
+            fields = dict(zip(fields[::2], fields[1::2]))
+        return ConsolidationMessage(message_id, fields["agent_id"], fields["memory_id"])
@@ -0,0 +1,189 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError, TimeoutError, ResponseError
+from app.config import settings
+from .logger import get_memory_logger
+
+# Shadow keys live outside the ``agent:*`` namespace, so memory scans and
+# client-side cache tracking never see them.
+EXPIRY_KEY_PREFIX = "agent_expiry"
+# Keyevent notifications (E) for expired keys (x).
+NOTIFY_FLAGS = "Ex"
+
+
+class RedisExpiryListenerError(Exception):
+    """Custom exception for expiry listener errors."""
+    pass
+
+
+class RedisExpiryListener:
+    """
+    Reports short-term memories whose retention period has ended.
+
+    With CONSOLIDATION_ON_EXPIRY_ENABLED every short-term write also sets a
+    shadow key ``agent_expiry:{agent_id}:{memory_id}`` that expires after
+    SHORT_TERM_MEMORY_TTL seconds, while the entry itself is kept for another
+    CONSOLIDATION_EXPIRY_GRACE seconds. This listener subscribes to the
+    server's ``expired`` keyevent notifications and queues the agent and
+    memory ID of every shadow key that expires, so exactly those memories are
+    consolidated while their entries are still readable.
+
+    Notifications are not persisted: events published while no listener is
+    subscribed are lost. Such memories are still picked up by
+    ``consolidate_memories`` within the grace period.
+
+    Keyevent notifications are enabled on the server if needed. Where CONFIG
+    is not available (e.g. managed services), ``notify-keyspace-events`` must
+    include ``Ex`` in the server configuration.
+
+    Only a single primary is supported; in cluster mode each node publishes
+    only its own expirations.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or settings.REDIS_URL
+        self._expired: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+        self._subscribed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscribed(self) -> bool:
+        return self._subscribed.is_set()
+
+    async def start(self, timeout: float = 5.0) -> None:
+        """
+        Start listening for expirations in the background.
+
+        Waits up to ``timeout`` seconds for the subscription to be in place.
+
+        Raises:
+            RedisExpiryListenerError: In cluster mode.
+        """
+        if settings.REDIS_CLUSTER_MODE:
+            raise RedisExpiryListenerError("Expiry-driven consolidation requires a single Redis primary")
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout)
+        except asyncio.TimeoutError:
+            get_memory_logger().warning("Not subscribed to Redis expiry notifications yet")
+
+    async def stop(self) -> None:
+        """Stop listening for expirations."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._subscribed.clear()
+
+    async def next_batch(self, max_items: int, timeout: float) -> Dict[str, List[str]]:
+        """
+        Wait for expired memories and return those queued so far.
+
+        Args:
+            max_items (int): The maximum number of memories to return.
+            timeout (float): Seconds to wait for the first expiration.
+
+        Returns:
+            Dict[str, List[str]]: Expired memory IDs by agent ID; empty if none expired in time.
+        """
+        try:
+            agent_id, memory_id = await asyncio.wait_for(self._expired.get(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+
+        batch: Dict[str, List[str]] = defaultdict(list)
+        batch[agent_id].append(memory_id)
+        for _ in range(max_items - 1):
+            try:
+                agent_id, memory_id = self._expired.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            batch[agent_id].append(memory_id)
+        return dict(batch)
+
+    @staticmethod
+    def parse_key(key: str) -> Optional[Tuple[str, str]]:
+        """
+        Split a shadow key into its agent and memory IDs.
+
+        Returns:
+            Optional[Tuple[str, str]]: ``(agent_id, memory_id)``, or None for any other key.
+        """
+        if not isinstance(key, str):
+            return None
+        prefix, _, rest = key.partition(":")
+        key_tag, _, memory_id = rest.rpartition(":")
+        if prefix != EXPIRY_KEY_PREFIX or not key_tag or not memory_id:
+            return None
+        # Cluster deployments wrap the agent ID in a hash tag.
+        return key_tag.strip("{}"), memory_id
+
+    async def _listen(self) -> None:
+        retry_delay = 1
+        while True:
+            # Pub/sub connections send their own PINGs every health check interval.
+            client = Redis.from_url(
+                self.url,
+                decode_responses=True,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+            )
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Re-checked on every reconnect, as a restarted server may have lost a runtime setting.
+                await self._enable_notifications(client)
+                db = client.connection_pool.connection_kwargs.get("db", 0)
+                await pubsub.subscribe(f"__keyevent@{db}__:expired")
+                self._subscribed.set()
+                retry_delay = 1
+                get_memory_logger().info(f"Listening for Redis expiry notifications on db {db}")
+
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    expired = self.parse_key(message["data"])
+                    if expired:
+                        self._expired.put_nowait(expired)
+            except (ConnectionError, TimeoutError, OSError) as e:
+                self._subscribed.clear()
+                get_memory_logger().warning(
+                    f"Redis expiry notifications lost, retrying in {retry_delay}s: {str(e)}"
+                )
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+            except Exception as e:
+                # E.g. SUBSCRIBE refused by an ACL; keep retrying rather than leave workers
+                # polling a queue that is never filled again.
+                self._subscribed.clear()
+                get_memory_logger().error(
+                    f"Redis expiry listener failed, retrying in {retry_delay}s: {str(e)}", exc_info=True
+                )
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    @staticmethod
+    async def _enable_notifications(client: Redis) -> None:
+        try:
+            flags = (await client.config_get("notify-keyspace-events")).get("notify-keyspace-events", "")
+            # "A" is an alias for every event class, including expired ("x").
+            missing = "".join(
+                flag for flag in NOTIFY_FLAGS if flag not in flags and not (flag == "x" and "A" in flags)
+            )
+            if missing:
+                await client.config_set("notify-keyspace-events", flags + missing)
+                get_memory_logger().info(f"Enabled Redis keyspace notifications: {flags + missing}")
+        except ResponseError as e:
+            get_memory_logger().warning(
+                f"Could not enable Redis expiry notifications, make sure notify-keyspace-events "
+                f"includes '{NOTIFY_FLAGS}': {str(e)}"
+            )
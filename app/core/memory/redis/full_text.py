@@ -0,0 +1,193 @@
+import re
+from typing import Any, Dict, List, Optional
+from redis.exceptions import ResponseError
+from redis.commands.search.field import NumericField, TagField, TextField
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+from app.api.models.memory import AdvancedSearchQuery
+from app.core.models import MemoryEntry
+from app.core.memory.redis.connection import RedisConnection
+from app.utils.logging import memory_logger
+
+FULL_TEXT_INDEX_NAME = "idx:agent_memories:v2"
+# Earlier schemas over the same documents, dropped (keeping the documents) once the current index exists.
+LEGACY_FULL_TEXT_INDEX_NAMES = ["idx:agent_memories"]
+DOCUMENT_PREFIX = "agent_doc:"
+METADATA_SEPARATOR = "|"
+
+_TAG_SPECIAL_CHARACTERS = re.compile(r"([^\w])")
+
+
+def _escape(value: str) -> str:
+    """Escape punctuation and whitespace so a value is matched literally by the query parser."""
+    return _TAG_SPECIAL_CHARACTERS.sub(r"\\\1", value)
+
+
+def _metadata_tag(key: Any, value: Any) -> str:
+    """
+    Build the ``key=value`` tag of a metadata pair.
+
+    The tag separator and ``=`` are percent-encoded (and ``%`` itself), so a
+    key or value containing them stays a single, unambiguous tag.
+    """
+    def encode(part: Any) -> str:
+        return str(part).replace("%", "%25").replace(METADATA_SEPARATOR, "%7C").replace("=", "%3D")
+    return f"{encode(key)}={encode(value)}"
+
+
+class RedisFullTextIndex:
+    """
+    Server-side full-text and filter index backed by a search module.
+
+    Every memory entry is mirrored into a small hash at
+    ``agent_doc:{agent_id}:{memory_id}`` holding the indexed fields only:
+    content (TEXT), context_type (TAG), timestamp (NUMERIC), metadata
+    (TAG of ``key=value`` pairs) and agent_id (TAG). A single index covers the
+    documents of all agents; queries are scoped with an agent_id filter.
+
+    The mirror holds a second, uncompressed copy of every entry's content, so
+    short-term memories take roughly twice the Redis memory. The index is
+    therefore only used when REDIS_FULL_TEXT_SEARCH_ENABLED is set and a
+    search module is loaded.
+    """
+
+    def __init__(self, connection: RedisConnection):
+        self.connection = connection
+
+    def document_key(self, memory_id: str) -> str:
+        return f"{DOCUMENT_PREFIX}{self.connection.agent_id}:{memory_id}"
+
+    @staticmethod
+    async def ensure_index(conn) -> bool:
+        """
+        Create the shared full-text index if it does not exist yet.
+
+        Args:
+            conn: An open Redis connection.
+
+        Returns:
+            bool: True if the index exists or was created, False if the search
+            module rejected the schema.
+        """
+        index = conn.ft(FULL_TEXT_INDEX_NAME)
+        try:
+            await index.info()
+            return True
+        except ResponseError:
+            pass
+
+        try:
+            # Tags are case-sensitive so filters match exactly, as on the scan and keyword paths.
+            await index.create_index(
+                [
+                    TagField("agent_id", case_sensitive=True),
+                    TextField("content"),
+                    TagField("context_type", case_sensitive=True),
+                    NumericField("timestamp", sortable=True),
+                    TagField("metadata", separator=METADATA_SEPARATOR, case_sensitive=True),
+                ],
+                definition=IndexDefinition(prefix=[DOCUMENT_PREFIX], index_type=IndexType.HASH),
+            )
+            memory_logger.info(f"Created full-text index: {FULL_TEXT_INDEX_NAME}")
+        except ResponseError as e:
+            if "already exists" not in str(e).lower():
+                memory_logger.warning(f"Search module rejected full-text index schema, falling back to scan search: {str(e)}")
+                return False
+
+        for legacy_name in LEGACY_FULL_TEXT_INDEX_NAMES:
+            try:
+                await conn.ft(legacy_name).dropindex(delete_documents=False)
+                memory_logger.info(f"Dropped superseded full-text index: {legacy_name}")
+            except ResponseError:
+                pass
+        return True
+
+    def stage_add(self, pipeline, memory_id: str, memory_entry: MemoryEntry, expire: Optional[int] = None) -> None:
+        """
+        Queue the commands indexing a memory entry on the given pipeline.
+
+        Args:
+            pipeline: The Redis pipeline the commands are added to.
+            memory_id (str): The ID of the memory entry.
+            memory_entry (MemoryEntry): The memory entry to index.
+            expire (Optional[int]): The expiration time in seconds, matching the entry's.
+        """
+        document_key = self.document_key(memory_id)
+        pipeline.hset(document_key, mapping={
+            "agent_id": str(self.connection.agent_id),
+            "content": memory_entry.content,
+            "context_type": memory_entry.context.context_type,
+            "timestamp": memory_entry.context.timestamp.timestamp(),
+            "metadata": METADATA_SEPARATOR.join(
+                _metadata_tag(key, value) for key, value in (memory_entry.metadata or {}).items()
+            ),
+        })
+        if expire:
+            pipeline.expire(document_key, expire)
+
+    def stage_remove(self, pipeline, memory_id: str) -> None:
+        """Queue the command unindexing a memory entry on the given pipeline."""
+        pipeline.delete(self.document_key(memory_id))
+
+    def build_query(self, query: AdvancedSearchQuery) -> str:
+        """
+        Translate an AdvancedSearchQuery into a search module query string.
+
+        Args:
+            query (AdvancedSearchQuery): The search query parameters.
+
+        Returns:
+            str: The query string, always scoped to this agent.
+        """
+        clauses = [f"@agent_id:{{{_escape(str(self.connection.agent_id))}}}"]
+        if query.context_type:
+            clauses.append(f"@context_type:{{{_escape(query.context_type)}}}")
+        if query.time_range:
+            start = query.time_range["start"].timestamp()
+            end = query.time_range["end"].timestamp()
+            clauses.append(f"@timestamp:[{start} {end}]")
+        if query.metadata_filters:
+            for key, value in query.metadata_filters.items():
+                clauses.append(f"@metadata:{{{_escape(_metadata_tag(key, value))}}}")
+        terms = [_escape(term) for term in query.query.lower().split()]
+        if terms:
+            clauses.append(f"@content:({'|'.join(terms)})")
+        return " ".join(clauses)
+
+    async def search(self, conn, query: AdvancedSearchQuery, offset: int = 0, num: Optional[int] = None) -> List[str]:
+        """
+        Run a query against the full-text index.
+
+        Args:
+            conn: An open Redis connection.
+            query (AdvancedSearchQuery): The search query parameters.
+            offset (int): The number of matches to skip.
+            num (Optional[int]): The number of matches to return. Defaults to ``query.max_results``.
+
+        Returns:
+            List[str]: The IDs of the matching memories, in the search module's score order.
+        """
+        num = query.max_results if num is None else num
+        search_query = Query(self.build_query(query)).no_content().paging(offset, num)
+        result = await conn.ft(FULL_TEXT_INDEX_NAME).search(search_query)
+        prefix = self.document_key("")
+        return [document.id[len(prefix):] for document in result.docs]
+
+
+async def detect_search_module(conn) -> bool:
+    """
+    Check whether the server has a search module (RediSearch or valkey-search) loaded.
+
+    Args:
+        conn: An open Redis connection.
+
+    Returns:
+        bool: True if FT.* commands are available.
+    """
+    try:
+        modules: List[Dict[str, Any]] = await conn.module_list()
+    except ResponseError:
+        # MODULE LIST may be disabled by ACLs on managed deployments.
+        return False
+    names = {str(module.get("name", "")).lower() for module in modules}
+    return bool(names & {"search", "ft"})
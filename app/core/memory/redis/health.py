@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+from app.config import settings
+from .logger import get_memory_logger
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RedisCircuitOpenError(Exception):
+    """Raised instead of contacting Redis while the circuit breaker is open."""
+    pass
+
+
+class RedisHealthMonitor:
+    """
+    Tracks whether Redis is reachable and fails requests fast while it is not.
+
+    State moves between:
+
+    - ``healthy``: the last request or health check succeeded.
+    - ``degraded``: recent failures, fewer than ``failure_threshold`` in a row;
+      requests still go through.
+    - ``open``: ``failure_threshold`` consecutive failures. Requests raise
+      RedisCircuitOpenError without touching the network.
+    - ``half_open``: ``reset_timeout`` seconds after opening, a single request
+      is let through as a trial; its outcome closes or re-opens the circuit.
+
+    A background task PINGs the server every ``interval`` seconds, so the
+    circuit also opens while idle and closes as soon as the server is back,
+    without any request paying for the check.
+    """
+
+    def __init__(
+            self,
+            failure_threshold: Optional[int] = None,
+            reset_timeout: Optional[float] = None,
+            interval: Optional[float] = None,
+    ):
+        self.failure_threshold = (
+            settings.REDIS_CIRCUIT_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        )
+        self.reset_timeout = settings.REDIS_CIRCUIT_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self.interval = settings.REDIS_HEALTH_MONITOR_INTERVAL if interval is None else interval
+        self.state = HEALTHY
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self._opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def before_request(self) -> None:
+        """
+        Admit a request, or fail it immediately while the circuit is open.
+
+        Raises:
+            RedisCircuitOpenError: If the circuit is open, or half-open with a trial in flight.
+        """
+        if self.state in (HEALTHY, DEGRADED):
+            return
+        now = time.monotonic()
+        if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN and (
+                self._trial_started_at is None or now - self._trial_started_at >= self.reset_timeout
+        ):
+            # A trial that never reported back (e.g. a cancelled request) is replaced.
+            self._trial_started_at = now
+            return
+        raise RedisCircuitOpenError(f"Redis circuit breaker is open: {self.last_error}")
+
+    def record_success(self) -> None:
+        """Record that Redis answered, closing the circuit."""
+        self.consecutive_failures = 0
+        self._trial_started_at = None
+        if self.state != HEALTHY:
+            self._set_state(HEALTHY)
+
+    def record_failure(self, error: Exception) -> None:
+        """Record a connection failure, opening the circuit after enough of them in a row."""
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        self._trial_started_at = None
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self.state != OPEN:
+                self._set_state(OPEN)
+        elif self.state == HEALTHY:
+            self._set_state(DEGRADED)
+
+    def start(self, probe: Callable[[], Awaitable[None]]) -> None:
+        """
+        Start the background health checks.
+
+        Args:
+            probe (Callable[[], Awaitable[None]]): Contacts Redis once, raising on failure.
+        """
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(probe))
+
+    async def stop(self) -> None:
+        """Stop the background health checks."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, probe: Callable[[], Awaitable[None]]) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.wait_for(probe(), timeout=self.interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.record_failure(e)
+            else:
+                self.record_success()
+
+    def _set_state(self, state: str) -> None:
+        previous, self.state = self.state, state
+        if state == OPEN:
+            get_memory_logger().error(
+                f"Redis circuit breaker opened after {self.consecutive_failures} consecutive failures: {self.last_error}"
+            )
+        elif state == HEALTHY and previous in (OPEN, HALF_OPEN):
+            get_memory_logger().info("Redis circuit breaker closed, Redis reachable again")
+        elif state == DEGRADED:
+            get_memory_logger().warning(f"Redis health degraded: {self.last_error}")
+        else:
+            get_memory_logger().info(f"Redis health state changed from {previous} to {state}")
@@ -0,0 +1,101 @@
+from collections import Counter
+from typing import List, Set, Tuple
+from app.core.models import MemoryEntry
+from app.core.memory.redis.connection import RedisConnection
+
+class RedisKeywordIndex:
+    """
+    Per-agent inverted index mapping content tokens to memory IDs.
+
+    Each token is stored as a set at ``agent_index:{agent_id}:kw:{token}``
+    holding the IDs of the memories containing it. The tokens of each memory
+    are kept alongside at ``agent_index:{agent_id}:kw_doc:{memory_id}`` so a
+    memory can be unindexed without reading and parsing its content.
+    """
+
+    def __init__(self, connection: RedisConnection):
+        self.connection = connection
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split text into lower-cased tokens, matching the relevance calculation."""
+        return text.lower().split()
+
+    def token_key(self, token: str) -> str:
+        return self.connection.index_key(f"kw:{token}")
+
+    def document_key(self, memory_id: str) -> str:
+        return self.connection.index_key(f"kw_doc:{memory_id}")
+
+    def stage_add(self, pipeline, memory_id: str, memory_entry: MemoryEntry) -> None:
+        """
+        Queue the commands indexing a memory entry on the given pipeline.
+
+        Args:
+            pipeline: The Redis pipeline the commands are added to.
+            memory_id (str): The ID of the memory entry.
+            memory_entry (MemoryEntry): The memory entry to index.
+        """
+        tokens: Set[str] = set(self.tokenize(memory_entry.content))
+        if not tokens:
+            return
+        for token in tokens:
+            pipeline.sadd(self.token_key(token), memory_id)
+        pipeline.sadd(self.document_key(memory_id), *tokens)
+
+    async def remove(self, conn, *memory_ids: str) -> None:
+        """
+        Remove memory entries from the index.
+
+        Args:
+            conn: An open Redis connection.
+            *memory_ids (str): The IDs of the memory entries to unindex.
+        """
+        if not memory_ids:
+            return
+        pipeline = conn.pipeline()
+        for memory_id in memory_ids:
+            pipeline.smembers(self.document_key(memory_id))
+        token_sets = await pipeline.execute()
+
+        pipeline = conn.pipeline()
+        for memory_id, tokens in zip(memory_ids, token_sets):
+            for token in tokens:
+                pipeline.srem(self.token_key(token), memory_id)
+            pipeline.delete(self.document_key(memory_id))
+        await pipeline.execute()
+
+    async def score_candidates(self, conn, query_text: str) -> List[Tuple[str, float]]:
+        """
+        Score every memory sharing at least one token with the query.
+
+        The score is the fraction of query keywords present in the memory,
+        which is what ``RedisSearch._calculate_relevance`` computes from the
+        content, derived here from the index alone.
+
+        Args:
+            conn: An open Redis connection.
+            query_text (str): The raw query text.
+
+        Returns:
+            List[Tuple[str, float]]: (memory_id, relevance) pairs, most relevant first.
+        """
+        keywords = self.tokenize(query_text)
+        if not keywords:
+            return []
+
+        weights = Counter(keywords)
+        pipeline = conn.pipeline()
+        for token in weights:
+            pipeline.smembers(self.token_key(token))
+        members = await pipeline.execute()
+
+        matches: Counter = Counter()
+        for token, memory_ids in zip(weights, members):
+            for memory_id in memory_ids:
+                matches[memory_id] += weights[token]
+
+        return [
+            (memory_id, count / len(keywords))
+            for memory_id, count in matches.most_common()
+        ]
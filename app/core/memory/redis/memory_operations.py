@@ -1,8 +1,25 @@
-from typing import Optional
-from uuid import UUID
+import time
+from typing import List, Optional
 from app.api.models.memory import MemoryEntry
 from app.core.memory.redis.connection import RedisConnection, RedisConnectionError
+from app.core.memory.redis.keyword_index import RedisKeywordIndex
+from app.core.memory.redis.full_text import RedisFullTextIndex
+from app.core.memory.redis.consolidation_stream import RedisConsolidationStream
+from app.core.memory.redis.storage import RedisMemoryStore
+from app.core.memory.redis.usage import RedisMemoryUsage, MemoryUsage, USAGE_INDEX, SIZES_INDEX
+from app.core.memory.redis.scripts import PRUNE_EXPIRED_MEMORIES
 from app.utils.logging import memory_logger
+from app.config import settings
+
+TIMELINE_INDEX = "timeline"
+# Memory IDs are time-ordered, so this sorted set, with every member scored 0,
+# lists them in write order for ZRANGEBYLEX cursors.
+ID_INDEX = "ids"
+# Entries written with a TTL, scored by the time they expire. Every write prunes
+# up to PRUNE_BATCH_SIZE expired members from the agent's indexes, so indexes of
+# TTL'd memories stay bounded even when reads are served by replicas, which never prune.
+EXPIRY_INDEX = "expiries"
+PRUNE_BATCH_SIZE = 100
 
 class RedisMemoryOperationsError(Exception):
     """Custom exception for Redis memory operations errors."""
@@ -11,11 +28,30 @@ class RedisMemoryOperationsError(Exception):
 class RedisMemoryOperations:
     def __init__(self, connection: RedisConnection):
         self.connection = connection
+        self.keyword_index = RedisKeywordIndex(connection)
+        self.full_text_index = RedisFullTextIndex(connection)
+        self.store = RedisMemoryStore(connection)
+        self.consolidation_stream = RedisConsolidationStream(connection.pool_manager)
+        self.usage = RedisMemoryUsage(connection)
+        # Totals returned by the most recent write or delete, for budget checks without a round trip.
+        self.last_usage: Optional[MemoryUsage] = None
 
     async def add(self, memory_entry: MemoryEntry, expire: Optional[int] = None) -> str:
         """
         Add a memory entry to Redis.
 
+        The entry is also recorded in the agent's timeline index (a sorted set
+        scored by the context timestamp), its ID and expiry indexes and, when
+        enabled, the keyword and full-text indexes and the consolidation stream,
+        and accounted for in the agent's usage totals, within the same
+        transaction. Entries of the agent that have expired are pruned from the
+        indexes and totals in the same transaction.
+
+        With CONSOLIDATION_ON_EXPIRY_ENABLED, a shadow key expiring after
+        ``expire`` (default SHORT_TERM_MEMORY_TTL) seconds is written as well,
+        and the entry itself is kept CONSOLIDATION_EXPIRY_GRACE seconds longer
+        so it can still be consolidated once the shadow key expires.
+
         Args:
             memory_entry (MemoryEntry): The memory entry to add.
             expire (Optional[int]): The expiration time in seconds.
@@ -26,14 +62,19 @@ class RedisMemoryOperations:
         Raises:
             RedisMemoryOperationsError: If there's an error adding the memory entry.
         """
-        memory_id = str(UUID(int=0))  # Generate a new UUID
-        full_key = f"agent:{self.connection.agent_id}:{memory_id}"
+        memory_id = str(memory_entry.id)
+        full_key = self.connection.memory_key(memory_id)
 
         try:
             async with self.connection.get_connection() as conn:
-                await conn.set(full_key, memory_entry.model_dump_json())
-                if expire:
-                    await conn.expire(full_key, expire)
+                pipeline = conn.pipeline()
+                size = self._stage_add(pipeline, memory_id, memory_entry, expire)
+                self._stage_prune(pipeline)
+                self.usage.stage_record(pipeline, {memory_id: size})
+                results = await pipeline.execute()
+                await self._unindex_pruned(conn, results[-2])
+            self.last_usage = RedisMemoryUsage.parse(results[-1])
+            self._invalidate_cached([memory_id])
 
             memory_logger.debug(f"Added memory to Redis: {full_key}")
             return memory_id
@@ -41,6 +82,45 @@ class RedisMemoryOperations:
             memory_logger.error(f"Failed to add memory to Redis: {full_key}. Error: {str(e)}")
             raise RedisMemoryOperationsError(f"Failed to add memory: {str(e)}") from e
 
+    async def add_many(self, memory_entries: List[MemoryEntry], expire: Optional[int] = None) -> List[str]:
+        """
+        Add a batch of memory entries to Redis in a single round trip.
+
+        Args:
+            memory_entries (List[MemoryEntry]): The memory entries to add.
+            expire (Optional[int]): The expiration time in seconds, applied to every entry.
+
+        Returns:
+            List[str]: The IDs of the added memory entries, in input order.
+
+        Raises:
+            RedisMemoryOperationsError: If there's an error adding the memory entries.
+        """
+        if not memory_entries:
+            return []
+
+        memory_ids = [str(memory_entry.id) for memory_entry in memory_entries]
+
+        try:
+            async with self.connection.get_connection() as conn:
+                pipeline = conn.pipeline()
+                sizes = {
+                    memory_id: self._stage_add(pipeline, memory_id, memory_entry, expire)
+                    for memory_id, memory_entry in zip(memory_ids, memory_entries)
+                }
+                self._stage_prune(pipeline)
+                self.usage.stage_record(pipeline, sizes)
+                results = await pipeline.execute()
+                await self._unindex_pruned(conn, results[-2])
+            self.last_usage = RedisMemoryUsage.parse(results[-1])
+            self._invalidate_cached(memory_ids)
+
+            memory_logger.debug(f"Added {len(memory_ids)} memories to Redis for agent: {self.connection.agent_id}")
+            return memory_ids
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to add {len(memory_ids)} memories to Redis for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisMemoryOperationsError(f"Failed to add memories: {str(e)}") from e
+
     async def get(self, memory_id: str) -> Optional[MemoryEntry]:
         """
         Retrieve a memory entry from Redis.
@@ -54,14 +134,13 @@ class RedisMemoryOperations:
         Raises:
             RedisMemoryOperationsError: If there's an error retrieving the memory entry.
         """
-        full_key = f"agent:{self.connection.agent_id}:{memory_id}"
+        full_key = self.connection.memory_key(memory_id)
 
         try:
-            async with self.connection.get_connection() as conn:
-                value = await conn.get(full_key)
+            value = (await self._read_values([memory_id]))[0]
 
             if value:
-                return MemoryEntry.model_validate_json(value)
+                return self.store.codec.decode(value)
             return None
         except RedisConnectionError as e:
             memory_logger.error(f"Failed to retrieve memory from Redis: {full_key}. Error: {str(e)}")
@@ -70,9 +149,36 @@ class RedisMemoryOperations:
             memory_logger.error(f"Failed to parse memory data from Redis: {full_key}. Error: {str(e)}")
             raise RedisMemoryOperationsError(f"Failed to parse memory data: {str(e)}") from e
 
+    async def get_many(self, memory_ids: List[str]) -> List[Optional[MemoryEntry]]:
+        """
+        Retrieve a batch of memory entries from Redis in a single round trip.
+
+        Args:
+            memory_ids (List[str]): The IDs of the memory entries to retrieve.
+
+        Returns:
+            List[Optional[MemoryEntry]]: The retrieved entries in input order, None for missing IDs.
+
+        Raises:
+            RedisMemoryOperationsError: If there's an error retrieving the memory entries.
+        """
+        if not memory_ids:
+            return []
+
+        try:
+            values = await self._read_values(memory_ids)
+
+            return [self.store.codec.decode(value) if value else None for value in values]
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to retrieve {len(memory_ids)} memories from Redis for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisMemoryOperationsError(f"Failed to retrieve memories: {str(e)}") from e
+        except ValueError as e:
+            memory_logger.error(f"Failed to parse memory data from Redis for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisMemoryOperationsError(f"Failed to parse memory data: {str(e)}") from e
+
     async def delete(self, memory_id: str) -> None:
         """
-        Delete a memory entry from Redis.
+        Delete a memory entry from Redis and remove it from the agent's indexes.
 
         Args:
             memory_id (str): The ID of the memory entry to delete.
@@ -80,13 +186,144 @@ class RedisMemoryOperations:
         Raises:
             RedisMemoryOperationsError: If there's an error deleting the memory entry.
         """
-        full_key = f"agent:{self.connection.agent_id}:{memory_id}"
+        full_key = self.connection.memory_key(memory_id)
 
         try:
             async with self.connection.get_connection() as conn:
-                await conn.delete(full_key)
+                await self._delete(conn, [memory_id])
 
             memory_logger.debug(f"Deleted memory from Redis: {full_key}")
         except RedisConnectionError as e:
             memory_logger.error(f"Failed to delete memory from Redis: {full_key}. Error: {str(e)}")
             raise RedisMemoryOperationsError(f"Failed to delete memory: {str(e)}") from e
+
+    async def delete_many(self, memory_ids: List[str]) -> None:
+        """
+        Delete a batch of memory entries from Redis and the agent's indexes.
+
+        Keys are removed with UNLINK so large values are reclaimed off the
+        server's main thread.
+
+        Args:
+            memory_ids (List[str]): The IDs of the memory entries to delete.
+
+        Raises:
+            RedisMemoryOperationsError: If there's an error deleting the memory entries.
+        """
+        if not memory_ids:
+            return
+
+        try:
+            async with self.connection.get_connection() as conn:
+                await self._delete(conn, memory_ids, unlink=True)
+
+            memory_logger.debug(f"Deleted {len(memory_ids)} memories from Redis for agent: {self.connection.agent_id}")
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to delete {len(memory_ids)} memories from Redis for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisMemoryOperationsError(f"Failed to delete memories: {str(e)}") from e
+
+    async def _read_values(self, memory_ids: List[str]) -> List[Optional[bytes]]:
+        """
+        Read encoded entries, serving those held by the client-side cache locally.
+
+        Only values read from the primary are cached; the invalidations keeping
+        the cache coherent come from the primary, which replicas may trail.
+        """
+        cache = self.connection.client_cache
+        if cache is None:
+            async with self.connection.get_connection(readonly=True) as conn:
+                return await self.store.read_values(conn, memory_ids)
+
+        keys = [self.connection.memory_key(memory_id) for memory_id in memory_ids]
+        values = [cache.get(key) for key in keys]
+        missing = [position for position, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+
+        tokens = [cache.reserve(keys[position]) for position in missing]
+        async with self.connection.get_connection(readonly=True) as conn:
+            fetched = await self.store.read_values(conn, [memory_ids[position] for position in missing])
+            from_primary = self.connection.is_primary(conn)
+        for position, token, value in zip(missing, tokens, fetched):
+            values[position] = value
+            if from_primary:
+                cache.fill(keys[position], token, value)
+        return values
+
+    def _invalidate_cached(self, memory_ids: List[str]) -> None:
+        """
+        Drop written or deleted entries from the client-side cache.
+
+        The server's invalidation arrives asynchronously; dropping them here
+        as well makes this process read its own writes.
+        """
+        cache = self.connection.client_cache
+        if cache is not None:
+            cache.invalidate(self.connection.memory_key(memory_id) for memory_id in memory_ids)
+
+    def _stage_add(self, pipeline, memory_id: str, memory_entry: MemoryEntry, expire: Optional[int]) -> int:
+        """Queue the commands storing and indexing a memory entry on the given pipeline, returning its encoded size."""
+        if settings.CONSOLIDATION_ON_EXPIRY_ENABLED:
+            ttl = expire or settings.SHORT_TERM_MEMORY_TTL
+            pipeline.set(self.connection.expiry_key(memory_id), "", ex=ttl)
+            expire = ttl + settings.CONSOLIDATION_EXPIRY_GRACE
+        size = self.store.stage_write(pipeline, memory_id, memory_entry, expire)
+        pipeline.zadd(
+            self.connection.index_key(TIMELINE_INDEX),
+            {memory_id: memory_entry.context.timestamp.timestamp()},
+        )
+        pipeline.zadd(self.connection.index_key(ID_INDEX), {memory_id: 0})
+        if expire:
+            pipeline.zadd(self.connection.index_key(EXPIRY_INDEX), {memory_id: time.time() + expire})
+        else:
+            # An entry rewritten without a TTL must not be pruned on its old schedule.
+            pipeline.zrem(self.connection.index_key(EXPIRY_INDEX), memory_id)
+        if settings.REDIS_KEYWORD_INDEX_ENABLED:
+            self.keyword_index.stage_add(pipeline, memory_id, memory_entry)
+        if self.connection.full_text_search_available:
+            self.full_text_index.stage_add(pipeline, memory_id, memory_entry, expire)
+        if settings.CONSOLIDATION_STREAM_ENABLED:
+            self.consolidation_stream.stage_add(pipeline, self.connection.agent_id, memory_id)
+        return size
+
+    def _stage_prune(self, pipeline) -> None:
+        """Queue the script pruning expired entries from the agent's indexes and usage totals."""
+        keys = [
+            self.connection.index_key(EXPIRY_INDEX),
+            self.connection.index_key(TIMELINE_INDEX),
+            self.connection.index_key(ID_INDEX),
+            self.connection.index_key(USAGE_INDEX),
+            self.connection.index_key(SIZES_INDEX),
+        ]
+        pipeline.eval(PRUNE_EXPIRED_MEMORIES, len(keys), *keys, time.time(), PRUNE_BATCH_SIZE)
+
+    async def _unindex_pruned(self, conn, memory_ids: List[str]) -> None:
+        """Remove entries pruned by the expiry script from the keyword index, which the script cannot reach."""
+        if memory_ids:
+            if settings.REDIS_KEYWORD_INDEX_ENABLED:
+                await self.keyword_index.remove(conn, *memory_ids)
+            memory_logger.debug(f"Pruned {len(memory_ids)} expired entries from indexes for agent: {self.connection.agent_id}")
+
+    async def _delete(self, conn, memory_ids: List[str], unlink: bool = False) -> None:
+        """Remove memory entries and their index records."""
+        keys = [self.connection.memory_key(memory_id) for memory_id in memory_ids]
+        pipeline = conn.pipeline()
+        if unlink:
+            pipeline.unlink(*keys)
+        else:
+            pipeline.delete(*keys)
+        if settings.CONSOLIDATION_ON_EXPIRY_ENABLED:
+            # Keeps the expiry of a deleted or already consolidated entry from being reported.
+            pipeline.delete(*[self.connection.expiry_key(memory_id) for memory_id in memory_ids])
+        pipeline.zrem(self.connection.index_key(TIMELINE_INDEX), *memory_ids)
+        pipeline.zrem(self.connection.index_key(ID_INDEX), *memory_ids)
+        pipeline.zrem(self.connection.index_key(EXPIRY_INDEX), *memory_ids)
+        if self.connection.full_text_search_available:
+            for memory_id in memory_ids:
+                self.full_text_index.stage_remove(pipeline, memory_id)
+        self.usage.stage_forget(pipeline, memory_ids)
+        results = await pipeline.execute()
+        self.last_usage = RedisMemoryUsage.parse(results[-1])
+        self._invalidate_cached(memory_ids)
+        if settings.REDIS_KEYWORD_INDEX_ENABLED:
+            await self.keyword_index.remove(conn, *memory_ids)
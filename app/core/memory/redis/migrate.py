@@ -0,0 +1,116 @@
+"""
+Convert stored short-term memory entries to another storage layout.
+
+Usage:
+    python -m app.core.memory.redis.migrate --layout hash [--agent-id ID] [--rebuild-indexes]
+
+Each key is converted inside a WATCH/MULTI transaction so concurrent writes
+or deletes are never overwritten, and its remaining TTL is preserved. Reads
+accept both layouts, so the command can run against a live deployment
+before or after REDIS_STORAGE_LAYOUT is switched.
+"""
+import argparse
+import asyncio
+from typing import Dict, Optional
+from redis.client import NEVER_DECODE
+from redis.exceptions import WatchError
+from app.core.memory.redis.connection import RedisConnection
+from app.core.memory.redis.pool import redis_pool_manager
+from app.core.memory.redis.search import RedisSearch
+from app.core.memory.redis.storage import RedisMemoryStore, RedisStorageError, STORAGE_LAYOUTS, HASH_LAYOUT, ENTRY_FIELD
+from app.utils.logging import memory_logger
+
+
+async def migrate_key(conn, key: str, store: RedisMemoryStore) -> bool:
+    """
+    Rewrite a single memory key in the store's layout.
+
+    Args:
+        conn: An open Redis connection.
+        key (str): The memory key, ``agent:{agent_id}:{memory_id}``.
+        store (RedisMemoryStore): A store for the key's agent in the target layout.
+
+    Returns:
+        bool: True if the key was converted, False if it was already in the
+        target layout, no longer exists, or changed concurrently.
+    """
+    memory_id = key.split(":")[-1]
+    async with conn.pipeline() as pipeline:
+        try:
+            await pipeline.watch(key)
+            key_type = await pipeline.type(key)
+            # Layout names match the Redis TYPE reply of keys stored in them.
+            if key_type == "none" or key_type == store.layout:
+                return False
+            if key_type == "hash":
+                value = await pipeline.execute_command("HGET", key, ENTRY_FIELD, **{NEVER_DECODE: True})
+            else:
+                value = await pipeline.execute_command("GET", key, **{NEVER_DECODE: True})
+            ttl = await pipeline.pttl(key)
+            memory_entry = store.codec.decode(value)
+
+            pipeline.multi()
+            store.stage_write(pipeline, memory_id, memory_entry)
+            if ttl > 0:
+                pipeline.pexpire(key, ttl)
+            await pipeline.execute()
+            return True
+        except WatchError:
+            memory_logger.warning(f"Memory key changed during migration, skipped: {key}")
+            return False
+
+
+async def migrate(layout: str, agent_id: Optional[str] = None, rebuild_indexes: bool = False) -> Dict[str, int]:
+    """
+    Convert every memory key, or those of one agent, to the given layout.
+
+    Args:
+        layout (str): The target storage layout.
+        agent_id (Optional[str]): Restrict the migration to this agent.
+        rebuild_indexes (bool): Rebuild each migrated agent's indexes afterwards.
+
+    Returns:
+        Dict[str, int]: The number of keys scanned and converted.
+    """
+    if redis_pool_manager.cluster_mode:
+        # Cluster pipelines cannot WATCH, which the per-key conversion relies on.
+        raise RedisStorageError("Storage layout migration requires a standalone Redis server")
+
+    await redis_pool_manager.initialize()
+    pattern = f"agent:{agent_id}:*" if agent_id else "agent:*"
+    stores: Dict[str, RedisMemoryStore] = {}
+    scanned = converted = 0
+
+    try:
+        async with redis_pool_manager.acquire() as conn:
+            async for key in conn.scan_iter(match=pattern, count=500):
+                _, key_agent_id, _ = key.split(":", 2)
+                if key_agent_id not in stores:
+                    stores[key_agent_id] = RedisMemoryStore(RedisConnection(key_agent_id), layout)
+                scanned += 1
+                if await migrate_key(conn, key, stores[key_agent_id]):
+                    converted += 1
+
+        if rebuild_indexes:
+            for key_agent_id in stores:
+                await RedisSearch(RedisConnection(key_agent_id)).rebuild_indexes()
+    finally:
+        await redis_pool_manager.close()
+
+    memory_logger.info(f"Converted {converted} of {scanned} memory keys to the {layout} layout")
+    return {"scanned": scanned, "converted": converted}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert short-term memory entries to another Redis storage layout.")
+    parser.add_argument("--layout", choices=STORAGE_LAYOUTS, default=HASH_LAYOUT, help="Target storage layout")
+    parser.add_argument("--agent-id", help="Only migrate this agent's memories")
+    parser.add_argument("--rebuild-indexes", action="store_true", help="Rebuild the timeline, keyword and full-text indexes afterwards")
+    args = parser.parse_args()
+
+    result = asyncio.run(migrate(args.layout, args.agent_id, args.rebuild_indexes))
+    print(f"Scanned {result['scanned']} keys, converted {result['converted']} to the {args.layout} layout")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Union
+from redis.asyncio import Redis, RedisCluster, BlockingConnectionPool
+from redis.exceptions import ConnectionError, TimeoutError, RedisClusterException
+from app.config import settings
+from .logger import get_memory_logger
+from .client_cache import RedisClientCache
+from .health import RedisHealthMonitor
+from .replicas import RedisReplicaRouter
+
+class RedisPoolError(Exception):
+    """Custom exception for shared Redis pool errors."""
+    pass
+
+class RedisPoolManager:
+    """
+    Process-wide owner of the Redis connection pool.
+
+    Every RedisConnection borrows connections from the single pool held here,
+    so the number of sockets is bounded by REDIS_MAX_CONNECTIONS regardless of
+    how many agents are active, and the startup round trips (PING, INFO,
+    module detection) happen once per process instead of once per agent.
+
+    With REDIS_CLUSTER_MODE enabled a single RedisCluster client is shared
+    instead; it keeps a bounded pool per node and routes each command to the
+    node serving its key's slot.
+
+    When REDIS_REPLICA_URLS is set and REDIS_READ_ROUTING is "replica",
+    read-only callers are served from a replica that is within
+    REDIS_REPLICA_MAX_LAG seconds of the primary, falling back to the primary.
+
+    With REDIS_CLIENT_CACHE_ENABLED, a RedisClientCache shared by all agents
+    holds recently read entries and is kept coherent by server invalidations.
+
+    ``health`` checks the server in the background and holds the circuit
+    breaker that RedisConnection consults before every request.
+    """
+
+    def __init__(self):
+        self.pool: Optional[BlockingConnectionPool] = None
+        self.cluster: Optional[RedisCluster] = None
+        self.replicas: Optional[RedisReplicaRouter] = None
+        self.client_cache: Optional[RedisClientCache] = None
+        self.health = RedisHealthMonitor()
+        self._probe_client: Optional[Redis] = None
+        self.full_text_search_available = False
+        self.max_retries = 3
+        self.retry_delay = 1  # Initial delay in seconds
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_initialized(self) -> bool:
+        return self.pool is not None or self.cluster is not None
+
+    @property
+    def cluster_mode(self) -> bool:
+        return settings.REDIS_CLUSTER_MODE
+
+    async def initialize(self, max_retries: Optional[int] = None) -> None:
+        """
+        Create the shared pool and probe the server, if not done already.
+
+        Args:
+            max_retries (Optional[int]): Attempts before giving up, with exponential
+                backoff in between. Defaults to ``self.max_retries``; the request
+                path passes 1 so callers never sleep through the backoff.
+
+        Raises:
+            RedisPoolError: If the server cannot be reached after retrying.
+        """
+        if self.is_initialized:
+            return
+
+        max_retries = max_retries or self.max_retries
+        async with self._lock:
+            if self.is_initialized:
+                return
+
+            last_error = None
+            for attempt in range(max_retries):
+                try:
+                    get_memory_logger().debug(f"Attempting to initialize shared Redis connection pool (Attempt {attempt + 1})")
+                    if self.cluster_mode:
+                        await self._initialize_cluster()
+                    else:
+                        await self._initialize_pool()
+                    self.health.record_success()
+                    self.health.start(self._probe)
+                    return
+                except (ConnectionError, TimeoutError, RedisClusterException) as e:
+                    last_error = e
+                    self.health.record_failure(e)
+                    get_memory_logger().warning(f"Failed to initialize shared Redis connection pool (Attempt {attempt + 1}): {str(e)}")
+                    if attempt == max_retries - 1:
+                        break
+                    await asyncio.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+
+            get_memory_logger().error(f"Failed to initialize shared Redis connection pool after {max_retries} attempts")
+            raise RedisPoolError(f"Failed to initialize Redis connection pool: {str(last_error)}")
+
+    async def _initialize_pool(self) -> None:
+        pool = self._create_pool()
+        try:
+            async with Redis(connection_pool=pool) as redis:
+                await redis.ping()
+                info = await redis.info()
+                if settings.REDIS_FULL_TEXT_SEARCH_ENABLED:
+                    self.full_text_search_available = await self._detect_full_text_search(redis)
+        except Exception:
+            await pool.disconnect()
+            raise
+        get_memory_logger().info(f"Shared Redis connection pool established (max connections: {settings.REDIS_MAX_CONNECTIONS})")
+        get_memory_logger().debug(f"Redis version: {info['redis_version']}")
+        get_memory_logger().debug(f"Connected clients: {info['connected_clients']}")
+        get_memory_logger().debug(f"Used memory: {info['used_memory_human']}")
+        get_memory_logger().debug(f"Full-text search available: {self.full_text_search_available}")
+        if settings.REDIS_REPLICA_URLS:
+            self.replicas = RedisReplicaRouter()
+            self.replicas.initialize()
+            get_memory_logger().info(f"Redis read replicas configured: {len(settings.REDIS_REPLICA_URLS)} (routing: {settings.REDIS_READ_ROUTING})")
+        if settings.REDIS_CLIENT_CACHE_ENABLED and not RedisClientCache.supported():
+            get_memory_logger().warning(
+                "REDIS_CLIENT_CACHE_ENABLED is set, but the installed redis-py lacks the RESP3 parser "
+                "hooks the client-side cache needs; running without it"
+            )
+        elif settings.REDIS_CLIENT_CACHE_ENABLED:
+            # Tracking is per server, so the cache is only offered with a single primary.
+            self.client_cache = RedisClientCache()
+            await self.client_cache.start()
+        self.pool = pool
+
+    async def _initialize_cluster(self) -> None:
+        cluster = RedisCluster.from_url(
+            settings.REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+        )
+        try:
+            await cluster.initialize()
+            await cluster.ping()
+        except Exception:
+            await cluster.aclose()
+            raise
+        # FT.SEARCH only covers the node it runs on, so cluster mode always
+        # uses the keyword index or scan fallbacks.
+        self.full_text_search_available = False
+        get_memory_logger().info(
+            f"Shared Redis cluster client established ({len(cluster.get_primaries())} primaries, "
+            f"max connections per node: {settings.REDIS_MAX_CONNECTIONS})"
+        )
+        self.cluster = cluster
+
+    def _create_pool(self) -> BlockingConnectionPool:
+        # A blocking pool makes callers wait for a free connection instead of
+        # failing with "Too many connections" when every slot is in use.
+        return BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+        )
+
+    @staticmethod
+    async def _detect_full_text_search(redis: Redis) -> bool:
+        """Check for a search module and make sure the shared full-text index exists."""
+        from .full_text import RedisFullTextIndex, detect_search_module
+
+        return await detect_search_module(redis) and await RedisFullTextIndex.ensure_index(redis)
+
+    def client(self) -> Union[Redis, RedisCluster]:
+        """
+        Return a client bound to the shared pool, or the shared cluster client.
+
+        Prefer ``acquire``, which never closes the shared cluster client.
+
+        Raises:
+            RedisPoolError: If the pool has not been initialized.
+        """
+        if self.cluster is not None:
+            return self.cluster
+        if self.pool is None:
+            raise RedisPoolError("Shared Redis connection pool is not initialized")
+        return Redis(connection_pool=self.pool)
+
+    @asynccontextmanager
+    async def acquire(self, readonly: bool = False) -> AsyncIterator[Union[Redis, RedisCluster]]:
+        """
+        Borrow a client for the duration of a block.
+
+        Args:
+            readonly (bool): Whether the block only reads, so it may be served by a replica.
+
+        Raises:
+            RedisPoolError: If the pool has not been initialized.
+        """
+        if self.cluster is not None:
+            yield self.cluster
+            return
+        if self.pool is None:
+            raise RedisPoolError("Shared Redis connection pool is not initialized")
+
+        pool = self.pool
+        if readonly and self.replicas and settings.REDIS_READ_ROUTING == "replica":
+            pool = self.replicas.choose(self.pool) or self.pool
+        async with Redis(connection_pool=pool) as redis:
+            yield redis
+
+    async def _probe(self) -> None:
+        """PING the server for the health monitor, outside the shared pool so a busy pool is not mistaken for an outage."""
+        if self.cluster is not None:
+            await self.cluster.ping()
+            return
+        if self._probe_client is None:
+            self._probe_client = Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=self.health.interval,
+                socket_timeout=self.health.interval,
+            )
+        await self._probe_client.ping()
+
+    def is_primary(self, redis: Union[Redis, RedisCluster]) -> bool:
+        """Whether a client borrowed from ``acquire`` talks to the primary, and so may write."""
+        return redis is self.cluster or redis.connection_pool is self.pool
+
+    async def close(self) -> None:
+        """Disconnect every connection of the shared pool or cluster client."""
+        async with self._lock:
+            if self.pool or self.cluster:
+                try:
+                    await self.health.stop()
+                    if self._probe_client:
+                        await self._probe_client.aclose()
+                    if self.client_cache:
+                        get_memory_logger().info(f"Redis client-side cache stats: {self.client_cache.stats()}")
+                        await self.client_cache.close()
+                    if self.replicas:
+                        await self.replicas.close()
+                    if self.pool:
+                        await self.pool.disconnect(inuse_connections=True)
+                    if self.cluster:
+                        await self.cluster.aclose()
+                except Exception as e:
+                    get_memory_logger().error(f"Error while closing shared Redis connection pool: {str(e)}")
+                finally:
+                    self.pool = None
+                    self.cluster = None
+                    self.replicas = None
+                    self.client_cache = None
+                    self._probe_client = None
+                    self.full_text_search_available = False
+                    get_memory_logger().info("Shared Redis connection pool closed")
+
+redis_pool_manager = RedisPoolManager()
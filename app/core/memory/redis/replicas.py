@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from redis.asyncio import Redis, BlockingConnectionPool
+from app.config import settings
+from .logger import get_memory_logger
+
+# Number of primary replication offset samples kept to estimate replica staleness.
+OFFSET_HISTORY_SIZE = 120
+
+
+class RedisReplicaRouter:
+    """
+    Picks a read replica that is fresh enough to serve a read.
+
+    Staleness is measured against the primary's replication offset: every
+    check samples the primary's ``master_repl_offset`` with a timestamp, and a
+    replica whose ``slave_repl_offset`` has reached the sample taken at time T
+    holds every write made before T. A replica is used only while its link to
+    the primary is up and that bound is within ``max_lag`` seconds.
+
+    Checks run in the background, at most every ``check_interval`` seconds and
+    only while reads are being routed; until the first check completes every
+    read goes to the primary.
+    """
+
+    def __init__(
+            self,
+            urls: Optional[List[str]] = None,
+            max_lag: Optional[float] = None,
+            check_interval: Optional[float] = None,
+    ):
+        self.urls = list(settings.REDIS_REPLICA_URLS if urls is None else urls)
+        self.max_lag = settings.REDIS_REPLICA_MAX_LAG if max_lag is None else max_lag
+        self.check_interval = (
+            settings.REDIS_REPLICA_CHECK_INTERVAL if check_interval is None else check_interval
+        )
+        self.pools: Dict[str, BlockingConnectionPool] = {}
+        self.staleness: Dict[str, float] = {}
+        self._offsets: Deque[Tuple[float, int]] = deque(maxlen=OFFSET_HISTORY_SIZE)
+        self._fresh: List[str] = []
+        self._round_robin = itertools.cycle([])
+        self._last_check = 0.0
+        self._check_task: Optional[asyncio.Task] = None
+
+    def initialize(self) -> None:
+        """Create a connection pool per replica; connections are opened on first use."""
+        for url in self.urls:
+            if url not in self.pools:
+                self.pools[url] = BlockingConnectionPool.from_url(
+                    url,
+                    encoding="utf-8",
+                    decode_responses=True,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=settings.REDIS_POOL_TIMEOUT,
+                    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                    socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+                )
+
+    def choose(self, primary_pool: BlockingConnectionPool) -> Optional[BlockingConnectionPool]:
+        """
+        Return the pool of a fresh replica, or None if reads should go to the primary.
+
+        Args:
+            primary_pool (BlockingConnectionPool): The primary's pool, used to run staleness checks.
+
+        Returns:
+            Optional[BlockingConnectionPool]: A replica pool, round-robin among fresh replicas.
+        """
+        if not self.pools:
+            return None
+        if time.monotonic() - self._last_check >= self.check_interval and not self._checking:
+            self._last_check = time.monotonic()
+            self._check_task = asyncio.create_task(self.check(primary_pool))
+        if not self._fresh:
+            return None
+        return self.pools[next(self._round_robin)]
+
+    @property
+    def _checking(self) -> bool:
+        return self._check_task is not None and not self._check_task.done()
+
+    async def check(self, primary_pool: BlockingConnectionPool) -> None:
+        """Sample the primary's replication offset and re-evaluate every replica."""
+        try:
+            async with Redis(connection_pool=primary_pool) as primary:
+                primary_info = await primary.info("replication")
+            self._offsets.append((time.time(), int(primary_info.get("master_repl_offset", 0))))
+
+            fresh = []
+            for url, pool in self.pools.items():
+                staleness = await self._measure_staleness(pool)
+                self.staleness[url] = staleness
+                if staleness <= self.max_lag:
+                    fresh.append(url)
+
+            if fresh != self._fresh:
+                get_memory_logger().info(f"Redis read replicas in rotation: {len(fresh)}/{len(self.pools)}")
+            self._fresh = fresh
+            self._round_robin = itertools.cycle(fresh)
+        except Exception as e:
+            get_memory_logger().warning(f"Redis replica check failed, reading from primary: {str(e)}")
+            self._fresh = []
+
+    async def _measure_staleness(self, pool: BlockingConnectionPool) -> float:
+        try:
+            async with Redis(connection_pool=pool) as replica:
+                info = await replica.info("replication")
+        except Exception as e:
+            get_memory_logger().warning(f"Redis replica unreachable: {str(e)}")
+            return float("inf")
+
+        if info.get("role") != "slave" or info.get("master_link_status") != "up":
+            return float("inf")
+        replica_offset = int(info.get("slave_repl_offset", -1))
+        # The newest primary sample the replica has caught up with bounds its staleness.
+        for sampled_at, primary_offset in reversed(self._offsets):
+            if replica_offset >= primary_offset:
+                return max(0.0, time.time() - sampled_at)
+        return float("inf")
+
+    async def close(self) -> None:
+        """Stop checking and disconnect every replica pool."""
+        if self._checking:
+            self._check_task.cancel()
+        for pool in self.pools.values():
+            await pool.disconnect(inuse_connections=True)
+        self.pools.clear()
+        self._fresh = []
+        self._offsets.clear()
@@ -0,0 +1,200 @@
+"""
+Lua scripts run server-side for operations that must be atomic across
+several of an agent's keys. Scripts are invoked through redis-py's Script
+objects, which use EVALSHA and fall back to EVAL when the server has not
+cached the script yet.
+"""
+
+# Claim up to N memory IDs older than a threshold for consolidation.
+#
+# KEYS[1]: the agent's timeline sorted set (memory_id -> context timestamp)
+# KEYS[2]: the agent's processing sorted set (memory_id -> claim time)
+# ARGV[1]: timeline score upper bound (exclusive)
+# ARGV[2]: maximum number of IDs to claim
+# ARGV[3]: current time, in seconds
+# ARGV[4]: visibility timeout, in seconds
+#
+# Claims older than the visibility timeout belong to a consolidator that died
+# and are handed out again first. Claimed IDs stay in the timeline until the
+# entry is deleted, and are skipped by later claims while in processing.
+CLAIM_CONSOLIDATION_BATCH = """
+local limit = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local claimed = {}
+
+local stale = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', '(' .. (now - tonumber(ARGV[4])), 'LIMIT', 0, limit)
+for _, memory_id in ipairs(stale) do
+    redis.call('ZADD', KEYS[2], now, memory_id)
+    claimed[#claimed + 1] = memory_id
+end
+
+local offset = 0
+while #claimed < limit do
+    local page = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1], 'LIMIT', offset, limit)
+    if #page == 0 then
+        break
+    end
+    for _, memory_id in ipairs(page) do
+        if #claimed < limit and not redis.call('ZSCORE', KEYS[2], memory_id) then
+            redis.call('ZADD', KEYS[2], now, memory_id)
+            claimed[#claimed + 1] = memory_id
+        end
+    end
+    offset = offset + #page
+end
+
+return claimed
+"""
+
+# Claim specific memory IDs for consolidation, skipping those another
+# consolidator holds.
+#
+# KEYS[1]: the agent's processing sorted set (memory_id -> claim time)
+# ARGV[1]: current time, in seconds
+# ARGV[2]: visibility timeout, in seconds
+# ARGV[3...]: the memory IDs to claim
+CLAIM_CONSOLIDATION_IDS = """
+local now = tonumber(ARGV[1])
+local stale_before = now - tonumber(ARGV[2])
+local claimed = {}
+
+for i = 3, #ARGV do
+    local claimed_at = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if not claimed_at or tonumber(claimed_at) < stale_before then
+        redis.call('ZADD', KEYS[1], now, ARGV[i])
+        claimed[#claimed + 1] = ARGV[i]
+    end
+end
+
+return claimed
+"""
+
+# Deliver to a consumer only the stream entries that are due, i.e. were added
+# at least a minimum age ago by the server's clock.
+#
+# KEYS[1]: the consolidation stream
+# ARGV[1]: consumer group
+# ARGV[2]: consumer name
+# ARGV[3]: minimum entry age, in milliseconds
+# ARGV[4]: maximum number of entries to deliver
+#
+# Entry IDs start with their insertion time, so the due entries are the ones
+# between the group's last delivered ID and now minus the minimum age. Counting
+# them and reading them happen in one script, so concurrent consumers can never
+# be handed an entry that is not due yet.
+READ_DUE_CONSOLIDATIONS = """
+local last_delivered = nil
+for _, group in ipairs(redis.call('XINFO', 'GROUPS', KEYS[1])) do
+    local name, last_id
+    for i = 1, #group, 2 do
+        if group[i] == 'name' then
+            name = group[i + 1]
+        elseif group[i] == 'last-delivered-id' then
+            last_id = group[i + 1]
+        end
+    end
+    if name == ARGV[1] then
+        last_delivered = last_id
+    end
+end
+if not last_delivered then
+    return redis.error_reply('NOGROUP consumer group ' .. ARGV[1] .. ' does not exist')
+end
+
+local time = redis.call('TIME')
+local due_before = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000) - tonumber(ARGV[3])
+if due_before < 0 then
+    return {}
+end
+
+local due = redis.call('XRANGE', KEYS[1], '(' .. last_delivered, tostring(due_before), 'COUNT', ARGV[4])
+if #due == 0 then
+    return {}
+end
+return redis.call('XREADGROUP', 'GROUP', ARGV[1], ARGV[2], 'COUNT', #due, 'STREAMS', KEYS[1], '>')
+"""
+
+# Record the encoded size of written memory entries and update the agent's
+# running totals. Queued in the same transaction as the writes, so it is sent
+# with EVAL: an EVALSHA missing from the script cache would fail on its own
+# inside MULTI while the writes still apply.
+#
+# KEYS[1]: the agent's usage hash (count, bytes)
+# KEYS[2]: the agent's sizes hash (memory_id -> encoded size)
+# ARGV: memory_id, size pairs
+#
+# Overwriting an entry replaces its size instead of counting it again.
+# Returns the new {count, bytes}.
+RECORD_MEMORY_SIZES = """
+local count, bytes = 0, 0
+for i = 1, #ARGV, 2 do
+    local previous = redis.call('HGET', KEYS[2], ARGV[i])
+    if previous then
+        bytes = bytes - tonumber(previous)
+    else
+        count = count + 1
+    end
+    bytes = bytes + tonumber(ARGV[i + 1])
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+return {redis.call('HINCRBY', KEYS[1], 'count', count), redis.call('HINCRBY', KEYS[1], 'bytes', bytes)}
+"""
+
+# Drop removed memory entries from the agent's running totals.
+#
+# KEYS[1]: the agent's usage hash (count, bytes)
+# KEYS[2]: the agent's sizes hash (memory_id -> encoded size)
+# ARGV: the removed memory IDs
+#
+# IDs without a recorded size (already forgotten, or written before sizes
+# were tracked) are ignored. Returns the new {count, bytes}.
+FORGET_MEMORY_SIZES = """
+local count, bytes = 0, 0
+for i = 1, #ARGV do
+    local previous = redis.call('HGET', KEYS[2], ARGV[i])
+    if previous then
+        count = count - 1
+        bytes = bytes - tonumber(previous)
+        redis.call('HDEL', KEYS[2], ARGV[i])
+    end
+end
+return {redis.call('HINCRBY', KEYS[1], 'count', count), redis.call('HINCRBY', KEYS[1], 'bytes', bytes)}
+"""
+
+# Drop memory entries whose TTL has passed from the agent's indexes and
+# running totals. Queued in the same transaction as writes, so it is sent with
+# EVAL, like RECORD_MEMORY_SIZES.
+#
+# KEYS[1]: the agent's expiry sorted set (memory_id -> expiry time)
+# KEYS[2]: the agent's timeline sorted set
+# KEYS[3]: the agent's ID sorted set
+# KEYS[4]: the agent's usage hash (count, bytes)
+# KEYS[5]: the agent's sizes hash (memory_id -> encoded size)
+# ARGV[1]: current time, in seconds
+# ARGV[2]: maximum number of IDs to prune
+#
+# Returns the pruned IDs, so the caller can unindex them from the keyword index.
+PRUNE_EXPIRED_MEMORIES = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #expired == 0 then
+    return {}
+end
+
+local count, bytes = 0, 0
+for _, memory_id in ipairs(expired) do
+    local previous = redis.call('HGET', KEYS[5], memory_id)
+    if previous then
+        count = count - 1
+        bytes = bytes - tonumber(previous)
+        redis.call('HDEL', KEYS[5], memory_id)
+    end
+end
+redis.call('ZREM', KEYS[1], unpack(expired))
+redis.call('ZREM', KEYS[2], unpack(expired))
+redis.call('ZREM', KEYS[3], unpack(expired))
+if count ~= 0 then
+    redis.call('HINCRBY', KEYS[4], 'count', count)
+    redis.call('HINCRBY', KEYS[4], 'bytes', bytes)
+end
+return expired
+"""
@@ -1,9 +1,24 @@
-from typing import List, Dict, Any
+import heapq
+import time
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from redis.exceptions import ResponseError
 from datetime import datetime
 from app.api.models.memory import AdvancedSearchQuery
 from app.core.models import MemoryEntry
 from app.core.memory.redis.connection import RedisConnection, RedisConnectionError
+from app.core.memory.redis.memory_operations import TIMELINE_INDEX, ID_INDEX, EXPIRY_INDEX
+from app.core.memory.redis.keyword_index import RedisKeywordIndex
+from app.core.memory.redis.full_text import RedisFullTextIndex
+from app.core.memory.redis.storage import RedisMemoryStore, MemoryFilterFields
+from app.core.memory.redis.usage import RedisMemoryUsage, RedisMemoryUsageError, MemoryUsage, SIZES_INDEX
 from app.utils.logging import memory_logger
+from app.config import settings
+
+# Highest score _calculate_relevance can return.
+MAX_RELEVANCE = 1.0
+# Matches read per FT.SEARCH call; the module's order differs from _calculate_relevance,
+# so pages are read until the client-side top-k is settled.
+FULL_TEXT_PAGE_SIZE = 100
 
 class RedisSearchError(Exception):
     """Custom exception for Redis search operations errors."""
@@ -12,11 +27,24 @@ class RedisSearchError(Exception):
 class RedisSearch:
     def __init__(self, connection: RedisConnection):
         self.connection = connection
+        self.keyword_index = RedisKeywordIndex(connection)
+        self.full_text_index = RedisFullTextIndex(connection)
+        self.store = RedisMemoryStore(connection)
+        self.usage = RedisMemoryUsage(connection)
 
     async def search(self, query: AdvancedSearchQuery) -> List[Dict[str, Any]]:
         """
         Search for memories in Redis based on the given query.
 
+        When a search module is available, filtering and term matching run
+        server-side with FT.SEARCH on the primary; the other paths may be served
+        by a read replica. Otherwise, when the keyword index is enabled
+        and the query has keywords, only the entries sharing at least one
+        keyword are fetched. As a last resort every entry of the agent is scanned.
+        On every path, results are ranked by ``_calculate_relevance`` and those
+        scoring below ``relevance_threshold`` are dropped, so every path ranks
+        the same data the same way.
+
         Args:
             query (AdvancedSearchQuery): The search query parameters.
 
@@ -26,52 +54,196 @@ class RedisSearch:
         Raises:
             RedisSearchError: If there's an error during the search operation.
         """
-        pattern = f"agent:{self.connection.agent_id}:*"
-        results = []
+        if self.connection.full_text_search_available:
+            results = await self._search_full_text(query)
+            if results is not None:
+                return results
+
+        if settings.REDIS_KEYWORD_INDEX_ENABLED and self.keyword_index.tokenize(query.query):
+            return await self._search_keyword_index(query)
 
+        try:
+            async with self.connection.get_connection(readonly=True) as conn:
+                return await self._search_scan(conn, query)
+        except RedisConnectionError as e:
+            memory_logger.error(f"Redis connection error during search: {str(e)}")
+            raise RedisSearchError(f"Failed to perform search: {str(e)}") from e
+        except Exception as e:
+            memory_logger.error(f"Unexpected error during search: {str(e)}")
+            raise RedisSearchError(f"Unexpected error during search: {str(e)}") from e
+
+    async def _search_scan(self, conn, query: AdvancedSearchQuery) -> List[Dict[str, Any]]:
+        """
+        Search by scanning every entry of the agent, keeping only the best matches.
+
+        Args:
+            conn: An open Redis connection.
+            query (AdvancedSearchQuery): The search query parameters.
+
+        Returns:
+            List[Dict[str, Any]]: The best matches, most relevant first.
+        """
+        return await self._top_matches(self._iter_scan_matches(conn, query), query)
+
+    async def _top_matches(
+            self, matches: AsyncIterator[Tuple[str, MemoryEntry]], query: AdvancedSearchQuery
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank matching entries by relevance, keeping only the best ``max_results``.
+
+        Matches stream through a min-heap bounded to ``max_results``, so memory
+        use does not grow with the number of entries. Reading stops early once
+        the heap holds ``max_results`` of the highest possible score, since
+        nothing can beat them.
+
+        Args:
+            matches (AsyncIterator[Tuple[str, MemoryEntry]]): The (memory_id, entry) pairs passing the filters.
+            query (AdvancedSearchQuery): The search query parameters.
+
+        Returns:
+            List[Dict[str, Any]]: The best matches, most relevant first.
+        """
+        threshold = query.relevance_threshold or 0
+        # A query without keywords scores every entry 0.
+        best_possible = MAX_RELEVANCE if query.query.split() else 0
+        # Entries are (score, -sequence, id, entry): among equal scores the
+        # earliest match ranks highest, as with a stable sort.
+        heap: List[Tuple[float, int, str, MemoryEntry]] = []
+        sequence = 0
+
+        try:
+            async for memory_id, memory_entry in matches:
+                relevance_score = self._calculate_relevance(memory_entry, query)
+                if relevance_score < threshold:
+                    continue
+                sequence += 1
+                item = (relevance_score, -sequence, memory_id, memory_entry)
+                if len(heap) < query.max_results:
+                    heapq.heappush(heap, item)
+                else:
+                    heapq.heappushpop(heap, item)
+                if len(heap) == query.max_results and heap[0][0] >= best_possible:
+                    break
+        finally:
+            await matches.aclose()
+
+        return [
+            {"id": memory_id, "memory_entry": memory_entry, "relevance_score": relevance_score}
+            for relevance_score, _, memory_id, memory_entry in sorted(heap, reverse=True)
+        ]
+
+    async def _iter_scan_matches(
+            self, conn, query: AdvancedSearchQuery
+    ) -> AsyncIterator[Tuple[str, MemoryEntry]]:
+        """Yield the agent's entries matching the query's filters, one SCAN page at a time."""
+        async for keys in self.connection.scan_memory_keys(conn):
+            memory_ids = [key.split(":")[-1] for key in keys]
+            memory_ids = await self._filter_candidates(conn, memory_ids, query)
+            for memory_id, memory_entry in await self._fetch_entries(conn, memory_ids, prune=False):
+                if self._matches_query(memory_entry, query):
+                    yield memory_id, memory_entry
+
+    async def _iter_full_text_matches(
+            self, conn, query: AdvancedSearchQuery
+    ) -> AsyncIterator[Tuple[str, MemoryEntry]]:
+        """Yield the agent's entries matched by the full-text index, one FT.SEARCH page at a time."""
+        page_size = max(query.max_results, FULL_TEXT_PAGE_SIZE)
+        offset = 0
+        while True:
+            memory_ids = await self.full_text_index.search(conn, query, offset, page_size)
+            # The server already applied the filters; re-checking guards against
+            # metadata values whose string form matches but whose type does not.
+            for memory_id, memory_entry in await self._fetch_entries(conn, memory_ids):
+                if self._matches_query(memory_entry, query):
+                    yield memory_id, memory_entry
+            if len(memory_ids) < page_size:
+                break
+            offset += page_size
+
+    async def _search_full_text(self, query: AdvancedSearchQuery) -> Optional[List[Dict[str, Any]]]:
+        """
+        Search using the server-side full-text index.
+
+        The module matches stemmed terms and ranks by its own scoring, so its
+        pages are re-scored with ``_calculate_relevance`` and read until the
+        top ``max_results`` passing the client-side checks are settled.
+
+        Args:
+            query (AdvancedSearchQuery): The search query parameters.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: A list of search results, or None if
+            the search module rejected the query and the caller should fall back.
+
+        Raises:
+            RedisSearchError: If there's an error during the search operation.
+        """
         try:
             async with self.connection.get_connection() as conn:
-                cursor = 0
-                while True:
-                    cursor, keys = await conn.scan(cursor, match=pattern, count=100)
-                    if not keys:
-                        break
-                    
-                    pipeline = conn.pipeline()
-                    for key in keys:
-                        pipeline.get(key)
-                    values = await pipeline.execute()
-
-                    for key, value in zip(keys, values):
-                        if value:
-                            try:
-                                memory_entry = MemoryEntry.model_validate_json(value)
-                                if self._matches_query(memory_entry, query):
-                                    relevance_score = self._calculate_relevance(memory_entry, query)
-                                    results.append({
-                                        "id": key.split(":")[-1],
-                                        "memory_entry": memory_entry,
-                                        "relevance_score": relevance_score,
-                                    })
-                            except ValueError as e:
-                                memory_logger.warning(f"Failed to parse memory entry: {key}. Error: {str(e)}")
-
-                    if cursor == 0:
+                try:
+                    return await self._top_matches(self._iter_full_text_matches(conn, query), query)
+                except ResponseError as e:
+                    memory_logger.warning(f"Full-text search failed, falling back to client-side search: {str(e)}")
+                    return None
+        except RedisConnectionError as e:
+            memory_logger.error(f"Redis connection error during full-text search: {str(e)}")
+            raise RedisSearchError(f"Failed to perform search: {str(e)}") from e
+        except Exception as e:
+            memory_logger.error(f"Unexpected error during full-text search: {str(e)}")
+            raise RedisSearchError(f"Unexpected error during search: {str(e)}") from e
+
+    async def _search_keyword_index(self, query: AdvancedSearchQuery) -> List[Dict[str, Any]]:
+        """
+        Search using the keyword index, fetching candidates in relevance order.
+
+        Args:
+            query (AdvancedSearchQuery): The search query parameters.
+
+        Returns:
+            List[Dict[str, Any]]: A list of search results.
+
+        Raises:
+            RedisSearchError: If there's an error during the search operation.
+        """
+        results = []
+
+        try:
+            async with self.connection.get_connection(readonly=True) as conn:
+                candidates = await self.keyword_index.score_candidates(conn, query.query)
+                threshold = query.relevance_threshold or 0
+                candidates = [(memory_id, score) for memory_id, score in candidates if score >= threshold]
+                relevance_by_id = dict(candidates)
+
+                # Candidates are ordered by relevance, so the first max_results
+                # entries passing the filters are the final result.
+                for start in range(0, len(candidates), query.max_results):
+                    page = [memory_id for memory_id, _ in candidates[start:start + query.max_results]]
+                    page = await self._filter_candidates(conn, page, query)
+                    for memory_id, memory_entry in await self._fetch_entries(conn, page):
+                        if self._matches_query(memory_entry, query):
+                            results.append({
+                                "id": memory_id,
+                                "memory_entry": memory_entry,
+                                "relevance_score": relevance_by_id[memory_id],
+                            })
+                    if len(results) >= query.max_results:
                         break
 
-            results.sort(key=lambda x: x["relevance_score"], reverse=True)
             return results[:query.max_results]
         except RedisConnectionError as e:
-            memory_logger.error(f"Redis connection error during search: {str(e)}")
+            memory_logger.error(f"Redis connection error during keyword index search: {str(e)}")
             raise RedisSearchError(f"Failed to perform search: {str(e)}") from e
         except Exception as e:
-            memory_logger.error(f"Unexpected error during search: {str(e)}")
+            memory_logger.error(f"Unexpected error during keyword index search: {str(e)}")
             raise RedisSearchError(f"Unexpected error during search: {str(e)}") from e
 
     async def get_memories_older_than(self, threshold: datetime) -> List[MemoryEntry]:
         """
         Retrieve memory entries older than the given threshold.
 
+        Candidate IDs come from the agent's timeline index, so only the entries
+        that are actually older than the threshold are fetched.
+
         Args:
             threshold (datetime): The threshold datetime.
 
@@ -81,37 +253,14 @@ class RedisSearch:
         Raises:
             RedisSearchError: If there's an error retrieving old memories.
         """
-        pattern = f"agent:{self.connection.agent_id}:*"
-        old_memories = []
-
         try:
             async with self.connection.get_connection() as conn:
-                cursor = 0
-                while True:
-                    cursor, keys = await conn.scan(cursor, match=pattern, count=100)
-                    if not keys:
-                        break
-
-                    pipeline = conn.pipeline()
-                    for key in keys:
-                        pipeline.get(key)
-                    values = await pipeline.execute()
-
-                    for value in values:
-                        if value:
-                            try:
-                                memory_entry = MemoryEntry.model_validate_json(value)
-                                if memory_entry.context.timestamp < threshold:
-                                    old_memories.append(memory_entry)
-                                    memory_logger.debug(f"Added old memory: {memory_entry.content}")
-                                else:
-                                    memory_logger.debug(f"Skipped memory: {memory_entry.content} (not old enough)")
-                            except ValueError as e:
-                                memory_logger.warning(f"Failed to parse memory entry. Error: {str(e)}")
-
-                    if cursor == 0:
-                        break
+                memory_ids = await conn.zrangebyscore(
+                    self.connection.index_key(TIMELINE_INDEX), "-inf", f"({threshold.timestamp()}"
+                )
+                entries = await self._fetch_entries(conn, memory_ids)
 
+            old_memories = [memory_entry for _, memory_entry in entries]
             memory_logger.info(f"Retrieved {len(old_memories)} memories older than {threshold} for agent: {self.connection.agent_id}")
             return old_memories
         except RedisConnectionError as e:
@@ -125,6 +274,10 @@ class RedisSearch:
         """
         Retrieve the most recent memory entries.
 
+        Reads the newest IDs from the timeline index and fetches just those
+        entries. Index members whose entry has expired are pruned and the next
+        page is read until ``limit`` entries are found or the index is exhausted.
+
         Args:
             limit (int): The maximum number of entries to retrieve.
 
@@ -134,38 +287,28 @@ class RedisSearch:
         Raises:
             RedisSearchError: If there's an error retrieving recent memories.
         """
-        pattern = f"agent:{self.connection.agent_id}:*"
+        timeline_key = self.connection.index_key(TIMELINE_INDEX)
         results = []
 
         try:
-            async with self.connection.get_connection() as conn:
-                cursor = 0
-                while True:
-                    cursor, keys = await conn.scan(cursor, match=pattern, count=100)
-                    if not keys:
-                        break
-
-                    pipeline = conn.pipeline()
-                    for key in keys:
-                        pipeline.get(key)
-                    values = await pipeline.execute()
-
-                    for key, value in zip(keys, values):
-                        if value:
-                            try:
-                                memory_entry = MemoryEntry.model_validate_json(value)
-                                results.append({
-                                    "id": key.split(":")[-1],
-                                    "memory_entry": memory_entry,
-                                    "timestamp": memory_entry.context.timestamp,
-                                })
-                            except ValueError as e:
-                                memory_logger.warning(f"Failed to parse memory entry: {key}. Error: {str(e)}")
-
-                    if cursor == 0:
+            async with self.connection.get_connection(readonly=True) as conn:
+                start = 0
+                while len(results) < limit:
+                    page_size = limit - len(results)
+                    memory_ids = await conn.zrevrange(timeline_key, start, start + page_size - 1)
+                    if not memory_ids:
                         break
+                    entries, pruned = await self._read_entries(conn, memory_ids)
+                    for memory_id, memory_entry in entries:
+                        results.append({
+                            "id": memory_id,
+                            "memory_entry": memory_entry,
+                            "timestamp": memory_entry.context.timestamp,
+                        })
+                    # Pruned members shift the remaining ones down, so advance past every member
+                    # that is still indexed, including entries that failed to decode.
+                    start += len(memory_ids) - len(pruned)
 
-            results.sort(key=lambda x: x["timestamp"], reverse=True)
             return results[:limit]
         except RedisConnectionError as e:
             memory_logger.error(f"Redis connection error while retrieving recent memories: {str(e)}")
@@ -174,6 +317,270 @@ class RedisSearch:
             memory_logger.error(f"Unexpected error while retrieving recent memories: {str(e)}")
             raise RedisSearchError(f"Unexpected error while retrieving recent memories: {str(e)}") from e
 
+    async def get_page(self, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve memory entries newest-written first, one page at a time.
+
+        Memory IDs are time-ordered, so the ID index lists them in write order
+        and the last ID of a page is the cursor for the next one: each page is
+        a single ZREVRANGEBYLEX below the cursor, with no timestamp lookup and
+        no offset to skip. Members whose entry has expired are pruned and
+        skipped.
+
+        Args:
+            limit (int): The maximum number of entries to retrieve.
+            before (Optional[str]): Only return entries written before this memory ID,
+                usually the last ID of the previous page. None starts from the newest entry.
+
+        Returns:
+            List[Dict[str, Any]]: The entries with their IDs, newest first.
+
+        Raises:
+            RedisSearchError: If there's an error retrieving the page.
+        """
+        ids_key = self.connection.index_key(ID_INDEX)
+        upper = f"({before}" if before else "+"
+        results = []
+
+        try:
+            async with self.connection.get_connection(readonly=True) as conn:
+                while len(results) < limit:
+                    memory_ids = await conn.zrevrangebylex(ids_key, upper, "-", start=0, num=limit - len(results))
+                    if not memory_ids:
+                        break
+                    for memory_id, memory_entry in await self._fetch_entries(conn, memory_ids):
+                        results.append({
+                            "id": memory_id,
+                            "memory_entry": memory_entry,
+                            "timestamp": memory_entry.context.timestamp,
+                        })
+                    upper = f"({memory_ids[-1]}"
+
+            return results
+        except RedisConnectionError as e:
+            memory_logger.error(f"Redis connection error while retrieving a page of memories: {str(e)}")
+            raise RedisSearchError(f"Failed to retrieve memories: {str(e)}") from e
+        except Exception as e:
+            memory_logger.error(f"Unexpected error while retrieving a page of memories: {str(e)}")
+            raise RedisSearchError(f"Unexpected error while retrieving memories: {str(e)}") from e
+
+    async def rebuild_indexes(self) -> int:
+        """
+        Rebuild the agent's timeline, ID and expiry indexes and usage totals, and
+        the keyword and full-text indexes when enabled, from the stored memory entries.
+
+        This performs a full keyspace SCAN and is meant as a one-off backfill
+        for entries written before the index existed, not for the request path.
+
+        Returns:
+            int: The number of entries indexed.
+
+        Raises:
+            RedisSearchError: If there's an error rebuilding the indexes.
+        """
+        timeline_key = self.connection.index_key(TIMELINE_INDEX)
+        indexed = 0
+
+        try:
+            async with self.connection.get_connection() as conn:
+                async for keys in self.connection.scan_memory_keys(conn):
+                    memory_ids = [key.split(":")[-1] for key in keys]
+                    entries = await self._fetch_entries(conn, memory_ids, prune=False)
+                    if entries:
+                        pipeline = conn.pipeline(transaction=False)
+                        for memory_id, _ in entries:
+                            pipeline.pttl(self.connection.memory_key(memory_id))
+                        ttls = await pipeline.execute()
+                        now = time.time()
+                        expiries = {
+                            memory_id: now + ttl / 1000
+                            for (memory_id, _), ttl in zip(entries, ttls) if ttl > 0
+                        }
+
+                        pipeline = conn.pipeline()
+                        pipeline.zadd(timeline_key, {
+                            memory_id: memory_entry.context.timestamp.timestamp()
+                            for memory_id, memory_entry in entries
+                        })
+                        pipeline.zadd(self.connection.index_key(ID_INDEX), {memory_id: 0 for memory_id, _ in entries})
+                        if expiries:
+                            pipeline.zadd(self.connection.index_key(EXPIRY_INDEX), expiries)
+                        self.usage.stage_record(pipeline, {
+                            memory_id: len(self.store.codec.encode(memory_entry))
+                            for memory_id, memory_entry in entries
+                        })
+                        for memory_id, memory_entry in entries:
+                            if settings.REDIS_KEYWORD_INDEX_ENABLED:
+                                self.keyword_index.stage_add(pipeline, memory_id, memory_entry)
+                            if self.connection.full_text_search_available:
+                                self.full_text_index.stage_add(pipeline, memory_id, memory_entry)
+                        await pipeline.execute()
+                        indexed += len(entries)
+
+            memory_logger.info(f"Rebuilt memory indexes with {indexed} entries for agent: {self.connection.agent_id}")
+            return indexed
+        except RedisConnectionError as e:
+            memory_logger.error(f"Redis connection error while rebuilding memory indexes: {str(e)}")
+            raise RedisSearchError(f"Failed to rebuild memory indexes: {str(e)}") from e
+        except Exception as e:
+            memory_logger.error(f"Unexpected error while rebuilding memory indexes: {str(e)}")
+            raise RedisSearchError(f"Unexpected error while rebuilding memory indexes: {str(e)}") from e
+
+    async def _fetch_entries(
+            self, conn, memory_ids: List[str], prune: bool = True
+    ) -> List[Tuple[str, MemoryEntry]]:
+        """
+        Fetch and parse the given memory entries in a single pipelined round trip.
+
+        Args:
+            conn: An open Redis connection.
+            memory_ids (List[str]): The IDs of the entries to fetch.
+            prune (bool): Whether to drop IDs whose entry no longer exists from the agent's indexes.
+
+        Returns:
+            List[Tuple[str, MemoryEntry]]: The (memory_id, entry) pairs that exist, in the order requested.
+        """
+        entries, _ = await self._read_entries(conn, memory_ids, prune)
+        return entries
+
+    async def _read_entries(
+            self, conn, memory_ids: List[str], prune: bool = True
+    ) -> Tuple[List[Tuple[str, MemoryEntry]], List[str]]:
+        """
+        Fetch and parse the given memory entries, also reporting the IDs pruned from the indexes.
+
+        Entries that exist but fail to decode are skipped and stay indexed.
+
+        Args:
+            conn: An open Redis connection.
+            memory_ids (List[str]): The IDs of the entries to fetch.
+            prune (bool): Whether to drop IDs whose entry no longer exists from the agent's indexes.
+
+        Returns:
+            Tuple[List[Tuple[str, MemoryEntry]], List[str]]: The (memory_id, entry) pairs that exist,
+                in the order requested, and the IDs that were pruned.
+        """
+        if not memory_ids:
+            return [], []
+
+        values = await self.store.read_values(conn, memory_ids)
+
+        entries = []
+        missing = []
+        for memory_id, value in zip(memory_ids, values):
+            if not value:
+                missing.append(memory_id)
+                continue
+            try:
+                entries.append((memory_id, self.store.codec.decode(value)))
+            except ValueError as e:
+                memory_logger.warning(f"Failed to parse memory entry: {memory_id}. Error: {str(e)}")
+
+        # Replicas are read-only, and an entry missing there may just not be replicated yet.
+        if prune and missing and self.connection.is_primary(conn):
+            await self._prune(conn, missing)
+            return entries, missing
+
+        return entries, []
+
+    async def reconcile_usage(self) -> MemoryUsage:
+        """
+        Recount the agent's usage totals against the entries that still exist.
+
+        Every ID with a recorded size is checked with EXISTS on the primary, and
+        those whose entry expired or vanished are pruned from the indexes and
+        subtracted from the totals. This reads the whole sizes hash, so it is
+        meant for when a budget check trips, not for every write.
+
+        Returns:
+            MemoryUsage: The corrected totals.
+
+        Raises:
+            RedisSearchError: If the totals cannot be reconciled.
+        """
+        sizes_key = self.connection.index_key(SIZES_INDEX)
+        pruned = 0
+
+        try:
+            async with self.connection.get_connection() as conn:
+                cursor = 0
+                while True:
+                    cursor, sizes = await conn.hscan(sizes_key, cursor, count=500)
+                    memory_ids = list(sizes)
+                    if memory_ids:
+                        pipeline = conn.pipeline(transaction=False)
+                        for memory_id in memory_ids:
+                            pipeline.exists(self.connection.memory_key(memory_id))
+                        exists = await pipeline.execute()
+                        missing = [memory_id for memory_id, found in zip(memory_ids, exists) if not found]
+                        if missing:
+                            await self._prune(conn, missing)
+                            pruned += len(missing)
+                    if not cursor:
+                        break
+
+            usage = await self.usage.get()
+            memory_logger.info(
+                f"Reconciled memory usage for agent: {self.connection.agent_id} "
+                f"({pruned} vanished entries removed, now {usage.count} memories, {usage.bytes} bytes)"
+            )
+            return usage
+        except (RedisConnectionError, RedisMemoryUsageError) as e:
+            memory_logger.error(f"Redis connection error while reconciling memory usage: {str(e)}")
+            raise RedisSearchError(f"Failed to reconcile memory usage: {str(e)}") from e
+        except Exception as e:
+            memory_logger.error(f"Unexpected error while reconciling memory usage: {str(e)}")
+            raise RedisSearchError(f"Unexpected error while reconciling memory usage: {str(e)}") from e
+
+    async def _prune(self, conn, memory_ids: List[str]) -> None:
+        """Drop IDs whose entry no longer exists from the agent's indexes and usage totals."""
+        await conn.zrem(self.connection.index_key(TIMELINE_INDEX), *memory_ids)
+        await conn.zrem(self.connection.index_key(ID_INDEX), *memory_ids)
+        await conn.zrem(self.connection.index_key(EXPIRY_INDEX), *memory_ids)
+        await self.usage.forget(conn, memory_ids)
+        if self.connection.full_text_search_available:
+            await conn.delete(*(self.full_text_index.document_key(memory_id) for memory_id in memory_ids))
+        if settings.REDIS_KEYWORD_INDEX_ENABLED:
+            await self.keyword_index.remove(conn, *memory_ids)
+        memory_logger.debug(f"Pruned {len(memory_ids)} expired entries from indexes for agent: {self.connection.agent_id}")
+
+    async def _filter_candidates(self, conn, memory_ids: List[str], query: AdvancedSearchQuery) -> List[str]:
+        """
+        Drop candidates failing the query's filters before their content is fetched.
+
+        Only applies to the hash storage layout, where the filter fields can be
+        read on their own, and to queries that have filters at all.
+
+        Args:
+            conn: An open Redis connection.
+            memory_ids (List[str]): The candidate IDs.
+            query (AdvancedSearchQuery): The search query parameters.
+
+        Returns:
+            List[str]: The candidate IDs worth fetching.
+        """
+        if not (query.context_type or query.time_range or query.metadata_filters):
+            return memory_ids
+        return await self.store.filter_ids(
+            conn, memory_ids, lambda fields: self._matches_filter_fields(fields, query)
+        )
+
+    @staticmethod
+    def _matches_filter_fields(fields: MemoryFilterFields, query: AdvancedSearchQuery) -> bool:
+        """Apply the checks of ``_matches_query`` to an entry's stored filter fields."""
+        if query.context_type and fields.context_type != query.context_type:
+            return False
+        if query.time_range:
+            if (
+                    fields.timestamp < query.time_range["start"].timestamp()
+                    or fields.timestamp > query.time_range["end"].timestamp()
+            ):
+                return False
+        if query.metadata_filters:
+            for key, value in query.metadata_filters.items():
+                if key not in fields.metadata or fields.metadata[key] != value:
+                    return False
+        return True
 
     def _matches_query(
             self, memory_entry: MemoryEntry, query: AdvancedSearchQuery
@@ -0,0 +1,174 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import msgpack
+from pydantic_core import to_jsonable_python
+from redis.client import NEVER_DECODE
+from redis.exceptions import ResponseError
+from app.core.models import MemoryEntry
+from app.core.memory.redis.connection import RedisConnection
+from app.core.memory.redis.codec import RedisMemoryCodec
+from app.config import settings
+
+STRING_LAYOUT = "string"
+HASH_LAYOUT = "hash"
+STORAGE_LAYOUTS = (STRING_LAYOUT, HASH_LAYOUT)
+
+# Fields of a memory stored with the hash layout. ``entry`` holds the whole
+# codec-encoded entry; the others duplicate the small fields search filters on
+# so they can be read without transferring the content.
+ENTRY_FIELD = "entry"
+CONTEXT_TYPE_FIELD = "context_type"
+TIMESTAMP_FIELD = "ts"
+METADATA_FIELD = "metadata"
+
+
+class RedisStorageError(Exception):
+    """Custom exception for Redis memory storage layout errors."""
+    pass
+
+
+class MemoryFilterFields(NamedTuple):
+    context_type: str
+    timestamp: float
+    metadata: Dict[str, Any]
+
+
+class RedisMemoryStore:
+    """
+    Reads and writes encoded memory entries at ``agent:{agent_id}:{memory_id}``.
+
+    With the ``string`` layout each entry is a single string value. With the
+    ``hash`` layout each entry is a hash whose filter fields can be read on
+    their own. Reads accept keys in either layout, so a deployment keeps
+    working while ``migrate`` converts existing keys.
+    """
+
+    def __init__(self, connection: RedisConnection, layout: Optional[str] = None):
+        layout = layout or settings.REDIS_STORAGE_LAYOUT
+        if layout not in STORAGE_LAYOUTS:
+            raise RedisStorageError(f"Unknown Redis storage layout: {layout}")
+        self.connection = connection
+        self.layout = layout
+        self.codec = RedisMemoryCodec()
+
+    @property
+    def supports_partial_reads(self) -> bool:
+        return self.layout == HASH_LAYOUT
+
+    def stage_write(self, pipeline, memory_id: str, memory_entry: MemoryEntry, expire: Optional[int] = None) -> int:
+        """
+        Queue the commands storing a memory entry on the given pipeline.
+
+        Args:
+            pipeline: The Redis pipeline the commands are added to.
+            memory_id (str): The ID of the memory entry.
+            memory_entry (MemoryEntry): The memory entry to store.
+            expire (Optional[int]): The expiration time in seconds.
+
+        Returns:
+            int: The size of the encoded entry, in bytes.
+        """
+        key = self.connection.memory_key(memory_id)
+        data = self.codec.encode(memory_entry)
+        if self.layout == HASH_LAYOUT:
+            # Replace rather than merge, matching SET semantics.
+            pipeline.delete(key)
+            pipeline.hset(key, mapping={
+                ENTRY_FIELD: data,
+                CONTEXT_TYPE_FIELD: memory_entry.context.context_type,
+                TIMESTAMP_FIELD: memory_entry.context.timestamp.timestamp(),
+                METADATA_FIELD: msgpack.packb(memory_entry.metadata or {}, default=to_jsonable_python),
+            })
+            if expire:
+                pipeline.expire(key, expire)
+        else:
+            # SET ... EX applies the value and its TTL atomically in one command.
+            pipeline.set(key, data, ex=expire or None)
+        return len(data)
+
+    async def read_values(self, conn, memory_ids: List[str]) -> List[Optional[bytes]]:
+        """
+        Read the encoded entries for the given IDs in one pipelined round trip.
+
+        Keys found in the other layout are re-read with the matching command.
+
+        Args:
+            conn: An open Redis connection.
+            memory_ids (List[str]): The IDs of the entries to read.
+
+        Returns:
+            List[Optional[bytes]]: The encoded entries in input order, None for missing IDs.
+        """
+        keys = [self.connection.memory_key(memory_id) for memory_id in memory_ids]
+        values = await self._read(conn, keys, self.layout)
+
+        wrong_type = [index for index, value in enumerate(values) if _is_wrong_type(value)]
+        if wrong_type:
+            other_layout = STRING_LAYOUT if self.layout == HASH_LAYOUT else HASH_LAYOUT
+            retried = await self._read(conn, [keys[index] for index in wrong_type], other_layout)
+            for index, value in zip(wrong_type, retried):
+                values[index] = value
+
+        for value in values:
+            if isinstance(value, Exception):
+                raise value
+        return values
+
+    async def filter_ids(
+            self, conn, memory_ids: List[str], predicate: Callable[[MemoryFilterFields], bool]
+    ) -> List[str]:
+        """
+        Drop the IDs whose filter fields fail the predicate, without reading content.
+
+        IDs that cannot be checked this way (missing keys, or keys still in the
+        string layout) are kept so the caller decides on the full entry.
+
+        Args:
+            conn: An open Redis connection.
+            memory_ids (List[str]): The candidate IDs.
+            predicate (Callable[[MemoryFilterFields], bool]): Whether an entry's fields match.
+
+        Returns:
+            List[str]: The IDs that passed or could not be checked, in input order.
+        """
+        if not self.supports_partial_reads or not memory_ids:
+            return memory_ids
+
+        pipeline = conn.pipeline(transaction=False)
+        for memory_id in memory_ids:
+            pipeline.execute_command(
+                "HMGET", self.connection.memory_key(memory_id),
+                CONTEXT_TYPE_FIELD, TIMESTAMP_FIELD, METADATA_FIELD,
+                **{NEVER_DECODE: True},
+            )
+        rows = await pipeline.execute(raise_on_error=False)
+
+        survivors = []
+        for memory_id, row in zip(memory_ids, rows):
+            if isinstance(row, Exception) or row[1] is None:
+                survivors.append(memory_id)
+                continue
+            context_type, timestamp, metadata = row
+            fields = MemoryFilterFields(
+                context_type=context_type.decode(),
+                timestamp=float(timestamp),
+                metadata=msgpack.unpackb(metadata) if metadata else {},
+            )
+            if predicate(fields):
+                survivors.append(memory_id)
+        return survivors
+
+    @staticmethod
+    async def _read(conn, keys: List[str], layout: str) -> List[Any]:
+        # Values are read undecoded since the codec may store binary data;
+        # reads need no MULTI/EXEC, so the pipeline is not transactional.
+        pipeline = conn.pipeline(transaction=False)
+        for key in keys:
+            if layout == HASH_LAYOUT:
+                pipeline.execute_command("HGET", key, ENTRY_FIELD, **{NEVER_DECODE: True})
+            else:
+                pipeline.execute_command("GET", key, **{NEVER_DECODE: True})
+        return await pipeline.execute(raise_on_error=False)
+
+
+def _is_wrong_type(value: Any) -> bool:
+    return isinstance(value, ResponseError) and str(value).startswith("WRONGTYPE")
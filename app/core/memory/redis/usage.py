@@ -0,0 +1,95 @@
+from typing import Dict, List, NamedTuple
+from app.core.memory.redis.connection import RedisConnection, RedisConnectionError
+from app.core.memory.redis.scripts import RECORD_MEMORY_SIZES, FORGET_MEMORY_SIZES
+from app.utils.logging import memory_logger
+from app.config import settings
+
+USAGE_INDEX = "usage"
+SIZES_INDEX = "sizes"
+
+
+class RedisMemoryUsageError(Exception):
+    """Custom exception for Redis memory usage accounting errors."""
+    pass
+
+
+class MemoryUsage(NamedTuple):
+    count: int
+    bytes: int
+
+
+class RedisMemoryUsage:
+    """
+    Per-agent count and encoded byte total of short-term memories.
+
+    ``agent_index:{agent_id}:sizes`` maps every stored memory ID to the size of
+    its encoded entry and ``agent_index:{agent_id}:usage`` holds the running
+    ``count`` and ``bytes``. Both are updated by server-side scripts queued in
+    the same transaction as the write or delete they account for, so reading
+    the totals is a single HMGET instead of a keyspace SCAN.
+
+    Sizes are kept by memory ID rather than read from the key, so an entry
+    that expired is still subtracted once consolidation or index pruning
+    removes its ID. Writes prune entries whose TTL has passed, and
+    ``RedisSearch.reconcile_usage`` recounts the totals against EXISTS when
+    the budget trips, so vanished entries cannot hold an agent over budget.
+    """
+
+    def __init__(self, connection: RedisConnection):
+        self.connection = connection
+
+    def stage_record(self, pipeline, sizes: Dict[str, int]) -> None:
+        """Queue the script accounting for written entries, given their encoded sizes, on the pipeline."""
+        args = [value for memory_id, size in sizes.items() for value in (memory_id, size)]
+        pipeline.eval(RECORD_MEMORY_SIZES, 2, *self._keys(), *args)
+
+    def stage_forget(self, pipeline, memory_ids: List[str]) -> None:
+        """Queue the script removing deleted entries from the totals on the pipeline."""
+        pipeline.eval(FORGET_MEMORY_SIZES, 2, *self._keys(), *memory_ids)
+
+    async def forget(self, conn, memory_ids: List[str]) -> MemoryUsage:
+        """
+        Remove entries from the totals outside of a transaction, e.g. when pruning expired IDs.
+
+        Args:
+            conn: An open Redis connection.
+            memory_ids (List[str]): The IDs of the removed entries.
+
+        Returns:
+            MemoryUsage: The updated totals.
+        """
+        return self.parse(await conn.eval(FORGET_MEMORY_SIZES, 2, *self._keys(), *memory_ids))
+
+    async def get(self) -> MemoryUsage:
+        """
+        Read the agent's current totals.
+
+        Returns:
+            MemoryUsage: The number of short-term memories and their encoded size in bytes.
+
+        Raises:
+            RedisMemoryUsageError: If the totals cannot be read.
+        """
+        try:
+            async with self.connection.get_connection() as conn:
+                count, size = await conn.hmget(self.connection.index_key(USAGE_INDEX), "count", "bytes")
+            return MemoryUsage(int(count or 0), int(size or 0))
+        except RedisConnectionError as e:
+            memory_logger.error(f"Failed to read memory usage for agent: {self.connection.agent_id}. Error: {str(e)}")
+            raise RedisMemoryUsageError(f"Failed to read memory usage: {str(e)}") from e
+
+    @staticmethod
+    def parse(reply: List[int]) -> MemoryUsage:
+        """Build the totals from a reply of the accounting scripts."""
+        return MemoryUsage(int(reply[0]), int(reply[1]))
+
+    @staticmethod
+    def exceeds_budget(usage: MemoryUsage) -> bool:
+        """Whether the totals exceed MAX_SHORT_TERM_MEMORIES or MAX_SHORT_TERM_MEMORY_BYTES (0 disables either)."""
+        return bool(
+            (settings.MAX_SHORT_TERM_MEMORIES and usage.count > settings.MAX_SHORT_TERM_MEMORIES)
+            or (settings.MAX_SHORT_TERM_MEMORY_BYTES and usage.bytes > settings.MAX_SHORT_TERM_MEMORY_BYTES)
+        )
+
+    def _keys(self) -> List[str]:
+        return [self.connection.index_key(USAGE_INDEX), self.connection.index_key(SIZES_INDEX)]
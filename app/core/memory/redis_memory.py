@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime
 from app.api.models.memory import AdvancedSearchQuery
 from app.core.models import MemoryEntry
@@ -7,6 +7,8 @@ from app.core.memory.redis.connection import RedisConnection, RedisConnectionErr
 from app.core.memory.redis.memory_operations import RedisMemoryOperations
 from app.core.memory.redis.search import RedisSearch
 from app.core.memory.redis.cleanup import RedisCleanup
+from app.core.memory.redis.consolidation import RedisConsolidationQueue
+from app.core.memory.redis.usage import RedisMemoryUsage, MemoryUsage
 from app.utils.logging import memory_logger
 
 class RedisMemoryError(Exception):
@@ -18,7 +20,10 @@ class RedisMemory:
         self.agent_id = agent_id
         self.connection = RedisConnection(agent_id)
         self.operations = RedisMemoryOperations(self.connection)
-        self.search = RedisSearch(self.connection)
+        self.searcher = RedisSearch(self.connection)
+        self.consolidation_queue = RedisConsolidationQueue(self.connection)
+        # Called with the agent's totals after a write leaves them over the short-term budget.
+        self.on_budget_exceeded: Optional[Callable[[MemoryUsage], None]] = None
 
     async def initialize(self) -> None:
         try:
@@ -48,11 +53,22 @@ class RedisMemory:
         try:
             memory_id = await self.operations.add(memory_entry)
             memory_logger.debug(f"Added memory to Redis for agent {self.agent_id}: {memory_id}")
+            self._check_budget()
             return memory_id
         except Exception as e:
             memory_logger.error(f"Error adding memory for agent {self.agent_id}: {str(e)}")
             raise RedisMemoryError("Failed to add memory") from e
 
+    async def add_many(self, memory_entries: List[MemoryEntry]) -> List[str]:
+        try:
+            memory_ids = await self.operations.add_many(memory_entries)
+            memory_logger.debug(f"Added {len(memory_ids)} memories to Redis for agent {self.agent_id}")
+            self._check_budget()
+            return memory_ids
+        except Exception as e:
+            memory_logger.error(f"Error adding memories for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to add memories") from e
+
     async def get(self, memory_id: str) -> Optional[MemoryEntry]:
         try:
             memory = await self.operations.get(memory_id)
@@ -61,9 +77,16 @@ class RedisMemory:
             memory_logger.error(f"Error retrieving memory for agent {self.agent_id}: {str(e)}")
             raise RedisMemoryError("Failed to retrieve memory") from e
 
+    async def get_many(self, memory_ids: List[str]) -> List[Optional[MemoryEntry]]:
+        try:
+            return await self.operations.get_many(memory_ids)
+        except Exception as e:
+            memory_logger.error(f"Error retrieving memories for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to retrieve memories") from e
+
     async def search(self, query: AdvancedSearchQuery) -> List[Dict[str, Any]]:
         try:
-            results = await self.search.search(query)
+            results = await self.searcher.search(query)
             return results
         except Exception as e:
             memory_logger.error(f"Error searching memories for agent {self.agent_id}: {str(e)}")
@@ -77,18 +100,85 @@ class RedisMemory:
             memory_logger.error(f"Error deleting memory for agent {self.agent_id}: {str(e)}")
             raise RedisMemoryError("Failed to delete memory") from e
 
+    async def delete_many(self, memory_ids: List[str]) -> None:
+        try:
+            await self.operations.delete_many(memory_ids)
+            memory_logger.debug(f"Deleted {len(memory_ids)} memories for agent {self.agent_id}")
+        except Exception as e:
+            memory_logger.error(f"Error deleting memories for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to delete memories") from e
+
     async def get_recent(self, limit: int) -> List[Dict[str, Any]]:
         try:
-            results = await self.search.get_recent(limit)
+            results = await self.searcher.get_recent(limit)
             return results
         except Exception as e:
             memory_logger.error(f"Error retrieving recent memories for agent {self.agent_id}: {str(e)}")
             raise RedisMemoryError("Failed to retrieve recent memories") from e
 
+    async def get_page(self, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        try:
+            return await self.searcher.get_page(limit, before)
+        except Exception as e:
+            memory_logger.error(f"Error retrieving a page of memories for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to retrieve memories") from e
+
     async def get_memories_older_than(self, threshold: datetime) -> List[MemoryEntry]:
         try:
-            results = await self.search.get_memories_older_than(threshold)
+            results = await self.searcher.get_memories_older_than(threshold)
             return results
         except Exception as e:
             memory_logger.error(f"Error retrieving old memories for agent {self.agent_id}: {str(e)}")
             raise RedisMemoryError("Failed to retrieve old memories") from e
+
+    async def claim_consolidation_batch(
+            self, threshold: datetime, batch_size: int, visibility_timeout: int
+    ) -> List[str]:
+        try:
+            return await self.consolidation_queue.claim(threshold, batch_size, visibility_timeout)
+        except Exception as e:
+            memory_logger.error(f"Error claiming consolidation batch for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to claim consolidation batch") from e
+
+    async def claim_consolidation_ids(self, memory_ids: List[str], visibility_timeout: int) -> List[str]:
+        try:
+            return await self.consolidation_queue.claim_ids(memory_ids, visibility_timeout)
+        except Exception as e:
+            memory_logger.error(f"Error claiming memories for consolidation for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to claim memories for consolidation") from e
+
+    async def ack_consolidation_batch(self, memory_ids: List[str]) -> None:
+        try:
+            await self.consolidation_queue.ack(memory_ids)
+        except Exception as e:
+            memory_logger.error(f"Error acknowledging consolidation batch for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to acknowledge consolidation batch") from e
+
+    async def release_consolidation_batch(self, memory_ids: List[str]) -> None:
+        try:
+            await self.consolidation_queue.release(memory_ids)
+        except Exception as e:
+            memory_logger.error(f"Error releasing consolidation batch for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to release consolidation batch") from e
+
+    async def get_usage(self) -> MemoryUsage:
+        try:
+            return await self.operations.usage.get()
+        except Exception as e:
+            memory_logger.error(f"Error reading memory usage for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to read memory usage") from e
+
+    async def reconcile_usage(self) -> MemoryUsage:
+        try:
+            return await self.searcher.reconcile_usage()
+        except Exception as e:
+            memory_logger.error(f"Error reconciling memory usage for agent {self.agent_id}: {str(e)}")
+            raise RedisMemoryError("Failed to reconcile memory usage") from e
+
+    async def exceeds_budget(self) -> bool:
+        return RedisMemoryUsage.exceeds_budget(await self.get_usage())
+
+    def _check_budget(self) -> None:
+        usage = self.operations.last_usage
+        if self.on_budget_exceeded and usage and RedisMemoryUsage.exceeds_budget(usage):
+            self.on_budget_exceeded(usage)
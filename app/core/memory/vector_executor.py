@@ -0,0 +1,39 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.config import settings
+
+# Opening the Chroma store and loading embedding models block for seconds. They run on
+# threads of their own, so a new agent warming up neither stalls the event loop nor
+# occupies the default executor that every other agent's queries go through.
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking vector store or model setup call on the dedicated executor.
+
+    Args:
+        func (Callable[..., Any]): The blocking callable.
+        *args: Positional arguments for ``func``.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        Any: The return value of ``func``.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.VECTOR_INIT_WORKERS, thread_name_prefix="vector-init"
+        )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown() -> None:
+    """Stop the executor's threads; the next call starts new ones."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
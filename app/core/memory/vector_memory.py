@@ -1,40 +1,46 @@
-from uuid import UUID, uuid4
+from uuid import UUID
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime
-import chromadb
-from chromadb.config import Settings as ChromaDBSettings
-from chromadb.utils import embedding_functions
 from app.utils.logging import memory_logger
 from app.api.models.memory import AdvancedSearchQuery
 from app.core.models import MemoryEntry, MemoryContext
 from app.core.memory.memory_interface import MemorySystemInterface
+from app.core.memory.embeddings import embedding_service
+from app.core.memory.chroma_registry import chroma_registry
 from app.config import settings
 
+# How adds are acknowledged: "verify" reads the written IDs back before returning, "async" reads
+# them back in the background and only reports failures, "trust" relies on the upsert raising.
+WRITE_ACK_MODES = ("verify", "async", "trust")
+
 class VectorMemoryError(Exception):
     """Custom exception for ChromaDB-related errors."""
     pass
 
 class VectorMemory(MemorySystemInterface):
-    def __init__(self, collection_name: str):
+    def __init__(self, collection_name: str, ack_mode: Optional[str] = None):
         self.collection_name = collection_name
+        self.ack_mode = ack_mode or settings.VECTOR_WRITE_ACK_MODE
+        if self.ack_mode not in WRITE_ACK_MODES:
+            raise VectorMemoryError(f"Unknown write acknowledgement mode: {self.ack_mode}")
         self.client = None
         self.collection = None
         self.embedding_function = None
+        self.unverified_writes = 0
+        self._pending_verifications: Set[asyncio.Task] = set()
         self._lock = asyncio.Lock()
 
     async def initialize(self) -> None:
         async with self._lock:
             try:
-                chroma_db_settings = ChromaDBSettings(
-                    chroma_db_impl="duckdb+parquet",
-                    persist_directory=settings.CHROMA_PERSIST_DIRECTORY,
-                )
-                self.client = chromadb.PersistentClient(path=chroma_db_settings.persist_directory)
-                self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=settings.EMBEDDING_MODEL)
-                self.collection = self.client.get_or_create_collection(
-                    name=self.collection_name,
-                    embedding_function=self.embedding_function
+                # The persistent store is opened once per process and shared by all agents.
+                self.client = await chroma_registry.get_client()
+                # Shared by every collection in the process; the model is loaded only once.
+                if self.embedding_function is None:
+                    self.embedding_function = await embedding_service.get(settings.EMBEDDING_MODEL)
+                self.collection = await chroma_registry.get_collection(
+                    self.collection_name, self.embedding_function
                 )
                 memory_logger.info(f"ChromaDB collection initialized: {self.collection_name}")
             except Exception as e:
@@ -47,26 +53,20 @@ class VectorMemory(MemorySystemInterface):
             raise VectorMemoryError("VectorMemory not initialized")
 
         try:
-            metadata = {
-                **memory_entry.metadata,
-                "context_type": memory_entry.context.context_type,
-                "context_timestamp": memory_entry.context.timestamp.isoformat(),
-                **memory_entry.context.metadata,
-            }
+            metadata = self._metadata(memory_entry)
 
-            memory_id = str(uuid4())
+            # The entry's own time-ordered ID, so a memory keeps its ID when it moves from
+            # short-term storage; upserting makes a retried consolidation a no-op.
+            memory_id = str(memory_entry.id)
 
             await asyncio.to_thread(
-                self.collection.add,
+                self.collection.upsert,
                 documents=[memory_entry.content],
                 metadatas=[metadata],
                 ids=[memory_id],
             )
 
-            # Verify the addition by querying the collection
-            result = await asyncio.to_thread(self.collection.get, ids=[memory_id])
-            if not result or not result['ids']:
-                raise VectorMemoryError("Failed to verify memory addition")
+            await self._acknowledge([memory_id])
 
             memory_logger.debug(f"Added document to ChromaDB: {memory_id}")
             return memory_id
@@ -75,6 +75,80 @@ class VectorMemory(MemorySystemInterface):
             memory_logger.error(f"Error adding memory to ChromaDB: {str(e)}")
             raise VectorMemoryError(f"Failed to add memory entry: {e}")
 
+    async def add_many(self, memory_entries: List[MemoryEntry], ack_mode: Optional[str] = None) -> List[str]:
+        # ack_mode overrides VECTOR_WRITE_ACK_MODE for this call, e.g. "verify" when the caller
+        # deletes the only other copy once this returns.
+        ack_mode = ack_mode or self.ack_mode
+        if ack_mode not in WRITE_ACK_MODES:
+            raise VectorMemoryError(f"Unknown write acknowledgement mode: {ack_mode}")
+        if not self.collection:
+            memory_logger.error("Attempt to add memories before initialization")
+            raise VectorMemoryError("VectorMemory not initialized")
+
+        # One upsert per VECTOR_ADD_BATCH_SIZE entries: the embedding function encodes the whole
+        # batch in a single call, and each batch is acknowledged as a whole.
+        memory_ids = [str(memory_entry.id) for memory_entry in memory_entries]
+        batch_size = settings.VECTOR_ADD_BATCH_SIZE
+        try:
+            for start in range(0, len(memory_entries), batch_size):
+                batch = memory_entries[start:start + batch_size]
+                batch_ids = memory_ids[start:start + batch_size]
+                await asyncio.to_thread(
+                    self.collection.upsert,
+                    documents=[memory_entry.content for memory_entry in batch],
+                    metadatas=[self._metadata(memory_entry) for memory_entry in batch],
+                    ids=batch_ids,
+                )
+                await self._acknowledge(batch_ids, ack_mode)
+
+            memory_logger.debug(f"Added {len(memory_ids)} documents to ChromaDB")
+            return memory_ids
+
+        except Exception as e:
+            memory_logger.error(f"Error adding memories to ChromaDB: {str(e)}")
+            raise VectorMemoryError(f"Failed to add memory entries: {e}")
+
+    async def _acknowledge(self, memory_ids: List[str], ack_mode: Optional[str] = None) -> None:
+        ack_mode = ack_mode or self.ack_mode
+        if ack_mode == "verify":
+            await self._verify(memory_ids)
+        elif ack_mode == "async":
+            verification = asyncio.create_task(self._verify_in_background(memory_ids))
+            self._pending_verifications.add(verification)
+            verification.add_done_callback(self._pending_verifications.discard)
+
+    async def _verify(self, memory_ids: List[str]) -> None:
+        result = await asyncio.to_thread(self.collection.get, ids=memory_ids, include=[])
+        if not result or len(result['ids']) != len(set(memory_ids)):
+            raise VectorMemoryError("Failed to verify memory addition")
+
+    async def _verify_in_background(self, memory_ids: List[str]) -> None:
+        try:
+            await self._verify(memory_ids)
+        except Exception as e:
+            self.unverified_writes += len(memory_ids)
+            memory_logger.error(
+                f"Background verification of {len(memory_ids)} memories failed in collection "
+                f"{self.collection_name}: {str(e)}. IDs: {memory_ids}"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the write acknowledgement mode, background verifications in flight and failed ones."""
+        return {
+            "ack_mode": self.ack_mode,
+            "pending_verifications": len(self._pending_verifications),
+            "unverified_writes": self.unverified_writes,
+        }
+
+    @staticmethod
+    def _metadata(memory_entry: MemoryEntry) -> Dict[str, Any]:
+        return {
+            **memory_entry.metadata,
+            "context_type": memory_entry.context.context_type,
+            "context_timestamp": memory_entry.context.timestamp.isoformat(),
+            **memory_entry.context.metadata,
+        }
+
     async def get(self, memory_id: str) -> Optional[MemoryEntry]:
         try:
             result = await asyncio.to_thread(self.collection.get, ids=[memory_id])
@@ -86,6 +160,7 @@ class VectorMemory(MemorySystemInterface):
                     metadata={k: v for k, v in metadata.items() if k not in result["metadatas"][0]}
                 )
                 return MemoryEntry(
+                    id=result["ids"][0],
                     content=result["documents"][0],
                     metadata={k: v for k, v in metadata.items() if k in result["metadatas"][0]},
                     context=context
@@ -134,6 +209,7 @@ class VectorMemory(MemorySystemInterface):
                         metadata={k: v for k, v in meta.items() if k not in meta},
                     )
                     memory_entry = MemoryEntry(
+                        id=id,
                         content=doc,
                         metadata={k: v for k, v in meta.items() if k in meta},
                         context=context,
@@ -186,6 +262,7 @@ class VectorMemory(MemorySystemInterface):
                     metadata={k: v for k, v in meta.items() if k not in meta},
                 )
                 memory_entry = MemoryEntry(
+                    id=id,
                     content=doc,
                     metadata={k: v for k, v in meta.items() if k in meta},
                     context=context,
@@ -211,13 +288,14 @@ class VectorMemory(MemorySystemInterface):
             memory_logger.debug(f"Retrieved {len(results['ids'][0])} old memories from ChromaDB")
 
             old_memories = []
-            for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
+            for id, doc, meta in zip(results["ids"][0], results["documents"][0], results["metadatas"][0]):
                 context = MemoryContext(
                     context_type=meta.pop("context_type"),
                     timestamp=datetime.fromisoformat(meta.pop("context_timestamp")),
                     metadata={k: v for k, v in meta.items() if k not in meta},
                 )
                 memory_entry = MemoryEntry(
+                    id=id,
                     content=doc,
                     metadata={k: v for k, v in meta.items() if k in meta},
                     context=context,
@@ -243,11 +321,16 @@ class VectorMemory(MemorySystemInterface):
 
     async def close(self) -> None:
         try:
+            if self._pending_verifications:
+                # Let background verifications of recent adds report before the collection goes.
+                await asyncio.gather(*self._pending_verifications, return_exceptions=True)
             if self.client:
-                # Perform any necessary cleanup
+                # The client and collection handles stay open in the registry until shutdown
                 if self.collection:
                     self.collection = None
                 self.client = None
+                if self.embedding_function:
+                    embedding_service.release(settings.EMBEDDING_MODEL)
                 self.embedding_function = None
             memory_logger.info("ChromaDB resources released")
         except Exception as e:
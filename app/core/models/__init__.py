@@ -1,11 +1,11 @@
 from .agent import AgentConfig, AgentCreationRequest, AgentCreationResponse, AgentInfoResponse, AgentUpdateRequest, AgentUpdateResponse
 from .function import FunctionDefinition
-from .memory import MemoryConfig, MemoryEntry, MemoryContext
+from .memory import MemoryConfig, MemoryEntry, MemoryContext, new_memory_id, memory_id_time
 from .llm import LLMProviderConfig
 
 __all__ = [
     "AgentConfig", "AgentCreationRequest", "AgentCreationResponse", "AgentInfoResponse", "AgentUpdateRequest", "AgentUpdateResponse",
     "FunctionDefinition",
-    "MemoryConfig", "MemoryEntry", "MemoryContext",
+    "MemoryConfig", "MemoryEntry", "MemoryContext", "new_memory_id", "memory_id_time",
     "LLMProviderConfig"
 ]
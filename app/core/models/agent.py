@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 from app.core.models.llm import LLMProviderConfig
 from app.core.models.memory import MemoryConfig
@@ -42,6 +42,9 @@ class AgentInfoResponse(BaseModel):
     conversation_history_length: int = Field(
         ..., description="The number of messages in the agent's conversation history"
     )
+    memory_status: Literal["warming", "ready", "failed"] = Field(
+        "ready", description="'warming' while the agent's long-term memory is still loading, 'ready' or 'failed'"
+    )
 
     model_config = ConfigDict(extra="forbid")
 
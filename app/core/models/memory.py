@@ -1,7 +1,46 @@
+import secrets
+import threading
+import time
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from datetime import datetime
-from uuid import UUID, uuid4
+from uuid import UUID
+
+_id_lock = threading.Lock()
+_last_id_ms = 0
+_last_id_counter = 0
+
+
+def new_memory_id() -> UUID:
+    """
+    Return a time-ordered memory ID: a UUIDv7 (RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so IDs sort
+    chronologically both as integers and as canonical strings. Within a
+    millisecond the 12-bit ``rand_a`` field counts up from a random start,
+    so IDs generated by one process are strictly increasing even if the clock
+    steps back. The remaining 62 bits are random.
+    """
+    global _last_id_ms, _last_id_counter
+    with _id_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_id_ms:
+            # Seeded below 0x800 to leave room for the counter within the millisecond.
+            counter = secrets.randbits(11)
+        else:
+            ms = _last_id_ms
+            counter = _last_id_counter + 1
+            if counter > 0xFFF:
+                ms += 1
+                counter = secrets.randbits(11)
+        _last_id_ms, _last_id_counter = ms, counter
+    return UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | secrets.randbits(62))
+
+
+def memory_id_time(memory_id: Union[str, UUID]) -> datetime:
+    """Return the creation time encoded in a memory ID from ``new_memory_id``."""
+    value = memory_id if isinstance(memory_id, UUID) else UUID(memory_id)
+    return datetime.fromtimestamp((value.int >> 80) / 1000)
 
 
 class MemoryConfig(BaseModel):
@@ -20,7 +59,7 @@ class MemoryContext(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 class MemoryEntry(BaseModel):
-    id: UUID = Field(default_factory=uuid4)
+    id: UUID = Field(default_factory=new_memory_id, description="Time-ordered ID of the memory")
     content: str = Field(..., description="The content of the memory")
     metadata: Optional[Dict[str, Any]] = Field(
         default=None, description="Optional metadata associated with the memory"
@@ -20,6 +20,14 @@ class MockFactory:
 def mock_factory():
     return MockFactory()
 
+@pytest.fixture(autouse=True)
+async def close_shared_redis_pool():
+    # The process-wide pool binds its connections to the loop that opened it,
+    # and every test runs on a new loop, so close it after each test.
+    from app.core.memory.redis.pool import redis_pool_manager
+    yield
+    await redis_pool_manager.close()
+
 def pytest_configure(config):
     config.addinivalue_line(
         "markers", "redis: mark test as requiring Redis"
@@ -0,0 +1,61 @@
+import random
+import string
+import time
+import traceback
+from datetime import datetime
+from app.core.memory.redis.codec import RedisMemoryCodec, CODECS
+from app.core.models import MemoryEntry, MemoryContext
+from app.config import settings
+
+
+def make_entry(content_size: int) -> MemoryEntry:
+    # Varied words so compression ratios resemble real text rather than a repeated line.
+    rng = random.Random(content_size)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(2000)]
+    return MemoryEntry(
+        content=" ".join(rng.choices(words, k=content_size // 5 + 1))[:content_size],
+        metadata={"source": "benchmark", "size": content_size},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={"run": 1})
+    )
+
+
+def codec_benchmark(codec_name: str, memory_entry: MemoryEntry, iterations: int, compression_threshold: int = 0):
+    codec = RedisMemoryCodec(codec_name, compression_threshold=compression_threshold)
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        data = codec.encode(memory_entry)
+    encode_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        decoded = codec.decode(data)
+    decode_time = time.perf_counter() - start_time
+
+    assert decoded == memory_entry
+    return len(data), iterations / encode_time, iterations / decode_time
+
+
+def run_benchmarks():
+    try:
+        for content_size, iterations in [(200, 20000), (2_000, 10000), (20_000, 2000), (200_000, 200), (1_000_000, 50)]:
+            memory_entry = make_entry(content_size)
+            print(f"\nContent size: {content_size} bytes ({iterations} iterations)")
+            baseline_size = None
+            variants = [(codec_name, 0) for codec_name in CODECS]
+            variants += [(codec_name, settings.REDIS_COMPRESSION_THRESHOLD) for codec_name in CODECS]
+            for codec_name, compression_threshold in variants:
+                size, encode_rate, decode_rate = codec_benchmark(codec_name, memory_entry, iterations, compression_threshold)
+                baseline_size = baseline_size or size
+                label = f"{codec_name}+zlib" if compression_threshold else codec_name
+                print(
+                    f"  {label:>12}: {size:>9} bytes ({size / baseline_size:6.1%} of json), "
+                    f"encode {encode_rate:>10.0f}/s, decode {decode_rate:>10.0f}/s"
+                )
+    except Exception as e:
+        print(f"An error occurred during benchmarking: {str(e)}")
+        print(f"Traceback: {traceback.format_exc()}")
+
+
+if __name__ == "__main__":
+    run_benchmarks()
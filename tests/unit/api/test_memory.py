@@ -138,6 +138,29 @@ async def test_add_long_term_memory(async_client: AsyncClient, auth_headers, tes
     assert "memory_id" in added_memory
     assert added_memory["message"] == "Memory added successfully"
 
+async def test_add_many_long_term_memories(async_client: AsyncClient, auth_headers, test_agent):
+    memory_data = {
+        "agent_id": test_agent,
+        "memory_type": MemoryType.LONG_TERM,
+        "entries": [
+            {
+                "content": f"Bulk long-term memory content {i}",
+                "metadata": {"key": "bulk_value"},
+                "context": {
+                    "context_type": "test_context",
+                    "timestamp": datetime.now().isoformat(),
+                    "metadata": {}
+                }
+            }
+            for i in range(3)
+        ]
+    }
+    response = await async_client.post("/memory/add-many", json=memory_data, headers=auth_headers)
+    assert response.status_code == 201
+    added_memories = response.json()
+    assert len(added_memories["memory_ids"]) == 3
+    assert added_memories["message"] == "Memories added successfully"
+
 async def test_search_long_term_memory(async_client: AsyncClient, auth_headers, test_agent):
     await test_add_long_term_memory(async_client, auth_headers, test_agent)
     search_data = {
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from app.core.memory.chroma_registry import ChromaRegistry
+
+
+class ConstantEmbeddingFunction(EmbeddingFunction):
+    def __call__(self, input: Documents) -> Embeddings:
+        return [[1.0, 0.0, 0.0] for _ in input]
+
+
+@pytest.mark.asyncio
+async def test_chroma_registry_shares_client_and_collections(tmp_path):
+    registry = ChromaRegistry()
+    with patch("app.core.memory.chroma_registry.settings.CHROMA_PERSIST_DIRECTORY", str(tmp_path)):
+        clients = await asyncio.gather(*(registry.get_client() for _ in range(5)))
+        assert all(client is clients[0] for client in clients)
+
+        embedding_function = ConstantEmbeddingFunction()
+        collections = await asyncio.gather(
+            *(registry.get_collection(f"agent_{i % 2}", embedding_function) for i in range(6))
+        )
+        assert collections[0] is collections[2] is collections[4]
+        assert collections[1] is collections[3] is collections[5]
+        assert collections[0] is not collections[1]
+        assert registry.stats() == {"path": str(tmp_path), "open": True, "collections": 2}
+
+        collections[0].add(ids=["memory"], documents=["persisted"])
+        await registry.close()
+        assert registry.stats()["open"] is False
+
+        # Reopened from disk after close.
+        collection = await registry.get_collection("agent_0", embedding_function)
+        assert collection.get(ids=["memory"])["documents"] == ["persisted"]
+        await registry.close()
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from redis.exceptions import ConnectionError
+from app.core.memory.consolidation_worker import ConsolidationWorker
+from app.core.memory.redis.consolidation_stream import ConsolidationMessage
+
+
+def make_worker(expiry_listener=None):
+    stream = MagicMock()
+    stream.reclaim = AsyncMock(return_value=[])
+    stream.read_due = AsyncMock(return_value=[])
+    stream.ack = AsyncMock()
+    return ConsolidationWorker(
+        consumer="test", stream=stream, poll_interval=0.01, expiry_listener=expiry_listener or MagicMock()
+    )
+
+
+def memory_system_factory(failing_agents):
+    def build(agent_id, config):
+        memory_system = MagicMock()
+        memory_system.agent_id = agent_id
+        memory_system.close = AsyncMock()
+        if agent_id in failing_agents:
+            memory_system.initialize = AsyncMock(side_effect=ConnectionError("refused"))
+        else:
+            memory_system.initialize = AsyncMock()
+        memory_system.consolidate_memory_ids = AsyncMock(side_effect=lambda ids: len(ids))
+        return memory_system
+    return build
+
+
+@pytest.mark.asyncio
+async def test_run_once_acknowledges_agents_that_succeeded():
+    worker = make_worker()
+    worker.stream.read_due.return_value = [
+        ConsolidationMessage("1-0", "agent-a", "m1"),
+        ConsolidationMessage("2-0", "agent-b", "m2"),
+        ConsolidationMessage("3-0", "agent-a", "m3"),
+    ]
+
+    with patch("app.core.memory.consolidation_worker.MemorySystem", side_effect=memory_system_factory({"agent-b"})):
+        assert await worker.run_once() == 3
+
+    worker.stream.ack.assert_awaited_once_with(["1-0", "3-0"])
+
+
+@pytest.mark.asyncio
+async def test_expired_loop_survives_unexpected_errors():
+    listener = MagicMock()
+    calls = 0
+
+    async def next_batch(batch_size, timeout):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError("refused")
+        if calls == 3:
+            worker.stop()
+        return {"agent-a": ["m1"]}
+
+    listener.next_batch = next_batch
+    worker = make_worker(listener)
+
+    with patch("app.core.memory.consolidation_worker.MemorySystem", side_effect=memory_system_factory(set())):
+        await asyncio.wait_for(worker._run_expired(), timeout=5)
+
+    assert calls == 3
+    worker.memory_systems["agent-a"].consolidate_memory_ids.assert_awaited_with(["m1"])
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_memory_systems_are_closed():
+    worker = make_worker()
+    worker.max_memory_systems = 2
+
+    with patch("app.core.memory.consolidation_worker.MemorySystem", side_effect=memory_system_factory(set())):
+        async with worker._memory_system("agent-a") as agent_a:
+            pass
+        async with worker._memory_system("agent-b") as agent_b:
+            # agent-b is the least recently used once agent-c is opened, but it is still in use.
+            async with worker._memory_system("agent-c") as agent_c:
+                pass
+            async with worker._memory_system("agent-a") as reopened:
+                pass
+            assert list(worker.memory_systems) == ["agent-b", "agent-a"]
+
+    agent_a.close.assert_awaited_once()
+    agent_c.close.assert_awaited_once()
+    agent_b.close.assert_not_awaited()
+    assert reopened is not agent_a
+    assert worker.memory_systems["agent-a"] is reopened
@@ -0,0 +1,38 @@
+import numpy as np
+from app.core.memory.embedding_cache import EmbeddingCache, CachedEmbeddingFunction
+
+
+class CountingEmbeddingFunction:
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, input):
+        self.encoded.extend(input)
+        return [np.array([float(len(text)), 1.0], dtype=np.float32) for text in input]
+
+
+def test_embedding_cache_encodes_repeated_content_once(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    model = CountingEmbeddingFunction()
+    function = CachedEmbeddingFunction(model, "model-a", EmbeddingCache(max_entries=100, path=path))
+
+    first = function(["system prompt", "tool output", "system prompt"])
+    assert model.encoded == ["system prompt", "tool output"]
+    second = function(["  system   prompt ", "new content"])
+    assert model.encoded == ["system prompt", "tool output", "new content"]
+    assert np.array_equal(first[0], second[0])
+    assert function.cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 4, "entries": 3}
+
+    # Another model does not share vectors.
+    other_model = CountingEmbeddingFunction()
+    CachedEmbeddingFunction(other_model, "model-b", function.cache)(["system prompt"])
+    assert other_model.encoded == ["system prompt"]
+    function.cache.close()
+
+    # A new process finds the vectors on disk.
+    restarted = CountingEmbeddingFunction()
+    function = CachedEmbeddingFunction(restarted, "model-a", EmbeddingCache(max_entries=100, path=path))
+    assert np.array_equal(function(["tool output"])[0], first[1])
+    assert restarted.encoded == []
+    assert function.cache.stats()["disk_hits"] == 1
+    function.cache.close()
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app.core.memory.embeddings import EmbeddingService, EmbeddingServiceError
+
+
+class FakeEmbeddingFunction:
+    loads = 0
+
+    def __init__(self, model_name):
+        FakeEmbeddingFunction.loads += 1
+        self.model_name = model_name
+
+
+@pytest.fixture
+def fake_model():
+    FakeEmbeddingFunction.loads = 0
+    with patch(
+        "app.core.memory.embeddings.embedding_functions.SentenceTransformerEmbeddingFunction",
+        FakeEmbeddingFunction,
+    ):
+        yield FakeEmbeddingFunction
+
+
+@pytest.mark.asyncio
+async def test_embedding_model_loaded_once_for_concurrent_collections(fake_model):
+    service = EmbeddingService()
+    functions = await asyncio.gather(*(service.get("model-a") for _ in range(10)))
+
+    assert fake_model.loads == 1
+    assert all(function is functions[0] for function in functions)
+    stats = service.stats()["model-a"]
+    assert stats["collections"] == 10
+    assert stats["load_seconds"] >= 0
+    assert stats["memory_bytes"] is None
+
+    service.release("model-a")
+    assert service.stats()["model-a"]["collections"] == 9
+    assert await service.get("model-b") is not functions[0]
+    assert fake_model.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_embedding_model_load_failure_is_retried():
+    service = EmbeddingService()
+    with patch(
+        "app.core.memory.embeddings.embedding_functions.SentenceTransformerEmbeddingFunction",
+        side_effect=ValueError("sentence_transformers is not installed"),
+    ):
+        with pytest.raises(EmbeddingServiceError):
+            await service.get("model-a")
+    assert service.stats() == {}
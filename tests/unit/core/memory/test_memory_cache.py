@@ -0,0 +1,139 @@
+import pytest
+from uuid import UUID
+from unittest.mock import AsyncMock
+from datetime import datetime, timedelta
+from app.core.memory.memory_cache import MemoryCache, MemoryCacheError
+from app.core.memory.memory_system import MemorySystem
+from app.core.models import MemoryEntry, MemoryContext, MemoryConfig
+
+
+def make_entry(content="Test content"):
+    return MemoryEntry(
+        content=content,
+        metadata={},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+    )
+
+
+@pytest.fixture
+def memory_system():
+    short_term = AsyncMock()
+    long_term = AsyncMock()
+    return MemorySystem(
+        agent_id='12345678-1234-5678-1234-567812345678',
+        config=MemoryConfig(use_redis_cache=True, use_long_term_memory=True),
+        short_term=short_term,
+        long_term=long_term,
+        cache=MemoryCache(max_bytes=1 << 20, policy="lru"),
+    )
+
+
+def test_memory_cache_rejects_unknown_policy():
+    with pytest.raises(MemoryCacheError):
+        MemoryCache(max_bytes=1024, policy="random")
+
+
+def test_memory_cache_capacity_is_in_bytes():
+    cache = MemoryCache(max_bytes=4096, policy="lru")
+    epoch = cache.epoch("agent", "long_term")
+    cache.put(MemoryCache.key("agent", "long_term", "small"), make_entry("x"), epoch)
+    cache.put(MemoryCache.key("agent", "long_term", "large"), make_entry("x" * 8192), epoch)
+
+    assert cache.get(MemoryCache.key("agent", "long_term", "small")) is not None
+    assert cache.get(MemoryCache.key("agent", "long_term", "large")) is None
+    assert cache.stats()["bytes"] <= 4096
+
+
+@pytest.mark.asyncio
+async def test_retrieve_is_served_from_cache(memory_system):
+    memory_entry = make_entry()
+    memory_system.long_term.get.return_value = memory_entry
+
+    first = await memory_system.retrieve("LONG_TERM", "memory-1")
+    second = await memory_system.retrieve("LONG_TERM", "memory-1")
+
+    assert first == second == memory_entry
+    assert second is not memory_entry
+    memory_system.long_term.get.assert_awaited_once_with("memory-1")
+    assert memory_system.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieve_many_loads_only_missing_entries(memory_system):
+    entries = {memory_id: make_entry(memory_id) for memory_id in ("a", "b", "c")}
+    memory_system.short_term.get_many.side_effect = lambda ids: [entries[memory_id] for memory_id in ids]
+
+    await memory_system.retrieve("SHORT_TERM", "a")
+    results = await memory_system.retrieve_many("SHORT_TERM", ["a", "b", "c"])
+
+    assert [result.content for result in results] == ["a", "b", "c"]
+    assert memory_system.short_term.get_many.await_args_list[-1].args == (["b", "c"],)
+
+
+@pytest.mark.asyncio
+async def test_delete_invalidates_cached_entry(memory_system):
+    memory_system.short_term.get_many.return_value = [make_entry()]
+    await memory_system.retrieve("SHORT_TERM", "memory-1")
+
+    await memory_system.delete("SHORT_TERM", "memory-1")
+    memory_system.short_term.get_many.return_value = [None]
+
+    assert await memory_system.retrieve("SHORT_TERM", "memory-1") is None
+
+
+@pytest.mark.asyncio
+async def test_consolidation_invalidates_moved_entries(memory_system):
+    memory_system.short_term.get_many.return_value = [make_entry()]
+    await memory_system.retrieve("SHORT_TERM", "memory-1")
+
+    memory_system.short_term.claim_consolidation_batch.side_effect = [["memory-1"], []]
+    await memory_system.consolidate_memories()
+    memory_system.short_term.get_many.return_value = [None]
+
+    assert await memory_system.retrieve("SHORT_TERM", "memory-1") is None
+
+
+@pytest.mark.asyncio
+async def test_forget_invalidates_long_term_entries(memory_system):
+    memory_entry = make_entry()
+    memory_id = str(memory_entry.id)
+    memory_system.long_term.get.return_value = memory_entry
+    await memory_system.retrieve("LONG_TERM", memory_id)
+
+    memory_system.long_term.get_memories_older_than.return_value = [memory_entry]
+    await memory_system.forget_old_memories(timedelta(days=1))
+    memory_system.long_term.get.return_value = None
+
+    memory_system.long_term.delete.assert_awaited_once_with(memory_id)
+    assert await memory_system.retrieve("LONG_TERM", memory_id) is None
+
+
+def test_put_skipped_after_concurrent_invalidation():
+    cache = MemoryCache(max_bytes=1 << 20, policy="ttl")
+    key = MemoryCache.key("agent", "short_term", "memory-1")
+    epoch = cache.epoch("agent", "short_term")
+    cache.invalidate([key])
+    cache.put(key, make_entry(), epoch)
+    assert cache.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_add_assigns_time_ordered_ids_shared_by_both_tiers(memory_system):
+    entries = [make_entry(str(i)) for i in range(3)]
+    memory_system.short_term.add_many.side_effect = lambda memory_entries: [
+        str(memory_entry.id) for memory_entry in memory_entries
+    ]
+    memory_ids = await memory_system.add_many("SHORT_TERM", entries)
+    assert memory_ids == sorted(memory_ids)
+    assert all(UUID(memory_id).version == 7 for memory_id in memory_ids)
+
+    # Consolidation hands the same entry, and so the same ID, to the long-term tier.
+    memory_system.short_term.claim_consolidation_batch.side_effect = [memory_ids[:1], []]
+    memory_system.short_term.get_many.return_value = entries[:1]
+    await memory_system.consolidate_memories()
+    assert str(memory_system.long_term.add_many.await_args.args[0][0].id) == memory_ids[0]
+
+    chosen = make_entry()
+    chosen.id = UUID("12345678-1234-5678-1234-567812345678")
+    memory_system.short_term.add.side_effect = lambda memory_entry: str(memory_entry.id)
+    assert await memory_system.add("SHORT_TERM", chosen) == "12345678-1234-5678-1234-567812345678"
@@ -1,7 +1,10 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch
 from datetime import datetime, timedelta
 from app.core.memory.memory_system import MemorySystem, MemorySystemError
+from app.core.memory.vector_memory import VectorMemoryError
+from app.core.memory.redis.usage import MemoryUsage
 from app.api.models.memory import AdvancedSearchQuery, MemoryType
 from app.core.models import MemoryEntry, MemoryContext, MemoryConfig
 
@@ -46,7 +49,6 @@ async def test_add_short_term_memory(memory_system):
     )
     memory_id = await memory_system.add("SHORT_TERM", memory_entry)
     assert isinstance(memory_id, str)
-    assert len(memory_system.consolidation_queue) == 1
 
 
 @pytest.mark.asyncio
@@ -292,3 +294,97 @@ async def test_search_memory(memory_system):
     search_results = await memory_system.search(AdvancedSearchQuery(query="test", memory_type=MemoryType.SHORT_TERM))
     assert len(search_results) > 0
     assert search_results[0].content == "Test memory content"
+
+
+@pytest.mark.asyncio
+async def test_budget_exceeded_consolidates_oldest_memories(memory_config):
+    short_term = AsyncMock()
+    long_term = AsyncMock()
+    system = MemorySystem(
+        agent_id='12345678-1234-5678-1234-567812345678',
+        config=memory_config,
+        short_term=short_term,
+        long_term=long_term,
+    )
+    short_term.exceeds_budget.side_effect = [True, True, False]
+    short_term.claim_consolidation_batch.side_effect = [["memory-1"], ["memory-2"]]
+    short_term.get_many.side_effect = lambda memory_ids: [
+        MemoryEntry(
+            content=memory_id,
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+        for memory_id in memory_ids
+    ]
+
+    short_term.on_budget_exceeded(MemoryUsage(count=1001, bytes=0))
+    # A second write over budget while the consolidation runs does not start another one.
+    short_term.on_budget_exceeded(MemoryUsage(count=1002, bytes=0))
+    await system._budget_consolidation
+
+    # Totals are recounted against the entries that still exist before anything is moved.
+    short_term.reconcile_usage.assert_awaited_once()
+    assert [
+        [memory.content for memory in call.args[0]] for call in long_term.add_many.await_args_list
+    ] == [["memory-1"], ["memory-2"]]
+    # The short-term copies are deleted, so the long-term writes are always verified first.
+    assert all(call.kwargs["ack_mode"] == "verify" for call in long_term.add_many.await_args_list)
+    short_term.delete_many.assert_any_await(["memory-2"])
+    assert short_term.claim_consolidation_batch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_long_term_memory_warms_up_in_background(memory_config):
+    warmed_up = asyncio.Event()
+
+    async def slow_initialize():
+        await warmed_up.wait()
+
+    long_term = AsyncMock()
+    long_term.initialize.side_effect = slow_initialize
+    long_term.add.return_value = "memory-1"
+    system = MemorySystem(
+        agent_id="agent", config=memory_config, short_term=AsyncMock(), long_term=long_term
+    )
+
+    await system.initialize()
+    assert system.status == "warming"
+
+    memory_entry = MemoryEntry(
+        content="Test content",
+        metadata={},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+    )
+    add = asyncio.create_task(system.add("LONG_TERM", memory_entry))
+    await asyncio.sleep(0.01)
+    assert not add.done()
+    long_term.add.assert_not_awaited()
+
+    warmed_up.set()
+    assert await add == "memory-1"
+    assert system.status == "ready"
+    await system.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_long_term_warm_up_is_retried(memory_config):
+    long_term = AsyncMock()
+    long_term.initialize.side_effect = [VectorMemoryError("store unavailable"), None]
+    long_term.add.return_value = "memory-1"
+    system = MemorySystem(
+        agent_id="agent", config=memory_config, short_term=AsyncMock(), long_term=long_term
+    )
+
+    await system.initialize()
+    await asyncio.sleep(0)
+    assert system.status == "failed"
+
+    memory_entry = MemoryEntry(
+        content="Test content",
+        metadata={},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+    )
+    assert await system.add("LONG_TERM", memory_entry) == "memory-1"
+    assert long_term.initialize.call_count == 2
+    assert system.status == "ready"
+    await system.close()
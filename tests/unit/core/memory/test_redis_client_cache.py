@@ -0,0 +1,83 @@
+import asyncio
+import os
+import pytest
+from redis.asyncio import Redis
+from unittest.mock import patch
+from app.core.memory.redis.client_cache import RedisClientCache
+from app.core.memory.redis.pool import RedisPoolManager
+from app.config import settings
+
+
+@pytest.fixture
+def redis_url():
+    return os.getenv("REDIS_URL", "redis://localhost:6379")
+
+
+@pytest.fixture
+def active_cache():
+    cache = RedisClientCache(max_entries=2)
+    cache._active.set()
+    return cache
+
+
+def test_client_cache_fill_and_lru_eviction(active_cache):
+    for key in ("agent:a:1", "agent:a:2"):
+        active_cache.fill(key, active_cache.reserve(key), key.encode())
+    assert active_cache.get("agent:a:1") == b"agent:a:1"
+
+    active_cache.fill("agent:a:3", active_cache.reserve("agent:a:3"), b"3")
+    assert active_cache.get("agent:a:2") is None
+    assert active_cache.get("agent:a:1") == b"agent:a:1"
+    assert active_cache.stats()["hits"] == 2
+    assert active_cache.stats()["misses"] == 1
+
+
+def test_client_cache_skips_fill_invalidated_during_read(active_cache):
+    token = active_cache.reserve("agent:a:1")
+    active_cache.invalidate(["agent:a:1"])
+    active_cache.fill("agent:a:1", token, b"stale")
+    assert active_cache.get("agent:a:1") is None
+
+
+def test_client_cache_inactive_never_caches():
+    cache = RedisClientCache(max_entries=2)
+    assert cache.reserve("agent:a:1") is None
+    cache.fill("agent:a:1", None, b"value")
+    assert cache.get("agent:a:1") is None
+
+
+@pytest.mark.asyncio
+async def test_client_cache_invalidated_by_other_clients(redis_url):
+    cache = RedisClientCache(url=redis_url, max_entries=10)
+    writer = Redis.from_url(redis_url)
+    try:
+        await cache.start()
+        assert cache.active
+
+        cache.fill("agent:cache-test:1", cache.reserve("agent:cache-test:1"), b"old")
+        await writer.set("agent:cache-test:1", b"new")
+        for _ in range(50):
+            if cache.stats()["entries"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.get("agent:cache-test:1") is None
+        assert cache.stats()["invalidations"] >= 1
+    finally:
+        await writer.delete("agent:cache-test:1")
+        await writer.aclose()
+        await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_client_cache_disabled_without_parser_internals(redis_url):
+    assert RedisClientCache.supported()
+    with patch("app.core.memory.redis.client_cache._AsyncRESP3Parser", None), \
+            patch.object(settings, "REDIS_URL", redis_url), \
+            patch.object(settings, "REDIS_CLIENT_CACHE_ENABLED", True):
+        assert not RedisClientCache.supported()
+        pool_manager = RedisPoolManager()
+        await pool_manager.initialize()
+        try:
+            assert pool_manager.client_cache is None
+        finally:
+            await pool_manager.close()
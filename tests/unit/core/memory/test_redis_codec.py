@@ -0,0 +1,62 @@
+import pytest
+from datetime import datetime, timezone
+from app.core.memory.redis.codec import MemoryCodec, RedisMemoryCodec, RedisCodecError, MSGPACK_PREFIX, ZLIB_PREFIX
+from app.core.models import MemoryEntry, MemoryContext
+
+
+@pytest.fixture
+def memory_entry():
+    return MemoryEntry(
+        content="Test content",
+        metadata={"key": "value", "index": 1},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(timezone.utc), metadata={"nested": [1, 2]})
+    )
+
+
+@pytest.mark.parametrize("codec_name", ["json", "msgpack"])
+def test_codec_round_trip(codec_name, memory_entry):
+    codec = RedisMemoryCodec(codec_name)
+    assert codec.decode(codec.encode(memory_entry)) == memory_entry
+
+
+def test_msgpack_codec_reads_legacy_json(memory_entry):
+    codec = RedisMemoryCodec("msgpack")
+    assert codec.encode(memory_entry).startswith(MSGPACK_PREFIX)
+    assert codec.decode(memory_entry.model_dump_json()) == memory_entry
+    assert codec.decode(memory_entry.model_dump_json().encode()) == memory_entry
+
+
+@pytest.mark.parametrize("codec_name", ["json", "msgpack"])
+def test_codec_compresses_large_entries_only(codec_name, memory_entry):
+    codec = RedisMemoryCodec(codec_name, compression_threshold=1024, compression_level=6)
+    assert not codec.encode(memory_entry).startswith(ZLIB_PREFIX)
+
+    large_entry = memory_entry.model_copy(update={"content": "Long tool output line\n" * 1000})
+    data = codec.encode(large_entry)
+    assert data.startswith(ZLIB_PREFIX)
+    assert len(data) < len(large_entry.content)
+    assert codec.decode(data) == large_entry
+    assert RedisMemoryCodec(codec_name, compression_threshold=0).decode(data) == large_entry
+
+
+def test_codec_rejects_unknown_data():
+    codec = RedisMemoryCodec("msgpack")
+    with pytest.raises(RedisCodecError):
+        codec.decode(b"\xffgarbage")
+    with pytest.raises(RedisCodecError):
+        codec.decode(MSGPACK_PREFIX + b"\xc1")
+    with pytest.raises(RedisCodecError):
+        codec.decode(ZLIB_PREFIX + b"not zlib")
+    with pytest.raises(RedisCodecError):
+        RedisMemoryCodec("pickle")
+
+
+def test_incomplete_codec_cannot_be_instantiated():
+    class EncodeOnlyCodec(MemoryCodec):
+        name = "encode-only"
+
+        def encode(self, memory_entry):
+            return b""
+
+    with pytest.raises(TypeError):
+        EncodeOnlyCodec()
@@ -1,8 +1,12 @@
 import pytest
 import os
 from unittest.mock import AsyncMock, patch
+from redis.crc import key_slot
 from redis.exceptions import ConnectionError, TimeoutError
 from app.core.memory.redis.connection import RedisConnection, RedisConnectionError
+from app.core.memory.redis.pool import RedisPoolManager
+from app.core.memory.redis.replicas import RedisReplicaRouter
+from app.config import settings
 
 
 @pytest.fixture
@@ -141,3 +145,53 @@ async def test_redis_connection_too_many_connections(redis_url):
 
         assert "too many connections" in str(excinfo.value)
         mock_redis.return_value.aclose.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_connections_share_process_pool():
+    pool_manager = RedisPoolManager()
+    first = RedisConnection('12345678-1234-5678-1234-567812345678', pool_manager=pool_manager)
+    second = RedisConnection('87654321-4321-8765-4321-876543218765', pool_manager=pool_manager)
+
+    await first.initialize()
+    await second.initialize()
+    assert first.pool is not None
+    assert first.pool is second.pool
+    assert first.memory_key("m") != second.memory_key("m")
+
+    # Releasing one agent must not tear down the pool used by the others
+    await first.close()
+    assert pool_manager.is_initialized
+    async with second.get_connection() as conn:
+        assert await conn.ping()
+
+    await pool_manager.close()
+    assert not pool_manager.is_initialized
+
+
+def test_redis_connection_cluster_keys_share_slot():
+    with patch.object(settings, "REDIS_CLUSTER_MODE", True):
+        connection = RedisConnection('12345678-1234-5678-1234-567812345678', pool_manager=RedisPoolManager())
+
+    assert connection.memory_key("m") == "agent:{12345678-1234-5678-1234-567812345678}:m"
+    slots = {key_slot(connection.memory_key(str(i)).encode()) for i in range(10)}
+    slots.add(key_slot(connection.index_key("timeline").encode()))
+    slots.add(key_slot(connection.index_key("consolidating").encode()))
+    assert len(slots) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_replica_router_skips_unusable_replicas():
+    pool_manager = RedisPoolManager()
+    await pool_manager.initialize()
+    # The primary itself reports role:master, and port 1 refuses connections;
+    # neither may serve reads, so every read falls back to the primary.
+    router = RedisReplicaRouter(urls=[settings.REDIS_URL, "redis://localhost:1"], max_lag=1.0, check_interval=0)
+    router.initialize()
+    try:
+        await router.check(pool_manager.pool)
+        assert router.staleness == {settings.REDIS_URL: float("inf"), "redis://localhost:1": float("inf")}
+        assert router.choose(pool_manager.pool) is None
+    finally:
+        await router.close()
+        await pool_manager.close()
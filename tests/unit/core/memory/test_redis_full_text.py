@@ -0,0 +1,107 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+from redis.exceptions import ResponseError
+from app.core.memory.redis.connection import RedisConnection
+from app.core.memory.redis.full_text import (
+    RedisFullTextIndex, detect_search_module, FULL_TEXT_INDEX_NAME, LEGACY_FULL_TEXT_INDEX_NAMES,
+)
+from app.api.models.memory import AdvancedSearchQuery
+from app.core.models import MemoryEntry, MemoryContext
+
+
+@pytest.fixture
+def full_text_index():
+    connection = RedisConnection(UUID('12345678-1234-5678-1234-567812345678'))
+    return RedisFullTextIndex(connection)
+
+
+def test_build_query_scopes_to_agent(full_text_index):
+    query = full_text_index.build_query(AdvancedSearchQuery(query=""))
+    assert query == r"@agent_id:{12345678\-1234\-5678\-1234\-567812345678}"
+
+
+def test_build_query_pushes_down_filters(full_text_index):
+    start = datetime(2024, 1, 1)
+    end = datetime(2024, 1, 2)
+    query = full_text_index.build_query(AdvancedSearchQuery(
+        query="Hello world",
+        context_type="chat",
+        time_range={"start": start, "end": end},
+        metadata_filters={"source": "user-input"},
+    ))
+    assert r"@context_type:{chat}" in query
+    assert f"@timestamp:[{start.timestamp()} {end.timestamp()}]" in query
+    assert r"@metadata:{source\=user\-input}" in query
+    assert query.endswith("@content:(hello|world)")
+
+
+def test_stage_add_writes_indexed_fields(full_text_index):
+    pipeline = MagicMock()
+    timestamp = datetime.now()
+    memory_entry = MemoryEntry(
+        content="Test content",
+        metadata={"key": "value", "index": 1},
+        context=MemoryContext(context_type="test", timestamp=timestamp, metadata={})
+    )
+    full_text_index.stage_add(pipeline, "memory-1", memory_entry, expire=60)
+
+    document_key = full_text_index.document_key("memory-1")
+    mapping = pipeline.hset.call_args.kwargs["mapping"]
+    assert pipeline.hset.call_args.args == (document_key,)
+    assert mapping["content"] == "Test content"
+    assert mapping["timestamp"] == timestamp.timestamp()
+    assert mapping["metadata"] == "key=value|index=1"
+    pipeline.expire.assert_called_once_with(document_key, 60)
+
+
+def test_metadata_separators_are_encoded(full_text_index):
+    pipeline = MagicMock()
+    memory_entry = MemoryEntry(
+        content="Test content",
+        metadata={"path": "a|b", "expr": "x=1", "rate": "5%"},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+    )
+    full_text_index.stage_add(pipeline, "memory-1", memory_entry)
+
+    tags = pipeline.hset.call_args.kwargs["mapping"]["metadata"].split("|")
+    assert tags == ["path=a%7Cb", "expr=x%3D1", "rate=5%25"]
+
+    query = full_text_index.build_query(AdvancedSearchQuery(query="", metadata_filters={"path": "a|b"}))
+    assert r"@metadata:{path\=a\%7Cb}" in query
+
+
+@pytest.mark.asyncio
+async def test_ensure_index_uses_case_sensitive_tags():
+    indexes = {}
+
+    def ft(name):
+        index = indexes.setdefault(name, AsyncMock())
+        index.info.side_effect = ResponseError("Unknown index name")
+        return index
+
+    conn = MagicMock()
+    conn.ft.side_effect = ft
+    assert await RedisFullTextIndex.ensure_index(conn) is True
+
+    fields = indexes[FULL_TEXT_INDEX_NAME].create_index.call_args.args[0]
+    tags = {field.name: field.args for field in fields if "TAG" in field.args}
+    assert set(tags) == {"agent_id", "context_type", "metadata"}
+    assert all("CASESENSITIVE" in args for args in tags.values())
+    # The index built with the earlier, case-insensitive schema is dropped; its documents are kept.
+    for legacy_name in LEGACY_FULL_TEXT_INDEX_NAMES:
+        indexes[legacy_name].dropindex.assert_awaited_once_with(delete_documents=False)
+
+
+@pytest.mark.asyncio
+async def test_detect_search_module():
+    conn = AsyncMock()
+    conn.module_list.return_value = [{"name": "search", "ver": 10000}]
+    assert await detect_search_module(conn) is True
+
+    conn.module_list.return_value = []
+    assert await detect_search_module(conn) is False
+
+    conn.module_list.side_effect = ResponseError("NOPERM")
+    assert await detect_search_module(conn) is False
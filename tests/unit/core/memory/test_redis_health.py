@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from redis.exceptions import ConnectionError
+from app.core.memory.redis.health import (
+    RedisHealthMonitor, RedisCircuitOpenError, HEALTHY, DEGRADED, OPEN, HALF_OPEN,
+)
+
+
+@pytest.fixture
+def monitor():
+    return RedisHealthMonitor(failure_threshold=3, reset_timeout=10, interval=0)
+
+
+def test_circuit_opens_after_consecutive_failures(monitor):
+    monitor.record_failure(ConnectionError("refused"))
+    assert monitor.state == DEGRADED
+    monitor.before_request()
+
+    monitor.record_failure(ConnectionError("refused"))
+    monitor.record_failure(ConnectionError("refused"))
+    assert monitor.state == OPEN
+    with pytest.raises(RedisCircuitOpenError):
+        monitor.before_request()
+
+
+def test_success_resets_failure_count(monitor):
+    monitor.record_failure(ConnectionError("refused"))
+    monitor.record_failure(ConnectionError("refused"))
+    monitor.record_success()
+    monitor.record_failure(ConnectionError("refused"))
+    assert monitor.state == DEGRADED
+
+
+def test_half_open_lets_a_single_trial_through(monitor):
+    with patch("app.core.memory.redis.health.time.monotonic", return_value=100.0):
+        for _ in range(3):
+            monitor.record_failure(ConnectionError("refused"))
+
+    with patch("app.core.memory.redis.health.time.monotonic", return_value=111.0):
+        monitor.before_request()
+        assert monitor.state == HALF_OPEN
+        with pytest.raises(RedisCircuitOpenError):
+            monitor.before_request()
+
+        # A failed trial re-opens the circuit for another reset timeout.
+        monitor.record_failure(ConnectionError("refused"))
+        assert monitor.state == OPEN
+        with pytest.raises(RedisCircuitOpenError):
+            monitor.before_request()
+
+    with patch("app.core.memory.redis.health.time.monotonic", return_value=122.0):
+        monitor.before_request()
+        monitor.record_success()
+        assert monitor.state == HEALTHY
+        monitor.before_request()
+
+
+@pytest.mark.asyncio
+async def test_background_checks_close_the_circuit():
+    monitor = RedisHealthMonitor(failure_threshold=1, reset_timeout=60, interval=0.01)
+    monitor.record_failure(ConnectionError("refused"))
+    assert monitor.state == OPEN
+
+    probes = []
+
+    async def probe():
+        probes.append(True)
+
+    monitor.start(probe)
+    try:
+        for _ in range(50):
+            if monitor.state == HEALTHY:
+                break
+            await asyncio.sleep(0.01)
+        assert monitor.state == HEALTHY
+        assert probes
+    finally:
+        await monitor.stop()
@@ -5,8 +5,13 @@ from datetime import datetime, timedelta
 from unittest.mock import patch, AsyncMock
 from app.core.memory.redis_memory import RedisMemory, RedisMemoryError
 from app.core.memory.redis.connection import RedisConnectionError
+from app.core.memory.redis.migrate import migrate_key
+from app.core.memory.redis.consolidation_stream import RedisConsolidationStream
+from app.core.memory.redis.expiry import RedisExpiryListener
+from app.core.memory.redis.pool import redis_pool_manager
 from app.api.models.memory import AdvancedSearchQuery
 from app.core.models import MemoryEntry, MemoryContext
+from app.config import settings
 
 @pytest.mark.asyncio
 async def test_redis_memory_lifecycle():
@@ -131,3 +136,400 @@ async def test_redis_memory_get_memories_older_than(redis_memory):
     old_memories = await redis_memory.get_memories_older_than(threshold)
     assert len(old_memories) == 3
     assert all(memory.context.timestamp < threshold for memory in old_memories)
+
+@pytest.mark.asyncio
+async def test_redis_memory_get_recent_prunes_expired_entries(redis_memory):
+    memory_entry = MemoryEntry(
+        content="Short-lived content",
+        metadata={},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+    )
+    memory_id = await redis_memory.operations.add(memory_entry, expire=1)
+    await asyncio.sleep(1.1)
+
+    recent_memories = await redis_memory.get_recent(5)
+    assert all(memory["id"] != memory_id for memory in recent_memories)
+
+    timeline_key = redis_memory.connection.index_key("timeline")
+    async with redis_memory.connection.get_connection() as conn:
+        assert await conn.zscore(timeline_key, memory_id) is None
+
+@pytest.mark.asyncio
+async def test_redis_memory_writes_prune_expired_entries(redis_memory):
+    def make_entry(content):
+        return MemoryEntry(
+            content=content,
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+
+    with patch.object(settings, "REDIS_KEYWORD_INDEX_ENABLED", True):
+        expired_ids = [
+            await redis_memory.operations.add(make_entry(f"Short-lived {i}"), expire=1) for i in range(3)
+        ]
+        await asyncio.sleep(1.1)
+
+        # No read touches the expired entries; the next write prunes them.
+        memory_id = await redis_memory.operations.add(make_entry("Long-lived"))
+
+    assert redis_memory.operations.last_usage.count == 1
+    keyword_index = redis_memory.operations.keyword_index
+    async with redis_memory.connection.get_connection() as conn:
+        for index in ("timeline", "ids"):
+            assert await conn.zrange(redis_memory.connection.index_key(index), 0, -1) == [memory_id]
+        assert await conn.zcard(redis_memory.connection.index_key("expiries")) == 0
+        assert await conn.hkeys(redis_memory.connection.index_key("sizes")) == [memory_id]
+        assert await conn.smembers(keyword_index.token_key("short-lived")) == set()
+        assert not await conn.exists(*(keyword_index.document_key(expired_id) for expired_id in expired_ids))
+
+@pytest.mark.asyncio
+async def test_redis_memory_get_recent_skips_undecodable_entries(redis_memory):
+    memory_ids = []
+    for i in range(3):
+        memory_entry = MemoryEntry(
+            content=f"Test content {i}",
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now() - timedelta(minutes=3 - i), metadata={})
+        )
+        memory_ids.append(await redis_memory.add(memory_entry))
+
+    # Corrupt the newest entry, at the head of the timeline.
+    async with redis_memory.connection.get_connection() as conn:
+        await conn.set(redis_memory.connection.memory_key(memory_ids[2]), b"{not json")
+
+    recent_memories = await redis_memory.get_recent(2)
+    assert [memory["id"] for memory in recent_memories] == [memory_ids[1], memory_ids[0]]
+
+    # A page of nothing but undecodable entries ends the scan instead of re-reading it forever.
+    async with redis_memory.connection.get_connection() as conn:
+        for memory_id in memory_ids[:2]:
+            await conn.set(redis_memory.connection.memory_key(memory_id), b"{not json")
+    assert await asyncio.wait_for(redis_memory.get_recent(2), timeout=5) == []
+
+@pytest.mark.asyncio
+async def test_redis_memory_search_with_keyword_index(redis_memory):
+    with patch.object(settings, "REDIS_KEYWORD_INDEX_ENABLED", True):
+        contents = ["quick brown fox", "lazy dog", "quick dog", "unrelated"]
+        memory_ids = []
+        for content in contents:
+            memory_entry = MemoryEntry(
+                content=content,
+                metadata={},
+                context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+            )
+            memory_ids.append(await redis_memory.add(memory_entry))
+
+        results = await redis_memory.search(AdvancedSearchQuery(query="quick dog", max_results=5))
+        assert [result["memory_entry"].content for result in results][0] == "quick dog"
+        assert results[0]["relevance_score"] == 1.0
+        assert all(result["memory_entry"].content != "unrelated" for result in results)
+
+        await redis_memory.delete(memory_ids[2])
+        results = await redis_memory.search(AdvancedSearchQuery(query="quick dog", max_results=5))
+        assert all(result["memory_entry"].content != "quick dog" for result in results)
+
+@pytest.mark.asyncio
+async def test_redis_memory_bulk_operations(redis_memory):
+    memory_entries = [
+        MemoryEntry(
+            content=f"Bulk content {i}",
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+        for i in range(10)
+    ]
+    memory_ids = await redis_memory.add_many(memory_entries)
+    assert memory_ids == [str(memory_entry.id) for memory_entry in memory_entries]
+
+    retrieved = await redis_memory.get_many(memory_ids + ["missing"])
+    assert [memory.content for memory in retrieved[:-1]] == [memory_entry.content for memory_entry in memory_entries]
+    assert retrieved[-1] is None
+
+    await redis_memory.delete_many(memory_ids[:5])
+    retrieved = await redis_memory.get_many(memory_ids)
+    assert retrieved[:5] == [None] * 5
+    assert all(memory is not None for memory in retrieved[5:])
+
+@pytest.mark.asyncio
+async def test_redis_memory_hash_layout(redis_memory):
+    memory_entries = [
+        MemoryEntry(
+            content=f"Layout content {i}",
+            metadata={"index": i},
+            context=MemoryContext(context_type="even" if i % 2 == 0 else "odd", timestamp=datetime.now(), metadata={})
+        )
+        for i in range(6)
+    ]
+    # Entries written in the string layout stay readable after switching.
+    legacy_id = await redis_memory.add(memory_entries[0])
+
+    with patch.object(settings, "REDIS_STORAGE_LAYOUT", "hash"):
+        hash_memory = RedisMemory(redis_memory.agent_id)
+        await hash_memory.initialize()
+        await hash_memory.add_many(memory_entries[1:])
+
+        async with hash_memory.connection.get_connection() as conn:
+            assert await conn.type(hash_memory.connection.memory_key(str(memory_entries[1].id))) == "hash"
+
+        retrieved = await hash_memory.get_many([str(memory_entry.id) for memory_entry in memory_entries])
+        assert [memory.content for memory in retrieved] == [memory_entry.content for memory_entry in memory_entries]
+
+        results = await hash_memory.search(AdvancedSearchQuery(query="layout", context_type="even", max_results=10))
+        assert sorted(result["memory_entry"].content for result in results) == [
+            "Layout content 0", "Layout content 2", "Layout content 4"
+        ]
+
+        async with hash_memory.connection.get_connection() as conn:
+            key = hash_memory.connection.memory_key(legacy_id)
+            assert await migrate_key(conn, key, hash_memory.operations.store)
+            assert await conn.type(key) == "hash"
+        assert (await hash_memory.get(legacy_id)).content == "Layout content 0"
+
+@pytest.mark.asyncio
+async def test_redis_memory_consolidation_claims(redis_memory):
+    now = datetime.now()
+    for i in range(5):
+        await redis_memory.add(MemoryEntry(
+            content=f"Old content {i}",
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=now - timedelta(hours=2, minutes=i), metadata={})
+        ))
+    await redis_memory.add(MemoryEntry(
+        content="New content",
+        metadata={},
+        context=MemoryContext(context_type="test", timestamp=now, metadata={})
+    ))
+    threshold = now - timedelta(hours=1)
+
+    first = await redis_memory.claim_consolidation_batch(threshold, 3, visibility_timeout=60)
+    second = await redis_memory.claim_consolidation_batch(threshold, 3, visibility_timeout=60)
+    assert len(first) == 3 and len(second) == 2
+    assert not set(first) & set(second)
+    assert await redis_memory.claim_consolidation_batch(threshold, 3, visibility_timeout=60) == []
+
+    # Released claims are retried; unacknowledged ones are reclaimed after the timeout.
+    await redis_memory.release_consolidation_batch(second)
+    assert sorted(await redis_memory.claim_consolidation_batch(threshold, 3, visibility_timeout=60)) == sorted(second)
+    assert sorted(await redis_memory.claim_consolidation_batch(threshold, 5, visibility_timeout=0)) == sorted(first + second)
+
+    await redis_memory.delete_many(first + second)
+    await redis_memory.ack_consolidation_batch(first + second)
+    assert await redis_memory.claim_consolidation_batch(threshold, 5, visibility_timeout=0) == []
+
+@pytest.mark.asyncio
+async def test_redis_memory_search_keeps_top_results(redis_memory):
+    contents = ["red green blue", "red green", "red", "green", "blue", "yellow"] * 5
+    await redis_memory.add_many([
+        MemoryEntry(
+            content=content,
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+        for content in contents
+    ])
+
+    results = await redis_memory.search(AdvancedSearchQuery(query="red green blue", max_results=7))
+    assert [result["relevance_score"] for result in results] == [1.0] * 5 + [pytest.approx(2 / 3)] * 2
+
+    results = await redis_memory.search(
+        AdvancedSearchQuery(query="red green blue", max_results=50, relevance_threshold=0.5)
+    )
+    assert len(results) == 10
+    assert all(result["relevance_score"] >= 0.5 for result in results)
+
+@pytest.mark.asyncio
+async def test_redis_memory_full_text_search_pages_past_filtered_results(redis_memory):
+    def make_entry(content):
+        return MemoryEntry(
+            content=content,
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+
+    with patch.object(redis_pool_manager, "full_text_search_available", True):
+        # The module matches "running" for "run" by stemming; the client-side relevance does not.
+        stemmed_ids = await redis_memory.add_many([make_entry(f"running late {i}") for i in range(4)])
+        exact_ids = await redis_memory.add_many([make_entry("run now"), make_entry("run and stop")])
+        server_order = stemmed_ids + exact_ids
+
+        async def ft_search(conn, query, offset=0, num=None):
+            return server_order[offset:offset + num]
+
+        query = AdvancedSearchQuery(query="run", max_results=2, relevance_threshold=0.5)
+        with patch.object(redis_memory.searcher.full_text_index, "search", side_effect=ft_search), \
+                patch("app.core.memory.redis.search.FULL_TEXT_PAGE_SIZE", 2):
+            results = await redis_memory.search(query)
+
+    assert [result["id"] for result in results] == exact_ids
+    assert all(result["relevance_score"] == 1.0 for result in results)
+
+    # The scan path ranks the same data the same way.
+    async with redis_memory.connection.get_connection() as conn:
+        scanned = await redis_memory.searcher._search_scan(conn, query)
+    assert sorted(result["id"] for result in scanned) == sorted(exact_ids)
+
+@pytest.mark.asyncio
+async def test_redis_memory_consolidation_stream(redis_memory):
+    stream = RedisConsolidationStream()
+    await stream.ensure_group()
+    await stream.ensure_group()
+    with patch.object(settings, "CONSOLIDATION_STREAM_ENABLED", True):
+        memory_ids = await redis_memory.add_many([
+            MemoryEntry(
+                content=f"Queued content {i}",
+                metadata={},
+                context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+            )
+            for i in range(3)
+        ])
+
+    assert await stream.read_due("worker-1", 10, min_age=3600) == []
+    delivered = await stream.read_due("worker-1", 2, min_age=0)
+    assert [message.memory_id for message in delivered] == memory_ids[:2]
+    assert all(message.agent_id == str(redis_memory.agent_id) for message in delivered)
+
+    # Unacknowledged entries move to another consumer once the visibility timeout passes.
+    assert await stream.reclaim("worker-2", 10, min_idle=60) == []
+    assert await stream.reclaim("worker-2", 10, min_idle=0) == delivered
+
+    remaining = await stream.read_due("worker-2", 10, min_age=0)
+    assert [message.memory_id for message in remaining] == memory_ids[2:]
+    await stream.ack([message.message_id for message in delivered + remaining])
+    async with redis_memory.connection.get_connection() as conn:
+        assert await conn.xlen(stream.key) == 0
+
+@pytest.mark.asyncio
+async def test_redis_memory_consolidation_on_expiry(redis_memory):
+    listener = RedisExpiryListener()
+    await listener.start()
+    try:
+        with patch.multiple(
+            settings, CONSOLIDATION_ON_EXPIRY_ENABLED=True, SHORT_TERM_MEMORY_TTL=1, CONSOLIDATION_EXPIRY_GRACE=60
+        ):
+            memory_ids = await redis_memory.add_many([
+                MemoryEntry(
+                    content=f"Expiring content {i}",
+                    metadata={},
+                    context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+                )
+                for i in range(3)
+            ])
+            await redis_memory.delete(memory_ids[0])
+
+        async with redis_memory.connection.get_connection() as conn:
+            assert await conn.ttl(redis_memory.connection.memory_key(memory_ids[1])) > 1
+
+        # Only the shadow keys expire; the entries stay readable for consolidation.
+        expired = []
+        while len(expired) < 2:
+            batch = await listener.next_batch(10, timeout=5)
+            assert batch, "shadow key expiry not reported"
+            expired.extend(batch[str(redis_memory.agent_id)])
+        assert sorted(expired) == sorted(memory_ids[1:])
+        assert all(await redis_memory.get_many(memory_ids[1:]))
+    finally:
+        await listener.stop()
+
+
+def test_redis_expiry_listener_parses_shadow_keys():
+    assert RedisExpiryListener.parse_key("agent_expiry:agent-1:memory-1") == ("agent-1", "memory-1")
+    assert RedisExpiryListener.parse_key("agent_expiry:{agent-1}:memory-1") == ("agent-1", "memory-1")
+    assert RedisExpiryListener.parse_key("agent:agent-1:memory-1") is None
+    assert RedisExpiryListener.parse_key(b"agent_expiry:agent-1:memory-1") is None
+
+@pytest.mark.asyncio
+async def test_redis_expiry_listener_retries_after_unexpected_errors():
+    listener = RedisExpiryListener()
+    with patch.object(
+        RedisExpiryListener, "_enable_notifications", AsyncMock(side_effect=[RuntimeError("ACL denied"), None])
+    ):
+        await listener.start(timeout=5)
+        try:
+            assert listener.subscribed
+        finally:
+            await listener.stop()
+
+@pytest.mark.asyncio
+async def test_redis_memory_usage_accounting(redis_memory):
+    entries = [
+        MemoryEntry(
+            content=f"Counted content {i}",
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+        for i in range(5)
+    ]
+    sizes = [len(redis_memory.operations.store.codec.encode(entry)) for entry in entries]
+    memory_ids = await redis_memory.add_many(entries)
+    assert await redis_memory.get_usage() == (5, sum(sizes))
+
+    # Overwrites replace the recorded size instead of counting the entry twice.
+    entries[0].content = "Counted content, rewritten"
+    await redis_memory.add(entries[0])
+    rewritten = len(redis_memory.operations.store.codec.encode(entries[0]))
+    assert await redis_memory.get_usage() == (5, sum(sizes[1:]) + rewritten)
+
+    await redis_memory.delete_many(memory_ids[:2])
+    assert await redis_memory.get_usage() == (3, sum(sizes[2:]))
+
+    # Entries that vanished on their own are subtracted when their ID is pruned.
+    async with redis_memory.connection.get_connection() as conn:
+        await conn.delete(redis_memory.connection.memory_key(memory_ids[2]))
+    await redis_memory.get_recent(10)
+    assert await redis_memory.get_usage() == (2, sum(sizes[3:]))
+
+    budget_calls = []
+    redis_memory.on_budget_exceeded = budget_calls.append
+    with patch.object(settings, "MAX_SHORT_TERM_MEMORIES", 2):
+        assert await redis_memory.exceeds_budget() is False
+        await redis_memory.add(entries[1])
+        assert budget_calls == [(3, sum(sizes[1:]) - sizes[2])]
+
+
+@pytest.mark.asyncio
+async def test_redis_memory_budget_clears_once_entries_expire(redis_memory):
+    with patch.object(settings, "MAX_SHORT_TERM_MEMORIES", 2):
+        for i in range(3):
+            await redis_memory.operations.add(
+                MemoryEntry(
+                    content=f"Expiring content {i}",
+                    metadata={},
+                    context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+                ),
+                expire=1,
+            )
+        await asyncio.sleep(1.1)
+
+        # Nothing has pruned the expired entries yet, so they still count.
+        assert await redis_memory.exceeds_budget() is True
+        assert await redis_memory.reconcile_usage() == (0, 0)
+        assert await redis_memory.exceeds_budget() is False
+
+    async with redis_memory.connection.get_connection() as conn:
+        assert await conn.zcard(redis_memory.connection.index_key("timeline")) == 0
+
+@pytest.mark.asyncio
+async def test_redis_memory_get_page(redis_memory):
+    # Written oldest first, with context timestamps in the opposite order.
+    memory_ids = await redis_memory.add_many([
+        MemoryEntry(
+            content=f"Paged content {i}",
+            metadata={},
+            context=MemoryContext(context_type="test", timestamp=datetime.now() - timedelta(minutes=i), metadata={})
+        )
+        for i in range(7)
+    ])
+    async with redis_memory.connection.get_connection() as conn:
+        await conn.delete(redis_memory.connection.memory_key(memory_ids[4]))
+
+    pages = []
+    before = None
+    while True:
+        page = await redis_memory.get_page(3, before)
+        if not page:
+            break
+        pages.append([result["id"] for result in page])
+        before = page[-1]["id"]
+
+    expected = [memory_ids[6], memory_ids[5], memory_ids[3], memory_ids[2], memory_ids[1], memory_ids[0]]
+    assert pages == [expected[:3], expected[3:]]
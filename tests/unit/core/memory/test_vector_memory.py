@@ -1,7 +1,7 @@
 import pytest
 from uuid import UUID
 from datetime import datetime, timedelta
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from app.core.memory.vector_memory import VectorMemory, VectorMemoryError
 from app.api.models.memory import AdvancedSearchQuery
 from app.core.models import MemoryEntry, MemoryContext
@@ -110,3 +110,56 @@ async def test_vector_memory_error_handling(vector_memory):
                 metadata={},
                 context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
             ))
+
+
+@pytest.mark.asyncio
+async def test_vector_memory_add_many_in_batches(vector_memory):
+    memory_entries = [
+        MemoryEntry(
+            content=f"Batched content {i}",
+            metadata={"key": "value"},
+            context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+        )
+        for i in range(5)
+    ]
+    with patch("app.core.memory.vector_memory.settings.VECTOR_ADD_BATCH_SIZE", 2), \
+            patch.object(vector_memory.collection, "upsert", wraps=vector_memory.collection.upsert) as upsert:
+        memory_ids = await vector_memory.add_many(memory_entries)
+
+    assert memory_ids == [str(memory_entry.id) for memory_entry in memory_entries]
+    assert [len(call.kwargs["ids"]) for call in upsert.call_args_list] == [2, 2, 1]
+    retrieved_entry = await vector_memory.get(memory_ids[4])
+    assert retrieved_entry.content == "Batched content 4"
+
+
+@pytest.mark.asyncio
+async def test_vector_memory_write_ack_modes():
+    memory_entry = MemoryEntry(
+        content="Test content",
+        metadata={},
+        context=MemoryContext(context_type="test", timestamp=datetime.now(), metadata={})
+    )
+    with pytest.raises(VectorMemoryError):
+        VectorMemory("test_ack", ack_mode="eventually")
+
+    trusting = VectorMemory("test_ack", ack_mode="trust")
+    trusting.client = trusting.collection = MagicMock()
+    assert await trusting.add(memory_entry) == str(memory_entry.id)
+    trusting.collection.get.assert_not_called()
+
+    # The read-back finds nothing: "verify" fails the add, "async" only reports it.
+    verifying = VectorMemory("test_ack", ack_mode="verify")
+    verifying.client = verifying.collection = MagicMock()
+    verifying.collection.get.return_value = {"ids": []}
+    with pytest.raises(VectorMemoryError):
+        await verifying.add(memory_entry)
+
+    background = VectorMemory("test_ack", ack_mode="async")
+    background.client = background.collection = MagicMock()
+    background.collection.get.return_value = {"ids": []}
+    assert await background.add(memory_entry) == str(memory_entry.id)
+    # A per-call override makes the read-back synchronous again.
+    with pytest.raises(VectorMemoryError):
+        await background.add_many([memory_entry], ack_mode="verify")
+    await background.close()
+    assert background.stats() == {"ack_mode": "async", "pending_verifications": 0, "unverified_writes": 1}